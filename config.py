@@ -44,7 +44,9 @@ class Settings(BaseSettings):
     DB_POOL_SIZE: int = Field(default=10, env="DB_POOL_SIZE")
     DB_MAX_CONNECTIONS: int = Field(default=20, env="DB_MAX_CONNECTIONS")
     DB_POOL_TIMEOUT: int = Field(default=30, env="DB_POOL_TIMEOUT")
-    DB_POOL_RECYCLE: int = Field(default=3600, env="DB_POOL_RECYCLE")
+    DB_POOL_RECYCLE: int = Field(default=1800, env="DB_POOL_RECYCLE")  # 应小于MySQL的wait_timeout
+    DB_QUERY_CACHE_SIZE: int = Field(default=2000, env="DB_QUERY_CACHE_SIZE")  # SQL编译缓存条目数
+    DB_QUERY_WARN_THRESHOLD: int = Field(default=20, env="DB_QUERY_WARN_THRESHOLD")  # DEBUG模式下单请求SQL数超过该值时告警（排查N+1）
     
     # 阿里云配置
     ALIYUN_ACCESS_KEY_ID: str = Field(default="your-aliyun-ak-id", env="ALIYUN_ACCESS_KEY_ID")
@@ -66,6 +68,10 @@ class Settings(BaseSettings):
     # Redis会话配置
     WORKFLOW_SESSION_TTL: int = 3600 * 24 * 30  # 会话TTL（30天）
     
+    # 条目AI分析队列配置
+    ENTRY_ANALYSIS_WORKER_ENABLED: bool = Field(default=True, env="ENTRY_ANALYSIS_WORKER_ENABLED")  # 是否在本进程内启动分析消费者
+    ENTRY_ANALYSIS_WORKER_CONCURRENCY: int = Field(default=8, env="ENTRY_ANALYSIS_WORKER_CONCURRENCY")  # 单次拉取并批量分析的任务数
+    
     # LLM配置
     LLM_PROVIDERS: Dict[str, Any] = Field(
         default={
@@ -101,6 +107,10 @@ class Settings(BaseSettings):
         return {
             "CHAT_SESSION": "tyc_universal_search_us:chat_session:",
             "USER_SESSIONS": "tyc_universal_search_us:user_sessions:",
+            "LLM_CACHE": "tyc_universal_search_us:llm_cache:",
+            "ENTRY_ANALYSIS": "tyc_universal_search_us:entry_analysis:",
+            "USER_DATA_VERSION": "tyc_universal_search_us:user_data_version:",
+            "TRACKING_CACHE": "tyc_universal_search_us:tracking_cache:",
         }
     
     @staticmethod
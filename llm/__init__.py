@@ -4,6 +4,7 @@ LLM模块
 """
 
 from .client import LLMClient
+from .cache import LLMCache, llm_cache
 
-__all__ = ["LLMClient"]
+__all__ = ["LLMClient", "LLMCache", "llm_cache"]
 
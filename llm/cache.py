@@ -0,0 +1,119 @@
+"""
+LLM响应缓存模块
+基于Redis缓存相同请求的模型回复，命中时无需再次调用模型
+"""
+# 标准库导包
+import hashlib
+import json
+import logging
+from functools import lru_cache
+from typing import Optional, List, Dict, Tuple
+
+# 项目内部导包
+from config import settings
+from redis_client import get_cache, set_cache
+from .config import llm_config
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=16)
+def _fingerprint(parts: Tuple[str, ...]) -> str:
+    """计算提示词/Schema等指令文本的摘要（同一组文本只计算一次）"""
+    return hashlib.blake2b("\0".join(parts).encode("utf-8"), digest_size=16).hexdigest()
+
+
+class LLMCache:
+    """LLM响应缓存，Redis不可用时读写均降级为未命中"""
+    
+    def __init__(self, key_prefix: Optional[str] = None):
+        """
+        初始化LLM响应缓存
+        
+        Args:
+            key_prefix: Redis key前缀，默认使用settings中的LLM_CACHE前缀
+        """
+        self._key_prefix = key_prefix or settings.REDIS_KEY_PREFIXES["LLM_CACHE"]
+    
+    def build_key(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        provider: Optional[str] = None,
+        model_key: Optional[str] = None,
+    ) -> str:
+        """
+        根据模型、温度和消息内容生成缓存键
+        
+        Args:
+            messages: 消息列表
+            temperature: 温度参数
+            provider: 提供商名称，默认使用默认提供商
+            model_key: 模型键，默认使用默认模型
+            
+        Returns:
+            缓存键
+        """
+        payload = json.dumps(
+            {
+                "provider": provider or llm_config.default_provider,
+                "model_key": model_key or llm_config.default_model_key,
+                "temperature": temperature,
+                "messages": messages,
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        digest = hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+        return f"{self._key_prefix}{digest}"
+    
+    def build_content_key(
+        self,
+        scope: str,
+        content: str,
+        provider: Optional[str] = None,
+        model_key: Optional[str] = None,
+        instructions: Tuple[str, ...] = (),
+    ) -> str:
+        """
+        根据规范化后的文本内容生成缓存键，忽略首尾空白及连续空白差异
+        
+        Args:
+            scope: 缓存用途（如analyze），不同用途的结果互不复用
+            content: 文本内容
+            provider: 提供商名称，默认使用默认提供商
+            model_key: 模型键，默认使用默认模型
+            instructions: 影响结果的提示词、Schema等文本，修改后旧缓存自动失效
+            
+        Returns:
+            缓存键
+        """
+        normalized = " ".join(content.split())
+        payload = "\n".join((
+            provider or llm_config.default_provider,
+            model_key or llm_config.default_model_key,
+            _fingerprint(tuple(instructions)),
+            normalized,
+        ))
+        digest = hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+        return f"{self._key_prefix}{scope}:{digest}"
+    
+    async def get(self, key: str) -> Optional[str]:
+        """读取缓存的回复，未命中或读取失败时返回None"""
+        try:
+            return await get_cache(key)
+        except Exception as e:
+            logger.warning("读取LLM缓存失败: %s", e)
+            return None
+    
+    async def set(self, key: str, value: str, ttl: int) -> None:
+        """写入回复缓存，失败时仅记录日志"""
+        try:
+            await set_cache(key, value, ttl=ttl)
+        except Exception as e:
+            logger.warning("写入LLM缓存失败: %s", e)
+
+
+# 全局LLM响应缓存实例
+llm_cache = LLMCache()
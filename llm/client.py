@@ -3,25 +3,65 @@ LLM客户端模块
 基于AsyncOpenAI封装统一的LLM调用接口
 """
 # 标准库导包
+import asyncio
 import json
 import logging
 from typing import Optional, List, Dict, Any
 
 # 第三方库导包
-from openai import AsyncOpenAI
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 import json_repair
 
 # 项目内部导包
+from .cache import llm_cache
 from .config import llm_config, LLMConfig
-from prompt import ENTRY_ANALYSIS_SYSTEM_PROMPT, ENTRY_ANALYSIS_USER_PROMPT
+from prompt import (
+    ENTRY_ANALYSIS_SCHEMA_JSON,
+    ENTRY_ANALYSIS_SYSTEM_PROMPT,
+    ENTRY_ANALYSIS_USER_PROMPT,
+    ENTRY_BATCH_ANALYSIS_SYSTEM_PROMPT,
+    ENTRY_BATCH_ANALYSIS_USER_PROMPT,
+)
 
 # 配置日志
 logger = logging.getLogger(__name__)
 
+# 到LLM服务的HTTP连接池：保持长连接，避免每次调用重新握手
+_HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=64, keepalive_expiry=60.0)
+
+# 日记分析结果依赖的提示词与Schema，任一修改后按内容缓存的旧结果不再命中
+_ANALYSIS_CACHE_INSTRUCTIONS = (
+    ENTRY_ANALYSIS_SYSTEM_PROMPT,
+    ENTRY_BATCH_ANALYSIS_SYSTEM_PROMPT,
+    ENTRY_ANALYSIS_SCHEMA_JSON,
+)
+
 
 class LLMClient:
     """LLM客户端，支持多厂商和多模型切换"""
     
+    _instance: Optional["LLMClient"] = None
+    ANALYSIS_CACHE_TTL = 3600 * 24  # 日记分析结果缓存24小时
+    
+    @classmethod
+    def instance(cls) -> "LLMClient":
+        """
+        获取进程级共享的LLM客户端
+        
+        共享实例会复用底层HTTP连接池，应优先使用，而不是每个请求新建LLMClient
+        """
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+    
+    @classmethod
+    async def shutdown(cls) -> None:
+        """关闭共享实例的HTTP连接（应用退出时调用）"""
+        if cls._instance is not None:
+            await cls._instance.close()
+            cls._instance = None
+    
     def __init__(self, config: Optional[LLMConfig] = None):
         """
         初始化LLM客户端
@@ -62,11 +102,18 @@ class LLMClient:
             self._clients[cache_key] = AsyncOpenAI(
                 api_key=cfg.api_key,
                 base_url=cfg.base_url,
+                http_client=DefaultAsyncHttpxClient(limits=_HTTP_LIMITS),
             )
             logger.info(f"创建LLM客户端: provider={provider}, model={model_cfg.name}")
         
         return self._clients[cache_key], model_cfg.id
     
+    async def close(self) -> None:
+        """关闭所有已创建的底层客户端"""
+        for client in self._clients.values():
+            await client.close()
+        self._clients.clear()
+    
     async def chat(
         self,
         messages: List[Dict[str, str]],
@@ -125,6 +172,8 @@ class LLMClient:
         """
         分析日记条目，提取事件、情绪和标签
         
+        规范化后内容相同的日记直接复用缓存的分析结果
+        
         Args:
             content: 日记内容
             provider: 提供商名称
@@ -133,6 +182,127 @@ class LLMClient:
         Returns:
             包含events、emotion、tags的字典
         """
+        return (await self.analyze_entries([content], provider, model_key))[0]
+    
+    async def analyze_entries(
+        self,
+        contents: List[str],
+        provider: Optional[str] = None,
+        model_key: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        批量分析日记条目，多篇日记合并为一次LLM请求
+        
+        先按内容查缓存，仅对未命中（且去重后）的日记调用LLM；
+        返回的数组长度与输入不一致时，回退为逐条分析
+        
+        Args:
+            contents: 日记内容列表
+            provider: 提供商名称
+            model_key: 模型键
+            
+        Returns:
+            与contents一一对应的分析结果列表，每项包含events、emotion、tags
+        """
+        keys = [
+            llm_cache.build_content_key("analyze", content, provider, model_key, _ANALYSIS_CACHE_INSTRUCTIONS)
+            for content in contents
+        ]
+        unique_keys = list(dict.fromkeys(keys))
+        cached = await asyncio.gather(*(llm_cache.get(key) for key in unique_keys))
+        results_by_key = {
+            key: json.loads(value) for key, value in zip(unique_keys, cached) if value is not None
+        }
+        
+        # 未命中缓存的内容，相同键只分析一次
+        missing = {}
+        for key, content in zip(keys, contents):
+            if key not in results_by_key:
+                missing.setdefault(key, content)
+        
+        if missing:
+            analyses = await self._request_analyses(list(missing.values()), provider, model_key)
+            for (key, content), analysis in zip(missing.items(), analyses):
+                if analysis is None:
+                    # 解析失败的结果不缓存
+                    results_by_key[key] = self._normalize_analysis(None, content)
+                    continue
+                results_by_key[key] = analysis
+                await llm_cache.set(key, json.dumps(analysis, ensure_ascii=False), self.ANALYSIS_CACHE_TTL)
+        
+        return [results_by_key[key] for key in keys]
+    
+    async def _request_analyses(
+        self,
+        contents: List[str],
+        provider: Optional[str] = None,
+        model_key: Optional[str] = None,
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        调用LLM分析日记，多篇日记合并为一次请求
+        
+        Args:
+            contents: 日记内容列表
+            provider: 提供商名称
+            model_key: 模型键
+            
+        Returns:
+            与contents一一对应的分析结果列表，解析失败的项为None
+        """
+        if len(contents) == 1:
+            return [await self._request_analysis(contents[0], provider, model_key)]
+        
+        entries = "\n\n".join(
+            f"【日记{index}】\n{content}" for index, content in enumerate(contents, start=1)
+        )
+        messages = [
+            {"role": "system", "content": ENTRY_BATCH_ANALYSIS_SYSTEM_PROMPT},
+            {"role": "user", "content": ENTRY_BATCH_ANALYSIS_USER_PROMPT.format(
+                count=len(contents), entries=entries
+            )}
+        ]
+        
+        response_text = await self.chat(
+            messages=messages,
+            provider=provider,
+            model_key=model_key,
+            temperature=0.3,
+            timeout=60,
+        )
+        
+        try:
+            results = self._parse_json_response(response_text)
+        except json.JSONDecodeError:
+            results = None
+        
+        if not isinstance(results, list) or len(results) != len(contents):
+            logger.warning("LLM批量分析结果与输入数量不一致，回退为逐条分析。响应: %s", response_text)
+            return list(await asyncio.gather(*(
+                self._request_analysis(content, provider, model_key) for content in contents
+            )))
+        
+        return [
+            self._normalize_analysis(result, content) if isinstance(result, dict) else None
+            for result, content in zip(results, contents)
+        ]
+    
+    async def _request_analysis(
+        self,
+        content: str,
+        provider: Optional[str] = None,
+        model_key: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        调用LLM分析单篇日记
+        
+        Args:
+            content: 日记内容
+            provider: 提供商名称
+            model_key: 模型键
+            
+        Returns:
+            包含events、emotion、tags的字典，解析失败时返回None
+        """
         system_prompt = ENTRY_ANALYSIS_SYSTEM_PROMPT
         user_prompt = ENTRY_ANALYSIS_USER_PROMPT.format(content=content)
         
@@ -150,39 +320,68 @@ class LLMClient:
         
         # 尝试解析JSON响应
         try:
-            # 若存在 Markdown 的 ```json 代码块，则尝试提取其中的内容
-            if "```json" in response_text:
-                response_text = response_text.split("```json", 1)[1].split("```", 1)[0].strip()
-            
-            result = json_repair.loads(response_text)
-            
-            # 验证和规范化结果
-            events = result.get("events", [])
-            if isinstance(events, str):
-                events = [events]
-            events = events[:3]  # 最多3个事件
-            
-            emotion = result.get("emotion", "neutral")
-            if emotion not in ["positive", "neutral", "negative"]:
-                emotion = "neutral"
-            
-            tags = result.get("tags", [])
-            if isinstance(tags, str):
-                tags = [tags]
-            tags = tags[:3]  # 最多3个标签
-            
-            return {
-                "events": events,
-                "emotion": emotion,
-                "tags": tags
-            }
-            
+            result = self._parse_json_response(response_text)
         except json.JSONDecodeError:
+            result = None
+        
+        if not isinstance(result, dict):
             logger.warning(f"LLM返回的JSON解析失败，使用默认值。响应: {response_text}")
+            return None
+        return self._normalize_analysis(result, content)
+    
+    @staticmethod
+    def _parse_json_response(response_text: str) -> Any:
+        """
+        解析LLM返回的JSON文本
+        
+        Args:
+            response_text: LLM响应文本
+            
+        Returns:
+            解析后的JSON对象
+        """
+        # 若存在 Markdown 的 ```json 代码块，则尝试提取其中的内容
+        if "```json" in response_text:
+            response_text = response_text.split("```json", 1)[1].split("```", 1)[0].strip()
+        return json_repair.loads(response_text)
+    
+    @staticmethod
+    def _normalize_analysis(result: Any, content: str) -> Dict[str, Any]:
+        """
+        验证和规范化单篇日记的分析结果
+        
+        Args:
+            result: 解析后的分析结果，非字典时返回默认值
+            content: 日记内容（用于生成默认事件）
+            
+        Returns:
+            包含events、emotion、tags的字典
+        """
+        if not isinstance(result, dict):
             # 如果解析失败，返回默认值
             return {
                 "events": [content[:50] + "..." if len(content) > 50 else content],
                 "emotion": "neutral",
                 "tags": []
             }
+        
+        events = result.get("events", [])
+        if isinstance(events, str):
+            events = [events]
+        events = events[:3]  # 最多3个事件
+        
+        emotion = result.get("emotion", "neutral")
+        if emotion not in ["positive", "neutral", "negative"]:
+            emotion = "neutral"
+        
+        tags = result.get("tags", [])
+        if isinstance(tags, str):
+            tags = [tags]
+        tags = tags[:3]  # 最多3个标签
+        
+        return {
+            "events": events,
+            "emotion": emotion,
+            "tags": tags
+        }
 
@@ -4,43 +4,79 @@ TYC MCP Web Server 主应用程序
 基于FastAPI和Uvicorn的现代Web服务
 """
 # 标准库导包
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 
 # 第三方库导包
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
 # 项目内部导包
 from config import settings
-from storage.database import init_db, cleanup_db
+from storage.database import init_db, cleanup_db, async_session_factory, engine
+from storage.query_counter import install_query_counter, count_queries
+from storage.repositories import TagRepository
+from llm.client import LLMClient
 from routers import basic, journal, insights, tag_tracking, flash
+from routers.services import EntryAnalysisWorker
 
 # 配置日志
 logger = logging.getLogger(__name__)
 
 
+async def _refresh_system_tags() -> None:
+    """重新加载系统标签缓存（失败时只记录日志，请求路径会在缓存过期后自行回源）"""
+    try:
+        async with async_session_factory() as session:
+            await TagRepository(session).refresh_system_tags_cache()
+    except Exception as e:
+        logger.warning("刷新系统标签缓存失败: %s", e)
+
+
+async def _refresh_system_tags_periodically() -> None:
+    """在缓存过期前定时刷新系统标签，请求始终命中已预热的缓存"""
+    interval = max(TagRepository.SYSTEM_TAGS_CACHE_TTL - 5, 1)
+    while True:
+        await asyncio.sleep(interval)
+        await _refresh_system_tags()
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     应用程序生命周期管理
     """
     # 启动时初始化数据库
+    analysis_worker = None
+    system_tags_refresher = None
     try:
         await init_db()
+        # 预热系统标签缓存并定时刷新，首个请求无需查询
+        await _refresh_system_tags()
+        system_tags_refresher = asyncio.create_task(_refresh_system_tags_periodically())
+        # 启动条目AI分析消费者（也可关闭后通过 scripts/run_entry_analysis_worker.py 单独部署消费进程）
+        if settings.ENTRY_ANALYSIS_WORKER_ENABLED:
+            analysis_worker = EntryAnalysisWorker()
+            analysis_worker.start()
         logger.info("应用程序启动完成")
         yield
     except Exception as e:
-        logger.error(f"应用程序启动失败: {str(e)}")
+        logger.error("应用程序启动失败: %s", e)
         raise
     finally:
-        # 关闭时清理数据库连接
+        # 关闭时清理数据库连接和LLM连接池
         try:
+            if system_tags_refresher is not None:
+                system_tags_refresher.cancel()
+            if analysis_worker is not None:
+                await analysis_worker.stop()
+            await LLMClient.shutdown()
             await cleanup_db()
             logger.info("应用程序关闭完成")
         except Exception as e:
-            logger.error(f"应用程序关闭时发生错误: {str(e)}")
+            logger.error("应用程序关闭时发生错误: %s", e)
 
 # 创建FastAPI应用实例
 app = FastAPI(
@@ -62,6 +98,21 @@ app.add_middleware(
     allow_headers=settings.CORS_ALLOW_HEADERS,
 )
 
+# 开发环境统计每个请求的SQL语句数，用于发现N+1查询
+if settings.DEBUG:
+    install_query_counter(engine)
+
+    @app.middleware("http")
+    async def warn_on_query_burst(request: Request, call_next):
+        with count_queries() as counter:
+            response = await call_next(request)
+        if counter[0] > settings.DB_QUERY_WARN_THRESHOLD:
+            logger.warning(
+                "单个请求执行SQL过多，可能存在N+1查询: %s %s, queries=%d",
+                request.method, request.url.path, counter[0]
+            )
+        return response
+
 # 注册路由
 app.include_router(basic.router)
 app.include_router(journal.router)
@@ -6,11 +6,13 @@ from typing import Optional, Dict, Any, List
 from datetime import datetime, date
 
 # 第三方库导包
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class UserInfo(BaseModel):
-    """用户信息模型"""
+    """用户信息模型（不可变：认证依赖会跨请求复用同一实例）"""
+    model_config = ConfigDict(frozen=True)
+    
     mobile: str
     name: Optional[str] = None
     user_id: Optional[str] = None
@@ -243,7 +245,7 @@ class ReorderInsightConfigsRequest(BaseModel):
 # ========== Tag Tracking模块相关模型 ==========
 
 class HeatmapDataResponse(BaseModel):
-    """热力图数据响应模型"""
+    """热力图数据响应模型（compact=true 时每天为 [date, count, word_count] 数组）"""
     date: str
     count: int
     word_count: int
@@ -1,9 +1,47 @@
 """
 提示词管理模块
 """
+# 标准库导包
+import json
+
 
 # ========== 日记分析相关提示词 ==========
 
+# 日记分析结果的 JSON Schema，导入时序列化为紧凑格式，减少每次请求的提示词长度
+ENTRY_ANALYSIS_SCHEMA = {
+    "type": "object",
+    "required": ["events", "emotion", "tags"],
+    "properties": {
+        "events": {
+            "type": "array",
+            "minItems": 0,
+            "maxItems": 3,
+            "items": {
+                "type": "string",
+                "description": "用一句话概括的核心事件"
+            }
+        },
+        "emotion": {
+            "type": "string",
+            "enum": ["positive", "neutral", "negative"],
+            "description": "整体情绪倾向"
+        },
+        "tags": {
+            "type": "array",
+            "minItems": 0,
+            "maxItems": 3,
+            "items": {
+                "type": "string",
+                "enum": ["学习工作", "社交", "健康"],
+                "description": "推荐的标签名称，从给定集合中选择"
+            }
+        }
+    },
+    "additionalProperties": False
+}
+
+ENTRY_ANALYSIS_SCHEMA_JSON = json.dumps(ENTRY_ANALYSIS_SCHEMA, ensure_ascii=False, separators=(",", ":"))
+
 ENTRY_ANALYSIS_SYSTEM_PROMPT = """你是一个专业的日记分析助手。请分析用户提供的日记内容，提取以下信息：
 1. 核心事件：1-3个关键事件，每个事件用一句话概括（如果内容非常简短，如只有“你好”，也请尽量用一句话描述“打招呼/问候”等场景）
 2. 情绪判断：整体情绪倾向（positive/neutral/negative）
@@ -19,37 +57,7 @@ ENTRY_ANALYSIS_SYSTEM_PROMPT = """你是一个专业的日记分析助手。请
 你必须严格按照下面提供的 JSON Schema 返回一个 JSON 对象（不要返回多余文字、解释或代码块标记）：
 
 JSON Schema:
-{
-  "type": "object",
-  "required": ["events", "emotion", "tags"],
-  "properties": {
-    "events": {
-      "type": "array",
-      "minItems": 0,
-      "maxItems": 3,
-      "items": {
-        "type": "string",
-        "description": "用一句话概括的核心事件"
-      }
-    },
-    "emotion": {
-      "type": "string",
-      "enum": ["positive", "neutral", "negative"],
-      "description": "整体情绪倾向"
-    },
-    "tags": {
-      "type": "array",
-      "minItems": 0,
-      "maxItems": 3,
-      "items": {
-        "type": "string",
-        "enum": ["学习工作", "社交", "健康"],
-        "description": "推荐的标签名称，从给定集合中选择"
-      }
-    }
-  },
-  "additionalProperties": false
-}"""
+""" + ENTRY_ANALYSIS_SCHEMA_JSON
 
 
 ENTRY_ANALYSIS_USER_PROMPT = """请分析以下日记内容：
@@ -57,6 +65,20 @@ ENTRY_ANALYSIS_USER_PROMPT = """请分析以下日记内容：
 {content}"""
 
 
+ENTRY_BATCH_ANALYSIS_SYSTEM_PROMPT = ENTRY_ANALYSIS_SYSTEM_PROMPT + """
+
+用户可能一次提供多篇日记，每篇以“【日记N】”开头（N从1开始编号）。
+请对每篇日记分别按上述 JSON Schema 进行分析，并返回一个 JSON 数组：
+- 数组长度必须与日记篇数相同
+- 数组第N个元素对应【日记N】的分析结果
+- 只返回 JSON 数组本身，不要返回多余文字、解释或代码块标记"""
+
+
+ENTRY_BATCH_ANALYSIS_USER_PROMPT = """请分别分析以下{count}篇日记内容：
+
+{entries}"""
+
+
 # ========== 洞察卡片相关提示词 ==========
 
 DAILY_AFFIRMATION_SYSTEM_PROMPT = """你是一个温暖的心理咨询师，擅长用鼓励和共情的话语帮助他人。请根据用户的情绪状态，生成一段50-100字的每日寄语。"""
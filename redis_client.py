@@ -57,17 +57,21 @@ def reset_redis_pool():
             _redis_pool = None
         logger.info("Redis连接池已重置")
 
-async def set_cache(key: str, value: any):
+async def set_cache(key: str, value: any, ttl: int = None):
     """
     设置缓存
     
     参数:
         key: 缓存键
         value: 缓存值，会被转换为JSON字符串
+        ttl: 过期时间（秒），为None时不过期
     """
     r = get_redis()
     
-    await r.set(key, json.dumps(value))
+    if ttl:
+        await r.setex(key, ttl, json.dumps(value))
+    else:
+        await r.set(key, json.dumps(value))
     
 async def get_cache(key: str):
     """
@@ -86,6 +90,89 @@ async def get_cache(key: str):
     return None
 
 
+# ========== 条目AI分析队列（Redis Stream） ==========
+
+ENTRY_ANALYSIS_STREAM_MAXLEN = 100000
+
+
+def get_entry_analysis_stream_key() -> str:
+    """获取条目AI分析任务的Stream key"""
+    return f"{settings.REDIS_KEY_PREFIXES['ENTRY_ANALYSIS']}stream"
+
+
+def get_entry_analysis_dead_letter_key() -> str:
+    """获取条目AI分析死信Stream的key（投递次数达到上限的任务）"""
+    return f"{settings.REDIS_KEY_PREFIXES['ENTRY_ANALYSIS']}dead_letter"
+
+
+async def enqueue_entry_analysis(entry_id: str, user_id: str) -> str:
+    """
+    将条目AI分析任务写入Redis Stream
+    
+    消息只携带ID，条目内容由消费者从数据库读取，日记正文不落入Redis
+    
+    参数:
+        entry_id: 条目ID
+        user_id: 用户ID
+        
+    返回:
+        Stream消息ID
+    """
+    r = get_redis()
+    message_id = await r.xadd(
+        get_entry_analysis_stream_key(),
+        {"entry_id": entry_id, "user_id": user_id, "enqueued_at": int(datetime.now().timestamp())},
+        maxlen=ENTRY_ANALYSIS_STREAM_MAXLEN,
+        approximate=True
+    )
+    logger.debug("条目 %s 的AI分析任务已入队: %s", entry_id, message_id)
+    return message_id
+
+
+# ========== 用户数据版本（统计类缓存失效） ==========
+
+USER_DATA_VERSION_TTL = 3600 * 24 * 30  # 版本号保留30天，远长于统计缓存的有效期
+
+
+def _get_user_data_version_key(user_id: str) -> str:
+    """获取用户数据版本号的key"""
+    return f"{settings.REDIS_KEY_PREFIXES['USER_DATA_VERSION']}{user_id}"
+
+
+async def get_user_data_version(user_id: str) -> int:
+    """
+    获取用户记录数据的版本号
+    
+    参数:
+        user_id: 用户ID
+        
+    返回:
+        版本号，从未写入过时为0
+    """
+    r = get_redis()
+    version = await r.get(_get_user_data_version_key(user_id))
+    return int(version or 0)
+
+
+async def bump_user_data_version(user_id: str) -> int:
+    """
+    递增用户记录数据的版本号，使基于旧版本号的统计缓存全部失效
+    
+    参数:
+        user_id: 用户ID
+        
+    返回:
+        递增后的版本号
+    """
+    r = get_redis()
+    key = _get_user_data_version_key(user_id)
+    async with r.pipeline(transaction=True) as pipe:
+        pipe.incr(key)
+        pipe.expire(key, USER_DATA_VERSION_TTL)
+        version, _ = await pipe.execute()
+    return version
+
+
 # ========== 聊天会话相关的Redis操作封装 ==========
 
 async def get_chat_session(session_id: str):
@@ -102,13 +189,28 @@ async def get_chat_session(session_id: str):
     return await get_cache(session_key)
 
 
-async def set_chat_session(session_id: str, session_data: dict, ttl: int = None):
+async def get_chat_session_raw(session_id: str):
+    """
+    获取聊天会话历史的原始JSON（不做反序列化，交由调用方直接解析为模型）
+    
+    参数:
+        session_id: 会话ID
+        
+    返回:
+        会话历史JSON（bytes/str），如果不存在返回None
+    """
+    session_key = f"{settings.REDIS_KEY_PREFIXES['CHAT_SESSION']}{session_id}"
+    r = get_redis()
+    return await r.get(session_key)
+
+
+async def set_chat_session(session_id: str, session_data, ttl: int = None):
     """
     保存聊天会话历史
     
     参数:
         session_id: 会话ID
-        session_data: 会话历史数据
+        session_data: 会话历史数据（dict，或已序列化好的JSON字符串）
         ttl: 过期时间（秒），默认使用settings.WORKFLOW_SESSION_TTL
     """
     if ttl is None:
@@ -117,10 +219,55 @@ async def set_chat_session(session_id: str, session_data: dict, ttl: int = None)
     r = get_redis()
     
     # 设置数据并添加过期时间
-    await r.setex(session_key, ttl, json.dumps(session_data))
+    payload = session_data if isinstance(session_data, str) else json.dumps(session_data)
+    await r.setex(session_key, ttl, payload)
     logger.debug(f"会话 {session_id} 已保存到Redis，TTL: {ttl}秒")
 
 
+# 原子追加会话消息：在Redis服务端完成 读取-追加-写回，避免并发写入丢失
+_APPEND_CHAT_MESSAGES_LUA = """
+local raw = redis.call('GET', KEYS[1])
+if not raw then
+    return -1
+end
+local session = cjson.decode(raw)
+for _, message in ipairs(cjson.decode(ARGV[1])) do
+    table.insert(session.messages, message)
+end
+session.message_count = #session.messages
+session.timestamp = tonumber(ARGV[2])
+redis.call('SET', KEYS[1], cjson.encode(session), 'EX', tonumber(ARGV[3]))
+return session.message_count
+"""
+
+
+async def append_chat_messages(session_id: str, messages: list, timestamp: int, ttl: int = None):
+    """
+    向聊天会话原子追加消息（单次往返，服务端执行Lua脚本）
+    
+    参数:
+        session_id: 会话ID
+        messages: 待追加的消息字典列表
+        timestamp: 会话最新时间戳
+        ttl: 过期时间（秒），默认使用settings.WORKFLOW_SESSION_TTL
+        
+    返回:
+        追加后的消息总数，会话不存在时返回None
+    """
+    if ttl is None:
+        ttl = settings.WORKFLOW_SESSION_TTL
+    session_key = f"{settings.REDIS_KEY_PREFIXES['CHAT_SESSION']}{session_id}"
+    r = get_redis()
+    
+    # register_script 使用EVALSHA执行，脚本未缓存时自动回退为加载脚本
+    script = r.register_script(_APPEND_CHAT_MESSAGES_LUA)
+    message_count = await script(keys=[session_key], args=[json.dumps(messages), timestamp, ttl])
+    if message_count < 0:
+        return None
+    logger.debug("会话 %s 已追加%d条消息，TTL: %s秒", session_id, len(messages), ttl)
+    return message_count
+
+
 async def get_user_sessions(user_id: str):
     """
     获取用户的会话列表
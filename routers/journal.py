@@ -55,25 +55,23 @@ def _entry_to_response(entry) -> EntryResponse:
     if entry.events_json and isinstance(entry.events_json, dict):
         events = entry.events_json.get("events", [])
     
-    # 转换图片（使用服务层预加载的缓存，避免触发ORM懒加载）
+    # 转换图片（需由服务层预加载，避免触发ORM懒加载）
     images = []
-    cached_images = getattr(entry, "_images_cache", None)
-    if cached_images:
-        for img in cached_images:
-            images.append(EntryImageResponse(
-                id=img.id,
-                image_url=img.image_url,
-                thumbnail_url=img.thumbnail_url,
-                upload_status=img.upload_status,
-                is_live_photo=img.is_live_photo,
-                sort_order=img.sort_order
-            ))
+    for img in entry.images:
+        images.append(EntryImageResponse(
+            id=img.id,
+            image_url=img.image_url,
+            thumbnail_url=img.thumbnail_url,
+            upload_status=img.upload_status,
+            is_live_photo=img.is_live_photo,
+            sort_order=img.sort_order
+        ))
     
-    # 转换标签（同样使用缓存）
+    # 转换标签（同样需预加载）
     tags = []
-    cached_tags = getattr(entry, "_tags_cache", None)
-    if cached_tags:
-        for tag in cached_tags:
+    for entry_tag in entry.tags:
+        tag = entry_tag.tag
+        if tag:
             tags.append(TagResponse(
                 id=tag.id,
                 name=tag.name,
@@ -165,20 +163,8 @@ async def create_entry(
 
         allowed_status = {"pending", "uploading", "success", "failed"}
         
-        # 准备图片数据
-        images_data = []
-        for img in request.images:
-            if img.upload_status not in allowed_status:
-                raise HTTPException(status_code=400, detail="图片上传状态不合法")
-            images_data.append(
-                {
-                    "image_url": img.image_url,
-                    "is_live_photo": img.is_live_photo,
-                    "sort_order": img.sort_order,
-                    "upload_status": img.upload_status,
-                    "thumbnail_url": img.thumbnail_url
-                }
-            )
+        if any(img.upload_status not in allowed_status for img in request.images):
+            raise HTTPException(status_code=400, detail="图片上传状态不合法")
 
         source_type = request.source_type
         if request.audio_url and source_type != "voice":
@@ -188,7 +174,7 @@ async def create_entry(
         entry = await journal_service.create_entry_with_media_and_tags(
             user_id=user_id,
             text=request.text,
-            images=images_data,
+            images=request.images,
             tag_ids=request.tag_ids,
             source_type=source_type,
             audio_url=request.audio_url,
@@ -8,11 +8,13 @@ from .journal_service import JournalService
 from .insight_service import InsightService
 from .tag_tracking_service import TagTrackingService
 from .flash_moment_service import FlashMomentService
+from .entry_analysis_worker import EntryAnalysisWorker
 
 __all__ = [
     "SessionService",
     "JournalService",
     "InsightService",
     "TagTrackingService",
-    "FlashMomentService"
+    "FlashMomentService",
+    "EntryAnalysisWorker"
 ]
\ No newline at end of file
@@ -0,0 +1,300 @@
+"""
+条目AI分析消费者
+从Redis Stream（消费组）拉取分析任务并执行AI分析，任务处理完成后才确认并删除消息（XACK + XDEL），
+进程重启或扩缩容时未确认的任务会被其他消费者认领并重新处理；
+消息只携带条目ID与用户ID，条目内容从数据库读取；
+投递次数达到上限的任务转入死信Stream并将条目标记为失败，避免毒消息无限重试
+
+也可关闭 ENTRY_ANALYSIS_WORKER_ENABLED 后通过 scripts/run_entry_analysis_worker.py 单独部署消费进程
+"""
+# 标准库导包
+import asyncio
+import logging
+import os
+import socket
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# 第三方库导包
+from redis.exceptions import ResponseError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+# 项目内部导包
+from config import settings
+from llm.client import LLMClient
+from redis_client import (
+    get_redis,
+    get_entry_analysis_stream_key,
+    get_entry_analysis_dead_letter_key,
+    ENTRY_ANALYSIS_STREAM_MAXLEN
+)
+from routers.services.journal_service import JournalService
+from storage.database import async_session_factory, commit_session
+from storage.repositories.entry_repository import EntryRepository
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+
+class EntryAnalysisWorker:
+    """条目AI分析消费者"""
+
+    CONSUMER_GROUP = "entry_analysis_workers"
+    BLOCK_MS = 5000  # 无新任务时单次阻塞等待时长
+    CLAIM_IDLE_MS = 60 * 1000  # 超过该时长未确认的任务视为消费者失联，重新认领
+    STALE_TASK_SECONDS = 600  # 条目始终不可见（事务回滚/已删除）的任务，超过该时长后丢弃
+    BATCH_WINDOW_MS = 100  # 未凑满一批时额外等待新任务的时长
+    RETRY_DELAY_SECONDS = 1.0
+    MAX_DELIVERIES = 5  # 单个任务的最大投递次数，超过后转入死信Stream
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker = async_session_factory,
+        concurrency: Optional[int] = None,
+        consumer_name: Optional[str] = None
+    ):
+        """
+        初始化分析消费者
+
+        Args:
+            session_factory: 会话工厂，每个任务使用独立会话
+            concurrency: 单次拉取的任务数（同时也是一次LLM批量分析的条目数）
+            consumer_name: 消费者名称，默认使用 主机名-进程号
+        """
+        self.session_factory = session_factory
+        self.concurrency = concurrency or settings.ENTRY_ANALYSIS_WORKER_CONCURRENCY
+        self.consumer_name = consumer_name or f"{socket.gethostname()}-{os.getpid()}"
+        self.stream_key = get_entry_analysis_stream_key()
+        self.dead_letter_key = get_entry_analysis_dead_letter_key()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def start(self) -> None:
+        """在当前事件循环中启动消费任务"""
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+            logger.info("条目AI分析消费者已启动: consumer=%s", self.consumer_name)
+
+    async def stop(self) -> None:
+        """
+        停止消费任务
+
+        先等待当前批次处理完成（最多一个阻塞周期），超时则直接取消；
+        取消时未确认的任务会由其他消费者重新认领
+        """
+        if self._task is None:
+            return
+        self._stopping = True
+        done, _ = await asyncio.wait({self._task}, timeout=self.BLOCK_MS / 1000 + 1)
+        if not done:
+            self._task.cancel()
+        self._task = None
+        logger.info("条目AI分析消费者已停止: consumer=%s", self.consumer_name)
+
+    async def _ensure_group(self, r) -> None:
+        """创建消费组（已存在时忽略）"""
+        try:
+            await r.xgroup_create(self.stream_key, self.CONSUMER_GROUP, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def _run(self) -> None:
+        """消费主循环：先认领失联消费者遗留的任务，再阻塞读取新任务"""
+        group_ready = False
+        while not self._stopping:
+            try:
+                r = get_redis()
+                if not group_ready:
+                    await self._ensure_group(r)
+                    group_ready = True
+
+                # 认领前先移走投递次数已达上限的任务，不再交给消费者处理
+                await self._dead_letter_exhausted(r)
+
+                _, claimed, *_ = await r.xautoclaim(
+                    self.stream_key,
+                    self.CONSUMER_GROUP,
+                    self.consumer_name,
+                    min_idle_time=self.CLAIM_IDLE_MS,
+                    count=self.concurrency
+                )
+                messages = list(claimed)
+
+                if not messages:
+                    response = await r.xreadgroup(
+                        self.CONSUMER_GROUP,
+                        self.consumer_name,
+                        {self.stream_key: ">"},
+                        count=self.concurrency,
+                        block=self.BLOCK_MS
+                    )
+                    for _, stream_messages in response or []:
+                        messages.extend(stream_messages)
+
+                if messages and len(messages) < self.concurrency and not self._stopping:
+                    # 短暂等待凑批，合并为一次LLM请求
+                    response = await r.xreadgroup(
+                        self.CONSUMER_GROUP,
+                        self.consumer_name,
+                        {self.stream_key: ">"},
+                        count=self.concurrency - len(messages),
+                        block=self.BATCH_WINDOW_MS
+                    )
+                    for _, stream_messages in response or []:
+                        messages.extend(stream_messages)
+
+                if messages:
+                    await self._handle_batch(r, messages)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("条目AI分析消费循环异常: %s", e)
+                await asyncio.sleep(self.RETRY_DELAY_SECONDS)
+
+    async def _handle_batch(self, r, messages: List[Tuple[Any, Optional[Dict[Any, Any]]]]) -> None:
+        """
+        批量处理分析任务：一次查询条目状态、一次LLM请求完成整批分析，
+        再逐条写回结果，成功处理（或确认无需处理）后确认消息
+
+        Args:
+            r: Redis连接
+            messages: Stream消息列表，每项为 (消息ID, 消息字段)
+        """
+        done_ids = []
+        tasks = {}
+        for message_id, fields in messages:
+            if not fields:
+                # 消息已被裁剪（超出MAXLEN），无法处理
+                done_ids.append(message_id)
+                continue
+            fields = {
+                (k.decode() if isinstance(k, bytes) else k): (v.decode() if isinstance(v, bytes) else v)
+                for k, v in fields.items()
+            }
+            tasks[message_id] = fields
+
+        pending = []
+        if tasks:
+            async with self.session_factory() as session:
+                entries = await EntryRepository(session).query_by_filters(
+                    {"id": list({fields.get("entry_id", "") for fields in tasks.values()})}
+                )
+            entries_by_id = {entry.id: entry for entry in entries}
+
+            for message_id, fields in tasks.items():
+                entry_id = fields.get("entry_id", "")
+                entry = entries_by_id.get(entry_id)
+                if entry is None:
+                    # 入队早于请求事务提交时条目可能暂不可见，保留消息等待重新认领
+                    if time.time() - int(fields.get("enqueued_at") or 0) < self.STALE_TASK_SECONDS:
+                        continue
+                    logger.warning("条目不存在，丢弃AI分析任务: entry_id=%s", entry_id)
+                    done_ids.append(message_id)
+                elif entry.status == "sending":
+                    pending.append((message_id, entry_id, entry.content))
+                else:
+                    done_ids.append(message_id)
+
+        if pending:
+            try:
+                results = await LLMClient.instance().analyze_entries([content for _, _, content in pending])
+            except Exception as e:
+                # 批量请求失败时逐条单独分析，由各条目记录失败状态
+                logger.error("批量AI分析失败，回退为逐条分析: error=%s", e)
+                results = [None] * len(pending)
+
+            handled = await asyncio.gather(*(
+                self._apply(entry_id, content, result)
+                for (_, entry_id, content), result in zip(pending, results)
+            ))
+            done_ids.extend(message_id for (message_id, _, _), ok in zip(pending, handled) if ok)
+
+        if done_ids:
+            await self._ack(r, done_ids)
+
+    async def _dead_letter_exhausted(self, r) -> None:
+        """
+        将待认领任务中投递次数达到上限的消息转入死信Stream
+
+        死信消息保留原始字段并记录投递次数，对应条目仍在分析中时标记为失败（用户可手动重试），
+        随后确认并删除原消息
+
+        Args:
+            r: Redis连接
+        """
+        pending = await r.xpending_range(
+            self.stream_key,
+            self.CONSUMER_GROUP,
+            min="-",
+            max="+",
+            count=self.concurrency,
+            idle=self.CLAIM_IDLE_MS
+        )
+        exhausted = {
+            item["message_id"]: item["times_delivered"]
+            for item in pending
+            if item["times_delivered"] >= self.MAX_DELIVERIES
+        }
+        if not exhausted:
+            return
+
+        entry_ids = []
+        for message_id, times_delivered in exhausted.items():
+            messages = await r.xrange(self.stream_key, min=message_id, max=message_id)
+            if not messages:
+                # 消息已被裁剪，直接确认
+                continue
+            fields = dict(messages[0][1])
+            fields["times_delivered"] = times_delivered
+            await r.xadd(
+                self.dead_letter_key,
+                fields,
+                maxlen=ENTRY_ANALYSIS_STREAM_MAXLEN,
+                approximate=True
+            )
+            entry_id = fields.get("entry_id")
+            if entry_id:
+                entry_ids.append(entry_id)
+            logger.warning(
+                "AI分析任务投递次数达到上限，转入死信Stream: entry_id=%s, deliveries=%s",
+                entry_id, times_delivered
+            )
+
+        if entry_ids:
+            async with self.session_factory() as session:
+                repo = EntryRepository(session)
+                entries = await repo.query_by_filters({"id": entry_ids, "status": "sending"})
+                for entry in entries:
+                    await repo.update_values_by_id(entry.id, status="failed")
+                await commit_session(session)
+
+        await self._ack(r, list(exhausted))
+
+    async def _ack(self, r, message_ids: List[Any]) -> None:
+        """确认并删除已处理的消息，处理完的任务不在Stream中保留"""
+        await r.xack(self.stream_key, self.CONSUMER_GROUP, *message_ids)
+        await r.xdel(self.stream_key, *message_ids)
+
+    async def _apply(self, entry_id: str, content: str, analysis_result: Optional[Dict[str, Any]]) -> bool:
+        """
+        在独立会话中写回单个条目的分析结果
+
+        Args:
+            entry_id: 条目ID
+            content: 条目内容
+            analysis_result: 批量分析得到的结果，为None时单独调用LLM分析
+
+        Returns:
+            是否处理成功（失败时不确认消息，等待超时后重新认领）
+        """
+        try:
+            async with self.session_factory() as session:
+                service = JournalService(session)
+                await service._analyze_entry_async(entry_id, content, analysis_result)
+                await commit_session(session)
+            return True
+        except Exception as e:
+            logger.error("处理AI分析任务失败: entry_id=%s, error=%s", entry_id, e)
+            return False
@@ -51,24 +51,18 @@ class FlashMomentService:
         Returns:
             条目列表（按时间倒序）
         """
-        # 获取所有积极情绪的条目
+        # 获取所有积极情绪的条目，图片与标签随查询批量预加载
         entries = await self.entry_repo.get_by_emotion(
             user_id=user_id,
             emotion="positive",
             limit=limit,
-            offset=offset
+            offset=offset,
+            eager=True
         )
-        entries = [
+        return [
             e for e in entries
             if getattr(e, "status", "success") == "success" and getattr(e, "is_visible", True)
         ]
-        
-        # 加载图片信息
-        for entry in entries:
-            images = await self.image_repo.get_by_entry_id(entry.id)
-            entry.images = images
-        
-        return entries
     
     async def get_flash_moment_detail(
         self,
@@ -116,6 +110,5 @@ class FlashMomentService:
             return None
         if entry.emotion != "positive" or entry.status != "success" or not entry.is_visible:
             return None
-        new_count = (entry.share_count or 0) + 1
-        return await self.entry_repo.update_by_id(entry_id, share_count=new_count)
+        return await self.entry_repo.update_by_id(entry_id, share_count=Entry.share_count + 1)
 
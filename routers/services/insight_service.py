@@ -3,20 +3,28 @@
 处理AI洞察卡片的生成、查询等业务逻辑
 """
 # 标准库导包
+import heapq
 import logging
 import json
+import random
+from collections import Counter
+from dataclasses import dataclass
 from datetime import datetime, date, timedelta
-from typing import Optional, List, Dict, Any
+from functools import cached_property
+from typing import Optional, List, Dict, Any, Callable, Awaitable, Tuple
 
 # 第三方库导包
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
 # 项目内部导包
+from storage.models.entry import Entry
 from storage.models.insight_card import InsightCard
 from storage.models.insight_card_config import InsightCardConfig
 from storage.repositories.entry_repository import EntryRepository
 from storage.repositories.insight_card_repository import InsightCardRepository
 from storage.repositories.insight_card_config_repository import InsightCardConfigRepository
+from llm.cache import llm_cache
 from llm.client import LLMClient
 from prompt import (
     DAILY_AFFIRMATION_SYSTEM_PROMPT,
@@ -30,15 +38,62 @@ from prompt import (
 # 配置日志
 logger = logging.getLogger(__name__)
 
+# 一天的起止时间
+_DAY_MIN = datetime.min.time()
+_DAY_MAX = datetime.max.time()
+
+# 无记录时的预设寄语库
+_DEFAULT_AFFIRMATIONS = (
+    "今天也是新的一天，保持积极的心态，一切都会好起来的。",
+    "每一个今天都是新的开始，相信自己，你可以的。",
+    "生活就像一面镜子，你对它笑，它也会对你笑。",
+    "保持微笑，保持希望，美好的事情正在路上。",
+    "每一天都是成长的机会，加油！"
+)
+
+
+def _last_monday() -> date:
+    """计算上周一的日期"""
+    today = date.today()
+    return today - timedelta(days=today.weekday() + 7)
+
+
+@dataclass
+class CardSpec:
+    """洞察卡片生成规格，描述一种系统卡片的数据窗口、取数方式与内容构建方式"""
+    card_type: str
+    label: str
+    data_start: datetime
+    data_end: datetime
+    fetch_entries: Callable[[EntryRepository, datetime, datetime], Awaitable[List[Any]]]
+    build_content: Callable[[List[Any]], Awaitable[Dict[str, Any]]]
+    min_entries: int = 0
+    # 由取数结果得到记录条数（取数返回聚合行时需自定义）
+    count_entries: Callable[[List[Any]], int] = len
+
+
+@dataclass(frozen=True)
+class SystemCardDefault:
+    """系统默认洞察配置（不可变，可在任务间安全共享）"""
+    card_type: str
+    name: str
+    time_range: str
+
+
+_SYSTEM_DEFAULT_CONFIGS = (
+    SystemCardDefault(card_type="daily_affirmation", name="每日寄语", time_range="daily"),
+    SystemCardDefault(card_type="weekly_emotion_map", name="每周情绪地图", time_range="weekly"),
+    SystemCardDefault(card_type="weekly_gratitude_list", name="每周感恩清单", time_range="weekly"),
+)
+# card_type -> (排序序号, 默认配置)，按定义顺序排列
+_INDEX_BY_TYPE = {meta.card_type: (idx, meta) for idx, meta in enumerate(_SYSTEM_DEFAULT_CONFIGS)}
+
 
 class InsightService:
     """洞察服务类"""
-    SYSTEM_DEFAULT_CONFIGS = [
-        {"card_type": "daily_affirmation", "name": "每日寄语", "time_range": "daily"},
-        {"card_type": "weekly_emotion_map", "name": "每周情绪地图", "time_range": "weekly"},
-        {"card_type": "weekly_gratitude_list", "name": "每周感恩清单", "time_range": "weekly"},
-    ]
     CUSTOM_SORT_BASE = 100
+    AFFIRMATION_CACHE_TTL = 3600 * 24  # 寄语缓存24小时
+    EMOTION_SUMMARY_CACHE_TTL = 3600 * 24 * 7  # 周情绪摘要缓存7天
     
     def __init__(self, session: AsyncSession):
         """
@@ -48,21 +103,37 @@ class InsightService:
             session: 数据库会话
         """
         self.session = session
-        self.entry_repo = EntryRepository(session)
         self.card_repo = InsightCardRepository(session)
-        self.config_repo = InsightCardConfigRepository(session)
-        self.llm_client = LLMClient()
+        # 系统默认配置缓存（生命周期与服务实例一致），配置变更时按user_id失效
+        self._default_configs_cache: Dict[str, Dict[str, InsightCardConfig]] = {}
+
+    @cached_property
+    def entry_repo(self) -> EntryRepository:
+        """条目Repository（首次访问时创建）"""
+        return EntryRepository(self.session)
+
+    @cached_property
+    def config_repo(self) -> InsightCardConfigRepository:
+        """洞察配置Repository（首次访问时创建）"""
+        return InsightCardConfigRepository(self.session)
+
+    @cached_property
+    def llm_client(self) -> LLMClient:
+        """LLM客户端（进程级共享实例）"""
+        return LLMClient.instance()
 
     async def _ensure_default_configs(self, user_id: str) -> Dict[str, InsightCardConfig]:
         """
         确保系统默认洞察配置存在
         """
+        if user_id in self._default_configs_cache:
+            return self._default_configs_cache[user_id]
+
         configs = await self.config_repo.get_by_user_id(user_id, is_enabled=None, order_by_sort=False)
         by_type = {cfg.card_type: cfg for cfg in configs if cfg.is_system}
         created_or_updated: Dict[str, InsightCardConfig] = {}
 
-        for idx, meta in enumerate(self.SYSTEM_DEFAULT_CONFIGS):
-            card_type = meta["card_type"]
+        for card_type, (idx, meta) in _INDEX_BY_TYPE.items():
             existing = by_type.get(card_type)
             if existing:
                 if not existing.is_system or existing.sort_order != idx:
@@ -78,9 +149,9 @@ class InsightService:
 
             created = await self.config_repo.create(
                 user_id=user_id,
-                name=meta["name"],
+                name=meta.name,
                 card_type=card_type,
-                time_range=meta["time_range"],
+                time_range=meta.time_range,
                 prompt="",
                 sort_order=idx,
                 is_enabled=True,
@@ -88,73 +159,65 @@ class InsightService:
             )
             created_or_updated[card_type] = created
 
+        self._default_configs_cache[user_id] = created_or_updated
         return created_or_updated
 
     async def _get_system_config(self, user_id: str, card_type: str) -> Optional[InsightCardConfig]:
         configs = await self._ensure_default_configs(user_id)
         return configs.get(card_type)
     
-    async def generate_daily_affirmation(
-        self,
-        user_id: str,
-        target_date: Optional[date] = None
-    ) -> Optional[InsightCard]:
+    async def _generate_card(self, user_id: str, spec: CardSpec) -> Optional[InsightCard]:
         """
-        生成每日寄语
+        按卡片规格执行通用生成流程：校验配置 → 检查是否已生成 → 获取记录 → 生成内容 → 创建卡片
         
-        对应PRD 5.1.2 卡片一：每日寄语
+        配置校验与卡片写入在同一个事务内完成，未处于事务中时在结束时统一提交；
+        记录在同一会话中读取，已有卡片或配置关闭时不再读取记录
         
         Args:
             user_id: 用户ID
-            target_date: 目标日期，如果为None则使用昨天
+            spec: 卡片生成规格
             
         Returns:
             InsightCard实例或None
         """
-        if target_date is None:
-            target_date = date.today() - timedelta(days=1)
-        
-        config = await self._get_system_config(user_id, "daily_affirmation")
+        if self.session.in_transaction():
+            return await self._run_card_pipeline(user_id, spec)
+        async with self.session.begin():
+            return await self._run_card_pipeline(user_id, spec)
+
+    async def _run_card_pipeline(self, user_id: str, spec: CardSpec) -> Optional[InsightCard]:
+        """执行卡片生成流程（由_generate_card负责事务边界）"""
+        data_start, data_end = spec.data_start, spec.data_end
+
+        config = await self._get_system_config(user_id, spec.card_type)
         if not config or not config.is_enabled:
             return None
-
-        # 检查是否已生成
-        data_start = datetime.combine(target_date, datetime.min.time())
-        data_end = datetime.combine(target_date, datetime.max.time())
         
-        existing = await self.card_repo.check_card_exists(
+        # 检查是否已生成，命中时直接返回该卡片，无需读取记录
+        existing = await self.card_repo.get_existing_card(
             user_id=user_id,
-            card_type="daily_affirmation",
+            card_type=spec.card_type,
             data_start_time=data_start,
             data_end_time=data_end
         )
-        
         if existing:
-            return await self.card_repo.get_latest_by_type(user_id, "daily_affirmation")
+            return existing
         
-        # 获取前一日记录
-        entries = await self.entry_repo.get_by_date_range(
-            user_id=user_id,
-            start_time=data_start,
-            end_time=data_end
-        )
+        entries = await spec.fetch_entries(self.entry_repo, data_start, data_end)
         
-        # 分析情绪
-        emotion_summary = self._analyze_emotion_summary(entries)
+        # 数据不足检查
+        entry_count = spec.count_entries(entries)
+        if entry_count < spec.min_entries:
+            logger.info("记录不足，无法生成%s: user_id=%s, count=%d", spec.label, user_id, entry_count)
+            return None
         
-        # 生成寄语
-        if entries:
-            # 有记录：根据情绪生成寄语
-            affirmation = await self._generate_affirmation_by_emotion(emotion_summary, entries)
-        else:
-            # 无记录：从预设库随机选择
-            affirmation = self._get_default_affirmation()
+        content = await spec.build_content(entries)
         
         # 创建卡片
         card = await self.card_repo.create(
             user_id=user_id,
-            card_type="daily_affirmation",
-            content_json={"affirmation": affirmation},
+            card_type=spec.card_type,
+            content_json=content,
             data_start_time=data_start,
             data_end_time=data_end,
             config_id=config.id,
@@ -162,9 +225,51 @@ class InsightService:
             is_hidden=False
         )
         
-        logger.info(f"生成每日寄语成功: card_id={card.id}, user_id={user_id}")
+        logger.info("生成%s成功: card_id=%s, user_id=%s", spec.label, card.id, user_id)
         return card
     
+    async def generate_daily_affirmation(
+        self,
+        user_id: str,
+        target_date: Optional[date] = None
+    ) -> Optional[InsightCard]:
+        """
+        生成每日寄语
+        
+        对应PRD 5.1.2 卡片一：每日寄语
+        
+        Args:
+            user_id: 用户ID
+            target_date: 目标日期，如果为None则使用昨天
+            
+        Returns:
+            InsightCard实例或None
+        """
+        if target_date is None:
+            target_date = date.today() - timedelta(days=1)
+        
+        async def build_content(entries: List[Row]) -> Dict[str, Any]:
+            if entries:
+                # 有记录：根据情绪生成寄语
+                emotion_summary = self._emotion_counts(entries)
+                affirmation = await self._generate_affirmation_by_emotion(emotion_summary, entries)
+            else:
+                # 无记录：从预设库随机选择
+                affirmation = self._get_default_affirmation()
+            return {"affirmation": affirmation}
+        
+        return await self._generate_card(user_id, CardSpec(
+            card_type="daily_affirmation",
+            label="每日寄语",
+            data_start=datetime.combine(target_date, _DAY_MIN),
+            data_end=datetime.combine(target_date, _DAY_MAX),
+            # 寄语只需要情绪，仅查询该列
+            fetch_entries=lambda entry_repo, start, end: entry_repo.list_rows(
+                user_id, (Entry.emotion,), start_time=start, end_time=start + timedelta(days=1)
+            ),
+            build_content=build_content
+        ))
+    
     async def generate_weekly_emotion_map(
         self,
         user_id: str,
@@ -183,70 +288,36 @@ class InsightService:
             InsightCard实例或None
         """
         if week_start is None:
-            # 计算上周一
-            today = date.today()
-            days_since_monday = (today.weekday()) % 7
-            last_monday = today - timedelta(days=days_since_monday + 7)
-            week_start = last_monday
+            week_start = _last_monday()
         
         week_end = week_start + timedelta(days=6)
-        data_start = datetime.combine(week_start, datetime.min.time())
-        data_end = datetime.combine(week_end, datetime.max.time())
-        
-        config = await self._get_system_config(user_id, "weekly_emotion_map")
-        if not config or not config.is_enabled:
-            return None
-
-        # 检查是否已生成
-        existing = await self.card_repo.check_card_exists(
-            user_id=user_id,
-            card_type="weekly_emotion_map",
-            data_start_time=data_start,
-            data_end_time=data_end
-        )
-        
-        if existing:
-            return await self.card_repo.get_latest_by_type(user_id, "weekly_emotion_map")
-        
-        # 获取周记录
-        entries = await self.entry_repo.get_by_date_range(
-            user_id=user_id,
-            start_time=data_start,
-            end_time=data_end
-        )
-        
-        # 数据不足检查
-        if len(entries) < 3:
-            logger.info(f"周记录不足，无法生成情绪地图: user_id={user_id}, count={len(entries)}")
-            return None
-        
-        # 统计情绪分布
-        emotion_stats = self._calculate_emotion_stats(entries)
-        
-        # 计算每日情绪得分
-        daily_scores = self._calculate_daily_emotion_scores(entries, week_start)
         
-        # 生成摘要
-        summary = await self._generate_emotion_summary(emotion_stats, daily_scores, week_start)
-        
-        # 创建卡片
-        card = await self.card_repo.create(
-            user_id=user_id,
-            card_type="weekly_emotion_map",
-            content_json={
+        async def build_content(rows: List[Tuple[date, Optional[str], int]]) -> Dict[str, Any]:
+            # 基于按日/情绪聚合的结果统计情绪分布、每日情绪得分并生成摘要
+            emotion_stats = {"positive": 0, "neutral": 0, "negative": 0}
+            for _, emotion, count in rows:
+                if emotion:
+                    emotion_stats[emotion] = emotion_stats.get(emotion, 0) + count
+            daily_scores, max_day, min_day = self._calculate_daily_emotion_scores(rows, week_start)
+            summary = await self._generate_emotion_summary(emotion_stats, max_day, min_day)
+            return {
                 "emotion_stats": emotion_stats,
                 "daily_scores": daily_scores,
                 "summary": summary
-            },
-            data_start_time=data_start,
-            data_end_time=data_end,
-            config_id=config.id,
-            is_viewed=False,
-            is_hidden=False
-        )
+            }
         
-        logger.info(f"生成每周情绪地图成功: card_id={card.id}, user_id={user_id}")
-        return card
+        return await self._generate_card(user_id, CardSpec(
+            card_type="weekly_emotion_map",
+            label="每周情绪地图",
+            data_start=datetime.combine(week_start, _DAY_MIN),
+            data_end=datetime.combine(week_end, _DAY_MAX),
+            fetch_entries=lambda entry_repo, start, end: entry_repo.aggregate_emotions_by_day(
+                user_id=user_id, start_time=start, end_time=start + timedelta(days=7)
+            ),
+            build_content=build_content,
+            min_entries=3,
+            count_entries=lambda rows: sum(count for _, _, count in rows)
+        ))
     
     async def generate_weekly_gratitude_list(
         self,
@@ -266,74 +337,47 @@ class InsightService:
             InsightCard实例或None
         """
         if week_start is None:
-            # 计算上周一
-            today = date.today()
-            days_since_monday = (today.weekday()) % 7
-            last_monday = today - timedelta(days=days_since_monday + 7)
-            week_start = last_monday
+            week_start = _last_monday()
         
         week_end = week_start + timedelta(days=6)
-        data_start = datetime.combine(week_start, datetime.min.time())
-        data_end = datetime.combine(week_end, datetime.max.time())
-        
-        config = await self._get_system_config(user_id, "weekly_gratitude_list")
-        if not config or not config.is_enabled:
-            return None
-
-        # 检查是否已生成
-        existing = await self.card_repo.check_card_exists(
-            user_id=user_id,
-            card_type="weekly_gratitude_list",
-            data_start_time=data_start,
-            data_end_time=data_end
-        )
-        
-        if existing:
-            return await self.card_repo.get_latest_by_type(user_id, "weekly_gratitude_list")
-        
-        # 获取积极情绪记录
-        positive_entries = await self.entry_repo.get_by_emotion(
-            user_id=user_id,
-            emotion="positive",
-            limit=50  # 获取足够多的记录以便筛选
-        )
-        
-        # 过滤时间范围
-        positive_entries = [
-            e for e in positive_entries
-            if data_start <= e.created_at <= data_end
-        ]
         
-        # 数据不足检查
-        if len(positive_entries) < 1:
-            logger.info(f"积极事件不足，无法生成感恩清单: user_id={user_id}")
-            return None
+        async def fetch_positive_entries(
+            entry_repo: EntryRepository,
+            start: datetime,
+            end: datetime
+        ) -> List[Row]:
+            # 获取本周的积极情绪记录（时间范围在数据库侧过滤），只查询挑选事件所需的列
+            return await entry_repo.list_rows(
+                user_id,
+                (Entry.id, Entry.content, Entry.created_at, Entry.word_count),
+                start_time=start,
+                end_time=start + timedelta(days=7),
+                emotion="positive",
+                limit=50
+            )
         
-        # 选择3-5个代表性事件
-        selected_events = self._select_representative_events(positive_entries, min(5, len(positive_entries)))
+        async def build_content(entries: List[Row]) -> Dict[str, Any]:
+            # 选择3-5个代表性事件
+            return {"events": self._select_representative_events(entries, min(5, len(entries)))}
         
-        # 创建卡片
-        card = await self.card_repo.create(
-            user_id=user_id,
+        return await self._generate_card(user_id, CardSpec(
             card_type="weekly_gratitude_list",
-            content_json={"events": selected_events},
-            data_start_time=data_start,
-            data_end_time=data_end,
-            config_id=config.id,
-            is_viewed=False,
-            is_hidden=False
-        )
-        
-        logger.info(f"生成每周感恩清单成功: card_id={card.id}, user_id={user_id}")
-        return card
+            label="每周感恩清单",
+            data_start=datetime.combine(week_start, _DAY_MIN),
+            data_end=datetime.combine(week_end, _DAY_MAX),
+            fetch_entries=fetch_positive_entries,
+            build_content=build_content,
+            min_entries=1
+        ))
     
-    def _analyze_emotion_summary(self, entries: List) -> Dict[str, int]:
-        """分析情绪摘要"""
-        stats = {"positive": 0, "neutral": 0, "negative": 0}
-        for entry in entries:
-            if entry.emotion:
-                stats[entry.emotion] = stats.get(entry.emotion, 0) + 1
-        return stats
+    def _emotion_counts(self, entries: List) -> Dict[str, int]:
+        """统计各情绪的记录数"""
+        return {
+            "positive": 0,
+            "neutral": 0,
+            "negative": 0,
+            **Counter(entry.emotion for entry in entries if entry.emotion)
+        }
     
     async def _generate_affirmation_by_emotion(
         self,
@@ -345,16 +389,16 @@ class InsightService:
         if total == 0:
             return self._get_default_affirmation()
         
-        positive_ratio = emotion_summary.get("positive", 0) / total
-        negative_ratio = emotion_summary.get("negative", 0) / total
+        positive_count = emotion_summary.get("positive", 0)
+        negative_count = emotion_summary.get("negative", 0)
         
         # 构建提示词
         system_prompt = DAILY_AFFIRMATION_SYSTEM_PROMPT
         
-        # 确定情绪类型并选择对应的提示词模板
-        if positive_ratio > 0.6:
+        # 确定情绪类型并选择对应的提示词模板（count / total > 0.6 等价于 count * 5 > total * 3）
+        if positive_count * 5 > total * 3:
             user_prompt = DAILY_AFFIRMATION_USER_PROMPT_POSITIVE
-        elif negative_ratio > 0.6:
+        elif negative_count * 5 > total * 3:
             user_prompt = DAILY_AFFIRMATION_USER_PROMPT_NEGATIVE
         else:
             user_prompt = DAILY_AFFIRMATION_USER_PROMPT_NEUTRAL
@@ -365,78 +409,80 @@ class InsightService:
         ]
         
         try:
-            affirmation = await self.llm_client.chat(messages, temperature=0.8)
+            affirmation = await self._cached_chat(messages, temperature=0.8, ttl=self.AFFIRMATION_CACHE_TTL)
             return affirmation.strip()
         except Exception as e:
-            logger.error(f"生成寄语失败: {str(e)}")
+            logger.error("生成寄语失败: %s", e)
             return self._get_default_affirmation()
     
+    async def _cached_chat(self, messages: List[Dict[str, str]], temperature: float, ttl: int) -> str:
+        """调用LLM，相同请求（模型、温度、消息）在ttl内直接返回缓存结果"""
+        cache_key = llm_cache.build_key(messages, temperature)
+        cached = await llm_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        reply = await self.llm_client.chat(messages, temperature=temperature)
+        await llm_cache.set(cache_key, reply, ttl)
+        return reply
+    
     def _get_default_affirmation(self) -> str:
         """获取默认寄语"""
-        affirmations = [
-            "今天也是新的一天，保持积极的心态，一切都会好起来的。",
-            "每一个今天都是新的开始，相信自己，你可以的。",
-            "生活就像一面镜子，你对它笑，它也会对你笑。",
-            "保持微笑，保持希望，美好的事情正在路上。",
-            "每一天都是成长的机会，加油！"
-        ]
-        import random
-        return random.choice(affirmations)
-    
-    def _calculate_emotion_stats(self, entries: List) -> Dict[str, int]:
-        """计算情绪统计"""
-        stats = {"positive": 0, "neutral": 0, "negative": 0}
-        for entry in entries:
-            if entry.emotion:
-                stats[entry.emotion] = stats.get(entry.emotion, 0) + 1
-        return stats
+        return random.choice(_DEFAULT_AFFIRMATIONS)
     
     def _calculate_daily_emotion_scores(
         self,
-        entries: List,
+        rows: List[Tuple[date, Optional[str], int]],
         week_start: date
-    ) -> List[Dict[str, Any]]:
-        """计算每日情绪得分"""
-        daily_entries = {}
-        for entry in entries:
-            day = entry.created_at.date()
-            if day not in daily_entries:
-                daily_entries[day] = {"positive": 0, "total": 0}
-            daily_entries[day]["total"] += 1
-            if entry.emotion == "positive":
-                daily_entries[day]["positive"] += 1
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any], Dict[str, Any]]:
+        """
+        计算每日情绪得分
+        
+        Args:
+            rows: 按日期和情绪聚合的(日期, 情绪, 记录数)列表
+            week_start: 周开始日期
+            
+        Returns:
+            (7天得分列表, 得分最高的一天, 得分最低的一天)元组，并列时取较早的一天
+        """
+        # 按距周一的天数分桶：[积极数, 总数]
+        buckets = [[0, 0] for _ in range(7)]
+        for day, emotion, count in rows:
+            offset = (day - week_start).days
+            if 0 <= offset < 7:
+                bucket = buckets[offset]
+                bucket[1] += count
+                if emotion == "positive":
+                    bucket[0] += count
         
         scores = []
-        for i in range(7):
-            day = week_start + timedelta(days=i)
-            day_entries = daily_entries.get(day, {"positive": 0, "total": 0})
-            if day_entries["total"] > 0:
-                score = day_entries["positive"] / day_entries["total"]
-            else:
-                score = 0.0
-            scores.append({
-                "date": day.isoformat(),
+        max_day = min_day = None
+        for offset, (positive_count, total_count) in enumerate(buckets):
+            score = positive_count / total_count if total_count > 0 else 0.0
+            day_score = {
+                "date": (week_start + timedelta(days=offset)).isoformat(),
                 "score": score,
-                "positive_count": day_entries["positive"],
-                "total_count": day_entries["total"]
-            })
+                "positive_count": positive_count,
+                "total_count": total_count
+            }
+            scores.append(day_score)
+            if max_day is None or score > max_day["score"]:
+                max_day = day_score
+            if min_day is None or score < min_day["score"]:
+                min_day = day_score
         
-        return scores
+        return scores, max_day, min_day
     
     async def _generate_emotion_summary(
         self,
         emotion_stats: Dict[str, int],
-        daily_scores: List[Dict[str, Any]],
-        week_start: date
+        max_day: Dict[str, Any],
+        min_day: Dict[str, Any]
     ) -> str:
         """生成情绪摘要"""
         total = sum(emotion_stats.values())
         positive_ratio = emotion_stats.get("positive", 0) / total if total > 0 else 0
         
-        # 找出情绪最高和最低的一天
-        max_day = max(daily_scores, key=lambda x: x["score"])
-        min_day = min(daily_scores, key=lambda x: x["score"])
-        
         system_prompt = EMOTION_SUMMARY_SYSTEM_PROMPT
         user_prompt = EMOTION_SUMMARY_USER_PROMPT.format(
             positive_count=emotion_stats.get('positive', 0),
@@ -455,10 +501,10 @@ class InsightService:
         ]
         
         try:
-            summary = await self.llm_client.chat(messages, temperature=0.5)
+            summary = await self._cached_chat(messages, temperature=0.5, ttl=self.EMOTION_SUMMARY_CACHE_TTL)
             return summary.strip()
         except Exception as e:
-            logger.error(f"生成情绪摘要失败: {str(e)}")
+            logger.error("生成情绪摘要失败: %s", e)
             return f"本周整体情绪积极率为{positive_ratio:.1%}，情绪最高的一天是{max_day['date']}，最低的一天是{min_day['date']}。"
     
     def _select_representative_events(
@@ -467,14 +513,8 @@ class InsightService:
         count: int
     ) -> List[Dict[str, Any]]:
         """选择代表性事件"""
-        # 简单策略：选择字数较多、较完整的记录
-        sorted_entries = sorted(
-            entries,
-            key=lambda e: e.word_count or 0,
-            reverse=True
-        )
-        
-        selected = sorted_entries[:count]
+        # 简单策略：选择字数较多、较完整的记录（只需前count条，无需全量排序）
+        selected = heapq.nlargest(count, entries, key=lambda e: e.word_count or 0)
         return [
             {
                 "id": entry.id,
@@ -504,11 +544,17 @@ class InsightService:
         try:
             await self._ensure_default_configs(user_id)
             configs = await self.config_repo.get_by_user_id(user_id, is_enabled=None, order_by_sort=False)
-            system_config_map = {cfg.card_type: cfg for cfg in configs if cfg.is_system}
-            custom_config_map = {cfg.id: cfg for cfg in configs if not cfg.is_system}
-            enabled_system_types = {cfg.card_type for cfg in configs if cfg.is_system and cfg.is_enabled}
-            disabled_system_types = {cfg.card_type for cfg in configs if cfg.is_system and not cfg.is_enabled}
-            enabled_custom_ids = {cfg.id for cfg in configs if not cfg.is_system and cfg.is_enabled}
+            # 单次遍历构建配置索引
+            system_config_map: Dict[str, InsightCardConfig] = {}
+            custom_config_map: Dict[str, InsightCardConfig] = {}
+            enabled_system_types = set()
+            disabled_system_types = set()
+            for cfg in configs:
+                if cfg.is_system:
+                    system_config_map[cfg.card_type] = cfg
+                    (enabled_system_types if cfg.is_enabled else disabled_system_types).add(cfg.card_type)
+                else:
+                    custom_config_map[cfg.id] = cfg
 
             if card_type:
                 cards = await self.card_repo.get_by_card_type(
@@ -524,26 +570,21 @@ class InsightService:
                     is_hidden=is_hidden
                 )
 
+            # 只有停用、没有启用的系统卡片类型
+            disabled_only_types = disabled_system_types - enabled_system_types
             filtered = []
             for card in cards:
-                try:
-                    if card.config_id:
-                        cfg = custom_config_map.get(card.config_id) or system_config_map.get(card.card_type)
-                        if cfg and not cfg.is_enabled:
-                            continue
-                        if cfg and not cfg.is_system and cfg.id not in enabled_custom_ids:
-                            continue
-                    else:
-                        if card.card_type in disabled_system_types and card.card_type not in enabled_system_types:
-                            continue
-                    filtered.append(card)
-                except Exception as e:
-                    logger.warning(f"过滤卡片时出错: card_id={card.id}, error={str(e)}")
+                if card.config_id:
+                    cfg = custom_config_map.get(card.config_id) or system_config_map.get(card.card_type)
+                    if cfg and not cfg.is_enabled:
+                        continue
+                elif card.card_type in disabled_only_types:
                     continue
+                filtered.append(card)
 
             return filtered
         except Exception as e:
-            logger.error(f"get_user_cards 失败: user_id={user_id}, error={str(e)}", exc_info=True)
+            logger.error("get_user_cards 失败: user_id=%s, error=%s", user_id, e, exc_info=True)
             raise
     
     async def get_card_detail(self, card_id: str, user_id: str) -> Optional[InsightCard]:
@@ -609,6 +650,7 @@ class InsightService:
         if current_count >= 10:
             raise ValueError("自定义洞察最多10个")
         sort_order = self.CUSTOM_SORT_BASE + current_count
+        self._default_configs_cache.pop(user_id, None)
         return await self.config_repo.create(
             user_id=user_id,
             name=name,
@@ -643,6 +685,7 @@ class InsightService:
             update_data["prompt"] = prompt
         if not update_data:
             return config
+        self._default_configs_cache.pop(user_id, None)
         return await self.config_repo.update_by_id(config_id, **update_data)
 
     async def delete_config(self, config_id: str, user_id: str) -> bool:
@@ -650,8 +693,9 @@ class InsightService:
         config = await self.config_repo.get_by_id(config_id)
         if not config or config.user_id != user_id:
             return False
+        self._default_configs_cache.pop(user_id, None)
         if config.is_system:
-            await self.config_repo.update_by_id(config_id, is_enabled=False)
+            await self.config_repo.update_values_by_id(config_id, is_enabled=False)
             return True
         return await self.config_repo.delete_by_id(config_id)
 
@@ -660,6 +704,7 @@ class InsightService:
         config = await self.config_repo.get_by_id(config_id)
         if not config or config.user_id != user_id:
             return None
+        self._default_configs_cache.pop(user_id, None)
         return await self.config_repo.update_by_id(config_id, is_enabled=is_enabled)
 
     async def reorder_configs(self, user_id: str, config_ids: List[str]) -> List[InsightCardConfig]:
@@ -674,6 +719,7 @@ class InsightService:
             config_id: self.CUSTOM_SORT_BASE + idx
             for idx, config_id in enumerate(config_ids)
         }
+        self._default_configs_cache.pop(user_id, None)
         await self.config_repo.update_sort_orders(order_map)
         return await self.config_repo.get_by_user_id(user_id, is_enabled=None, order_by_sort=True)
     
@@ -682,4 +728,5 @@ class InsightService:
         config = await self.config_repo.get_by_id(config_id)
         if not config or config.user_id != user_id:
             return None
+        self._default_configs_cache.pop(user_id, None)
         return await self.config_repo.toggle_enabled(config_id)
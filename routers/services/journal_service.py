@@ -5,20 +5,24 @@
 # 标准库导包
 import logging
 import asyncio
-from datetime import datetime, date, timedelta
+from datetime import datetime, date, time, timedelta
 from typing import Optional, List, Dict, Any
 
 # 第三方库导包
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 # 项目内部导包
 from config import settings
 from integrations.aliyun.asr import AliyunASRClient
 from integrations.aliyun.green import AliyunGreenClient
 from llm.client import LLMClient
+from models import EntryImageRequest
+from redis_client import enqueue_entry_analysis, bump_user_data_version
+from storage.database import async_session_factory, add_after_commit, commit_session
 from storage.models.entry import Entry
 from storage.models.tag import Tag
 from storage.repositories.entry_repository import EntryRepository
+from storage.repositories.entry_daily_stat_repository import EntryDailyStatRepository
 from storage.repositories.entry_image_repository import EntryImageRepository
 from storage.repositories.entry_tag_repository import EntryTagRepository
 from storage.repositories.tag_repository import TagRepository
@@ -26,6 +30,10 @@ from storage.repositories.tag_repository import TagRepository
 # 配置日志
 logger = logging.getLogger(__name__)
 
+# 阿里云客户端（进程级共享，避免每个请求重复解析配置、重建连接）
+_asr_client = AliyunASRClient.from_settings(settings)
+_green_client = AliyunGreenClient.from_settings(settings)
+
 
 class JournalService:
     """日记服务类"""
@@ -35,29 +43,44 @@ class JournalService:
         "社交": {"社交", "朋友", "家庭", "同事"},
         "健康": {"健康", "运动", "锻炼", "睡眠"},
     }
+    # 别名 -> 标准标签的反向索引，类定义时构建一次
+    _ALIAS_TO_CANONICAL = {
+        alias: canonical
+        for canonical, aliases in DEFAULT_TAG_ALIASES.items()
+        for alias in aliases
+    }
+    _VALID_EMOTIONS = frozenset({"positive", "neutral", "negative"})
     FREE_TAG_LIMIT = 3
+    MAX_CONTENT_LENGTH = 5000
     
-    def __init__(self, session: AsyncSession):
+    def __init__(
+        self,
+        session: AsyncSession,
+        session_factory: async_sessionmaker = async_session_factory
+    ):
         """
         初始化日记服务
         
         Args:
             session: 数据库会话
+            session_factory: 会话工厂，用于进程内后台分析任务创建独立会话
         """
         self.session = session
+        self.session_factory = session_factory
         self.entry_repo = EntryRepository(session)
         self.image_repo = EntryImageRepository(session)
         self.tag_repo = TagRepository(session)
         self.entry_tag_repo = EntryTagRepository(session)
-        self.llm_client = LLMClient()
-        self.asr_client = AliyunASRClient.from_settings(settings)
-        self.green_client = AliyunGreenClient.from_settings(settings)
+        self.daily_stat_repo = EntryDailyStatRepository(session)
+        self.llm_client = LLMClient.instance()
+        self.asr_client = _asr_client
+        self.green_client = _green_client
     
     async def create_entry_with_media_and_tags(
         self,
         user_id: str,
         text: str,
-        images: List[Dict[str, Any]],
+        images: List[EntryImageRequest],
         tag_ids: List[str],
         source_type: str = "text",
         audio_url: Optional[str] = None,
@@ -70,7 +93,7 @@ class JournalService:
         Args:
             user_id: 用户ID
             text: 文本内容
-            images: 图片列表，每个元素包含 image_url, is_live_photo, sort_order
+            images: 图片列表（已由请求模型校验）
             tag_ids: 标签ID列表
             source_type: 来源类型（text/voice）
             audio_url: 语音文件URL
@@ -81,26 +104,29 @@ class JournalService:
             创建的Entry实例
         """
         content_text = (text or "").strip()
+        if source_type == "voice" and not content_text and transcription_text:
+            # 语音优先使用客户端已有转写
+            content_text = transcription_text.strip()
         
-        # 语音占位处理：优先使用已有转写，其次触发占位ASR
-        if source_type == "voice":
-            if not content_text and transcription_text:
-                content_text = transcription_text.strip()
-            if not content_text and audio_url:
-                try:
-                    asr_text, detected_duration = await self.asr_client.transcribe(audio_url)
-                    content_text = asr_text.strip()
-                    if not audio_duration and detected_duration:
-                        audio_duration = detected_duration
-                except Exception as asr_error:
-                    logger.warning("语音转写失败，使用空文本继续: %s", str(asr_error))
-                    content_text = content_text or ""
-        
-        # 校验文本长度
-        if len(content_text) > 5000:
+        # 先校验已提交文本的长度，超长时直接失败，不再走ASR与内容安全检查
+        word_count = len(content_text)
+        if word_count > self.MAX_CONTENT_LENGTH:
             raise ValueError("文本内容最多5000字")
         
-        word_count = len(content_text)
+        # 语音占位处理：无转写文本时触发占位ASR
+        if source_type == "voice" and not content_text and audio_url:
+            try:
+                asr_text, detected_duration = await self.asr_client.transcribe(audio_url)
+                content_text = asr_text.strip()
+                if not audio_duration and detected_duration:
+                    audio_duration = detected_duration
+            except Exception as asr_error:
+                logger.warning("语音转写失败，使用空文本继续: %s", str(asr_error))
+                content_text = content_text or ""
+            
+            word_count = len(content_text)
+            if word_count > self.MAX_CONTENT_LENGTH:
+                raise ValueError("文本内容最多5000字")
         
         # 内容安全检查（占位）
         safety = await self._check_content_safety(content_text, images)
@@ -118,42 +144,123 @@ class JournalService:
             audio_duration=audio_duration
         )
         
-        # 保存图片
-        for idx, image_data in enumerate(images):
-            await self.image_repo.create(
-                entry_id=entry.id,
-                image_url=image_data.get("image_url", ""),
-                thumbnail_url=image_data.get("thumbnail_url"),
-                is_live_photo=image_data.get("is_live_photo", False),
-                sort_order=image_data.get("sort_order", idx),
-                upload_status=image_data.get("upload_status", "success")
-            )
+        # 同一事务内累加日统计
+        await self.daily_stat_repo.add_entry(user_id, entry.created_at.date(), word_count)
+        
+        # 保存图片（单条INSERT批量写入）
+        await self.image_repo.bulk_create([
+            {
+                "entry_id": entry.id,
+                "image_url": image.image_url,
+                "thumbnail_url": image.thumbnail_url,
+                "is_live_photo": image.is_live_photo,
+                "sort_order": image.sort_order,
+                "upload_status": image.upload_status
+            }
+            for image in images
+        ])
         
         # 关联标签
-        for tag_id in tag_ids:
-            await self.entry_tag_repo.add_tag_to_entry(entry.id, tag_id)
+        await self.entry_tag_repo.add_tags_to_entry(entry.id, tag_ids)
         
-        logger.info(f"创建Entry成功: entry_id={entry.id}, user_id={user_id}, word_count={word_count}")
+        logger.info("创建Entry成功: entry_id=%s, user_id=%s, word_count=%d", entry.id, user_id, word_count)
+        self._invalidate_user_stats(user_id)
         
-        # 异步触发AI分析（不阻塞返回），违规内容不分析
+        # 投递AI分析任务（不阻塞返回），违规内容不分析
         if status == "sending":
-            asyncio.create_task(self._analyze_entry_async(entry.id, content_text))
+            self._schedule_analysis(entry.id, user_id, content_text)
         
         return entry
     
-    async def _analyze_entry_async(self, entry_id: str, content: str):
+    def _schedule_analysis(self, entry_id: str, user_id: str, content: str):
+        """
+        投递AI分析任务（在当前事务提交后执行，保证消费方能读到条目）
+        
+        Args:
+            entry_id: 条目ID
+            user_id: 用户ID
+            content: 条目内容（仅进程内执行时使用）
+        """
+        add_after_commit(self.session, lambda: self._enqueue_analysis(entry_id, user_id, content))
+    
+    async def _enqueue_analysis(self, entry_id: str, user_id: str, content: str):
+        """
+        写入AI分析任务
+        
+        优先写入Redis Stream，由EntryAnalysisWorker持久化消费（进程重启不丢任务，消息只含ID）；
+        队列不可用时退回进程内后台任务
+        
+        Args:
+            entry_id: 条目ID
+            user_id: 用户ID
+            content: 条目内容（仅进程内执行时使用）
+        """
+        try:
+            await enqueue_entry_analysis(entry_id, user_id)
+        except Exception as e:
+            logger.warning("AI分析任务入队失败，改为进程内执行: entry_id=%s, error=%s", entry_id, e)
+            asyncio.create_task(self._analyze_entry_in_new_session(entry_id, content))
+    
+    async def _analyze_entry_in_new_session(self, entry_id: str, content: str):
+        """
+        在独立会话中执行AI分析（请求会话在响应后即关闭，后台任务不能复用）
+        
+        Args:
+            entry_id: 条目ID
+            content: 条目内容
+        """
+        try:
+            async with self.session_factory() as session:
+                service = JournalService(session, self.session_factory)
+                await service._analyze_entry_async(entry_id, content)
+                await commit_session(session)
+        except Exception as e:
+            logger.error("进程内AI分析任务失败: entry_id=%s, error=%s", entry_id, e)
+    
+    def _invalidate_user_stats(self, user_id: str):
+        """
+        在当前事务提交后递增用户数据版本号，使追踪统计等缓存失效
+        
+        提交前失效会让并发读请求用旧数据重建缓存，并以新版本号保存
+        
+        Args:
+            user_id: 用户ID
+        """
+        add_after_commit(self.session, lambda: self._bump_user_data_version(user_id))
+    
+    async def _bump_user_data_version(self, user_id: str):
+        """
+        递增用户数据版本号
+        
+        Args:
+            user_id: 用户ID
+        """
+        try:
+            await bump_user_data_version(user_id)
+        except Exception as e:
+            # 缓存最多在TTL内过期，失效失败不影响写入
+            logger.warning("更新用户数据版本失败: user_id=%s, error=%s", user_id, e)
+    
+    async def _analyze_entry_async(
+        self,
+        entry_id: str,
+        content: str,
+        analysis_result: Optional[Dict[str, Any]] = None
+    ):
         """
         异步分析条目（后台任务）
         
         Args:
             entry_id: 条目ID
             content: 条目内容
+            analysis_result: 已批量完成的LLM分析结果，为None时单独调用LLM分析
         """
         try:
-            logger.info(f"开始AI分析: entry_id={entry_id}")
+            logger.info("开始AI分析: entry_id=%s", entry_id)
             
             # 调用LLM分析
-            analysis_result = await self.llm_client.analyze_entry(content)
+            if analysis_result is None:
+                analysis_result = await self.llm_client.analyze_entry(content)
             normalized_tags = self._normalize_tags(analysis_result.get("tags", []))
             normalized_emotion = self._normalize_emotion(analysis_result.get("emotion", "neutral"))
             
@@ -166,12 +273,12 @@ class JournalService:
                 tag_names=normalized_tags
             )
             
-            logger.info(f"AI分析完成: entry_id={entry_id}, emotion={analysis_result.get('emotion')}")
+            logger.info("AI分析完成: entry_id=%s, emotion=%s", entry_id, analysis_result.get("emotion"))
             
         except Exception as e:
-            logger.error(f"AI分析失败: entry_id={entry_id}, error={str(e)}")
+            logger.error("AI分析失败: entry_id=%s, error=%s", entry_id, e)
             # 分析失败时，将状态设为failed
-            await self.entry_repo.update_by_id(
+            await self.entry_repo.update_values_by_id(
                 entry_id,
                 status="failed"
             )
@@ -211,59 +318,56 @@ class JournalService:
         
         # 处理自动标签
         if tag_names:
-            # 查找或创建标签
-            auto_tag_ids = []
-            for tag_name in tag_names:
-                # 先查找系统标签
-                tag = await self.tag_repo.get_by_name(tag_name)
-                if not tag:
-                    # 如果不存在，自动创建对应的系统标签，避免打标失败
-                    logger.info(f"系统标签不存在，自动创建: {tag_name}")
-                    tag = await self.tag_repo.create(
-                        name=tag_name,
-                        tag_type="system",
-                        user_id=None,
-                        is_enabled=True,
-                    )
-                auto_tag_ids.append(tag.id)
+            # 批量查找系统标签，缺失的一次性补建，避免打标失败
+            tags_by_name = {name: tag.id for name, tag in (await self.tag_repo.get_by_names(tag_names)).items()}
+            missing_rows = [
+                {"name": tag_name, "tag_type": "system", "user_id": None, "is_enabled": True}
+                for tag_name in dict.fromkeys(tag_names)
+                if tag_name not in tags_by_name
+            ]
+            if missing_rows:
+                logger.info("系统标签不存在，自动创建: %s", [row["name"] for row in missing_rows])
+                created_rows = await self.tag_repo.bulk_create(missing_rows)
+                tags_by_name.update((row["name"], row["id"]) for row in created_rows)
             
             # 添加自动标签（不覆盖用户手动选择的标签）
-            for tag_id in auto_tag_ids:
-                await self.entry_tag_repo.add_tag_to_entry(entry_id, tag_id)
+            await self.entry_tag_repo.add_tags_to_entry(entry_id, [tags_by_name[name] for name in tag_names])
         
-        logger.info(f"更新Entry AI结果: entry_id={entry_id}, status={status}, emotion={emotion}")
+        logger.info("更新Entry AI结果: entry_id=%s, status=%s, emotion=%s", entry_id, status, emotion)
+        self._invalidate_user_stats(entry.user_id)
         
         return entry
     
     async def _check_content_safety(
         self,
         content: str,
-        images: List[Dict[str, Any]]
+        images: List[EntryImageRequest]
     ) -> Dict[str, Any]:
         """
         内容安全占位检查
         """
         result = {"is_safe": True, "violations": []}
         
-        try:
-            if content:
-                text_res = await self.green_client.check_text(content)
-                if not text_res.get("is_safe", True):
-                    result["is_safe"] = False
-                    result["violations"].append({"type": "text", **text_res})
-            
-            for img in images:
-                image_url = img.get("image_url") or ""
-                if not image_url:
-                    continue
-                img_res = await self.green_client.check_image(image_url)
-                if not img_res.get("is_safe", True):
-                    result["is_safe"] = False
-                    result["violations"].append({"type": "image", "url": image_url, **img_res})
-        
-        except Exception as err:
-            # 内容安全不可用时，放行但记录
-            logger.warning("内容安全检查失败，默认放行: %s", str(err))
+        image_urls = [img.image_url for img in images if img.image_url]
+        if not content and not image_urls:
+            return result
+        
+        # 文本与各图片的检查互不依赖，并发执行
+        checks = []
+        if content:
+            checks.append(({"type": "text"}, self.green_client.check_text(content)))
+        for image_url in image_urls:
+            checks.append(({"type": "image", "url": image_url}, self.green_client.check_image(image_url)))
+        
+        outcomes = await asyncio.gather(*(coro for _, coro in checks), return_exceptions=True)
+        for (violation, _), outcome in zip(checks, outcomes):
+            if isinstance(outcome, Exception):
+                # 内容安全不可用时，放行但记录
+                logger.warning("内容安全检查失败，默认放行: %s", str(outcome))
+                continue
+            if not outcome.get("is_safe", True):
+                result["is_safe"] = False
+                result["violations"].append({**violation, **outcome})
         
         return result
     
@@ -273,15 +377,14 @@ class JournalService:
         """
         normalized: set[str] = set()
         for name in tag_names or []:
-            clean = (name or "").strip()
-            for canonical, aliases in self.DEFAULT_TAG_ALIASES.items():
-                if clean in aliases:
-                    normalized.add(canonical)
+            canonical = self._ALIAS_TO_CANONICAL.get((name or "").strip())
+            if canonical:
+                normalized.add(canonical)
         return list(normalized)[:3]
     
     def _normalize_emotion(self, emotion: str) -> str:
         """校准情绪字段"""
-        if emotion in {"positive", "neutral", "negative"}:
+        if emotion in self._VALID_EMOTIONS:
             return emotion
         return "neutral"
     
@@ -303,21 +406,17 @@ class JournalService:
         if target_date is None:
             target_date = date.today()
         
-        # 计算时间范围（当天的00:00:00到23:59:59）
-        start_time = datetime.combine(target_date, datetime.min.time())
-        end_time = datetime.combine(target_date, datetime.max.time())
+        # 计算时间范围（当天00:00:00起，至次日00:00:00止，不含）
+        start_time = datetime.combine(target_date, time.min)
+        end_time = datetime.combine(target_date + timedelta(days=1), time.min)
         
-        entries = await self.entry_repo.get_by_date_range(
+        # 一并预加载关联数据（图片、标签）
+        return await self.entry_repo.get_by_date_range(
             user_id=user_id,
             start_time=start_time,
-            end_time=end_time
+            end_time=end_time,
+            eager=True
         )
-        
-        # 加载关联数据
-        for entry in entries:
-            await self._load_entry_relations(entry)
-        
-        return entries
 
     async def list_entries_by_range(
         self,
@@ -331,23 +430,19 @@ class JournalService:
         """
         按日期范围获取条目列表（支持分页）
         """
-        start_time = datetime.combine(start_date, datetime.min.time())
-        end_time = datetime.combine(end_date, datetime.max.time())
+        start_time = datetime.combine(start_date, time.min)
+        end_time = datetime.combine(end_date + timedelta(days=1), time.min)
 
-        entries = await self.entry_repo.get_by_date_range(
+        return await self.entry_repo.get_by_date_range(
             user_id=user_id,
             start_time=start_time,
             end_time=end_time,
             emotion=emotion,
             limit=limit,
-            offset=offset
+            offset=offset,
+            eager=True
         )
 
-        for entry in entries:
-            await self._load_entry_relations(entry)
-
-        return entries
-
     async def get_daily_stats(
         self,
         user_id: str,
@@ -357,9 +452,7 @@ class JournalService:
         """
         获取指定日期范围内的日级统计
         """
-        start_time = datetime.combine(start_date, datetime.min.time())
-        end_time = datetime.combine(end_date, datetime.max.time())
-        return await self.entry_repo.get_daily_stats(user_id, start_time, end_time)
+        return await self.daily_stat_repo.get_by_date_range(user_id, start_date, end_date)
 
     async def count_entries_by_range(
         self,
@@ -371,8 +464,8 @@ class JournalService:
         """
         统计日期范围内的记录数量
         """
-        start_time = datetime.combine(start_date, datetime.min.time())
-        end_time = datetime.combine(end_date, datetime.max.time())
+        start_time = datetime.combine(start_date, time.min)
+        end_time = datetime.combine(end_date + timedelta(days=1), time.min)
         return await self.entry_repo.count_by_user_and_date_range(
             user_id=user_id,
             start_time=start_time,
@@ -391,7 +484,8 @@ class JournalService:
         Returns:
             Entry实例或None
         """
-        entry = await self.entry_repo.get_by_id(entry_id)
+        # 一并预加载关联数据（图片、标签）
+        entry = await self.entry_repo.get_by_id_with_relations(entry_id)
         
         if not entry:
             return None
@@ -400,9 +494,6 @@ class JournalService:
         if entry.user_id != user_id:
             return None
         
-        # 加载关联数据
-        await self._load_entry_relations(entry)
-        
         return entry
     
     async def _load_entry_relations(self, entry: Entry):
@@ -412,13 +503,8 @@ class JournalService:
         Args:
             entry: Entry实例
         """
-        # 加载图片（避免触发ORM懒加载，在实例上缓存为普通属性）
-        images = await self.image_repo.get_by_entry_id(entry.id)
-        setattr(entry, "_images_cache", images)
-        
-        # 加载标签（同样走缓存字段）
-        tags = await self.entry_tag_repo.get_tags_by_entry_id(entry.id)
-        setattr(entry, "_tags_cache", tags)
+        # 通过selectinload刷新entry.images / entry.tags，避免异步会话中触发ORM懒加载
+        await self.entry_repo.get_by_id_with_relations(entry.id)
     
     async def retry_entry(self, entry_id: str, user_id: str) -> Optional[Entry]:
         """
@@ -437,7 +523,7 @@ class JournalService:
             return None
         
         if entry.status != "failed":
-            logger.warning(f"Entry状态不是failed，无法重试: entry_id={entry_id}, status={entry.status}")
+            logger.warning("Entry状态不是failed，无法重试: entry_id=%s, status=%s", entry_id, entry.status)
             return entry
         
         # 重置状态为sending
@@ -445,11 +531,11 @@ class JournalService:
         
         if entry:
             # 异步触发AI分析
-            asyncio.create_task(self._analyze_entry_async(entry.id, entry.content))
+            self._schedule_analysis(entry.id, user_id, entry.content)
         
         return entry
     
-    async def get_available_tags(self, user_id: str, is_paid_user: bool = False) -> List[Tag]:
+    async def get_available_tags(self, user_id: str, is_paid_user: bool = False) -> List[Any]:
         """
         获取用户可用的标签列表
         
@@ -457,15 +543,14 @@ class JournalService:
             user_id: 用户ID
             
         Returns:
-            标签列表（系统标签 + 用户自定义标签）
+            标签列表（系统标签 + 用户自定义标签），元素均可按属性访问id/name/tag_type/color/icon
         """
-        tags = await self.tag_repo.get_all_available_tags(user_id, is_enabled=True)
-        if is_paid_user:
-            return tags
+        if not is_paid_user:
+            # 免费用户：仅返回系统标签的前三个，直接在SQL中LIMIT
+            return await self.tag_repo.get_system_tags_limited(self.FREE_TAG_LIMIT)
 
-        # 免费用户：仅返回系统标签的前三个
-        system_tags = [tag for tag in tags if tag.tag_type == "system"]
-        return system_tags[: self.FREE_TAG_LIMIT]
+        # 只读展示：自定义标签只取展示字段，不构造ORM实例
+        return await self.tag_repo.get_available_tag_rows(user_id, is_enabled=True)
 
     async def replace_entry_tags(
         self,
@@ -480,11 +565,12 @@ class JournalService:
         if not entry or entry.user_id != user_id:
             return None
 
-        available_tags = await self.tag_repo.get_all_available_tags(user_id, is_enabled=True)
-        allowed_tag_ids = {tag.id for tag in available_tags}
+        # 只查询待校验的标签ID，而不是拉取用户的全部可用标签
+        allowed_tag_ids = await self.tag_repo.filter_available_tag_ids(user_id, tag_ids)
         filtered_tag_ids = [tid for tid in tag_ids if tid in allowed_tag_ids]
 
         await self.entry_tag_repo.replace_entry_tags(entry_id, filtered_tag_ids)
+        self._invalidate_user_stats(user_id)
         await self._load_entry_relations(entry)
         return entry
 
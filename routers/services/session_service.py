@@ -5,16 +5,17 @@
 # 标准库导包
 import logging
 import time
-import uuid
 from typing import Optional
 
 # 项目内部导包
 from models import SessionHistory, Message, UserInfo
 from redis_client import (
-    get_chat_session,
+    get_chat_session_raw,
     set_chat_session,
+    append_chat_messages,
     add_session_to_user_list
 )
+from utils import uuid7
 
 # 配置日志
 logger = logging.getLogger(__name__)
@@ -42,19 +43,19 @@ class SessionService:
         """
         current_time = int(time.time())
         user_id = user_info.user_id or user_info.mobile
-        actual_session_id = session_id or str(uuid.uuid4())
+        actual_session_id = session_id or uuid7()
         is_new_session = False
 
         # 尝试获取现有会话历史
         session_history = None
         if session_id:
             try:
-                session_data = await get_chat_session(session_id)
+                session_data = await get_chat_session_raw(session_id)
                 if session_data:
-                    session_history = SessionHistory(**session_data)
-                    logger.info(f"找到现有会话 {session_id}，历史消息数: {len(session_history.messages)}")
+                    session_history = SessionHistory.model_validate_json(session_data)
+                    logger.info("找到现有会话 %s，历史消息数: %d", session_id, len(session_history.messages))
             except Exception as e:
-                logger.warning(f"获取会话历史失败: {str(e)}")
+                logger.warning("获取会话历史失败: %s", e)
 
         # 如果没有现有会话，创建新会话
         if not session_history:
@@ -66,7 +67,7 @@ class SessionService:
                 message_count=0
             )
             is_new_session = True
-            logger.info(f"创建新会话 {actual_session_id}")
+            logger.info("创建新会话 %s", actual_session_id)
 
         return session_history, is_new_session, actual_session_id
 
@@ -108,31 +109,25 @@ class SessionService:
             reference_message: 可选的参考信息消息
         """
         try:
-            # 重新获取会话历史并更新
-            session_data = await get_chat_session(session_id)
-            if session_data:
-                updated_session = SessionHistory(**session_data)
-
-                # 添加assistant消息
-                assistant_message = Message(
-                    role="assistant",
-                    content=content,
-                    timestamp=int(time.time())
-                )
-                updated_session.messages.append(assistant_message)
-
-                # 如果有reference消息，也添加到会话历史
+            current_time = int(time.time())
+            new_messages = [Message(role="assistant", content=content, timestamp=current_time)]
+            
+            # 如果有reference消息，也添加到会话历史
+            if reference_message:
+                new_messages.append(reference_message)
+            
+            # 在Redis中原子追加，避免 读取-修改-写回 期间的并发覆盖
+            message_count = await append_chat_messages(
+                session_id,
+                [message.model_dump() for message in new_messages],
+                timestamp=current_time
+            )
+            if message_count is not None:
                 if reference_message:
-                    updated_session.messages.append(reference_message)
-                    logger.info(f"reference消息已添加到会话 {session_id}")
-
-                updated_session.message_count = len(updated_session.messages)
-                updated_session.timestamp = int(time.time())
-
-                await set_chat_session(session_id, updated_session.dict())
-                logger.info(f"assistant回复已保存到会话 {session_id}，总消息数: {updated_session.message_count}")
+                    logger.info("reference消息已添加到会话 %s", session_id)
+                logger.info("assistant回复已保存到会话 %s，总消息数: %d", session_id, message_count)
         except Exception as e:
-            logger.error(f"保存assistant回复失败: {str(e)}")
+            logger.error("保存assistant回复失败: %s", e)
             raise
 
     @staticmethod
@@ -145,10 +140,10 @@ class SessionService:
             session_history: 会话历史对象
         """
         try:
-            await set_chat_session(session_id, session_history.dict())
-            logger.info(f"会话历史已更新，当前消息数: {session_history.message_count}")
+            await set_chat_session(session_id, session_history.model_dump_json())
+            logger.info("会话历史已更新，当前消息数: %d", session_history.message_count)
         except Exception as e:
-            logger.error(f"保存会话历史失败: {str(e)}")
+            logger.error("保存会话历史失败: %s", e)
             raise
 
     @staticmethod
@@ -177,7 +172,7 @@ class SessionService:
 
             # 使用封装的函数添加会话到用户会话列表
             await add_session_to_user_list(user_id, session_info)
-            logger.info(f"新会话 {session_id} 已注册到用户 {user_id} 的会话索引")
+            logger.info("新会话 %s 已注册到用户 %s 的会话索引", session_id, user_id)
         except Exception as e:
-            logger.error(f"更新用户会话索引失败: {str(e)}")
+            logger.error("更新用户会话索引失败: %s", e)
             raise 
\ No newline at end of file
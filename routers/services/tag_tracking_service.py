@@ -4,29 +4,81 @@
 """
 # 标准库导包
 import logging
-from datetime import datetime, date, timedelta
-from typing import Optional, List, Dict, Any
+from datetime import datetime, date, time, timedelta
+from typing import Optional, List, Dict, Any, Tuple
 
 # 第三方库导包
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, func, and_, case, bindparam, Date
 
 # 项目内部导包
+from config import settings
+from redis_client import get_cache, set_cache, get_user_data_version
 from storage.models.entry import Entry
 from storage.models.entry_tag import EntryTag
+from storage.models.tag import Tag
 from storage.repositories.entry_repository import EntryRepository
+from storage.repositories.entry_daily_stat_repository import EntryDailyStatRepository
 from storage.repositories.entry_tag_repository import EntryTagRepository
 from storage.repositories.tag_repository import TagRepository
 
 # 配置日志
 logger = logging.getLogger(__name__)
 
+# 追踪统计查询语句只在导入时构建一次，每次请求仅绑定参数
+_ENTRY_IN_RANGE = and_(
+    Entry.user_id == bindparam("user_id"),
+    Entry.created_at >= bindparam("start_time"),
+    Entry.created_at < bindparam("end_time")
+)
+_TAGGED_ENTRY_IN_RANGE = and_(EntryTag.tag_id == bindparam("tag_id"), _ENTRY_IN_RANGE)
+
+_TAG_BUBBLE_STMT = select(
+    Tag.id,
+    Tag.name,
+    Tag.color,
+    func.count(EntryTag.id).label("event_count")
+).join(
+    EntryTag, Tag.id == EntryTag.tag_id
+).join(
+    Entry, Entry.id == EntryTag.entry_id
+).where(
+    _ENTRY_IN_RANGE
+).group_by(
+    Tag.id, Tag.name, Tag.color
+)
+
+_EMOTION_DISTRIBUTION_STMT = select(
+    Entry.emotion,
+    func.count(Entry.id).label("count")
+).join(
+    EntryTag, EntryTag.entry_id == Entry.id
+).where(
+    _TAGGED_ENTRY_IN_RANGE
+).group_by(
+    Entry.emotion
+)
+
+_DAY_EXPR = func.date(Entry.created_at, type_=Date)
+_EMOTION_TREND_STMT = select(
+    _DAY_EXPR.label("day"),
+    func.sum(case((Entry.emotion == "positive", 1), else_=0)).label("positive"),
+    func.count(Entry.id).label("total")
+).join(
+    EntryTag, EntryTag.entry_id == Entry.id
+).where(
+    _TAGGED_ENTRY_IN_RANGE
+).group_by(
+    _DAY_EXPR
+)
+
 
 class TagTrackingService:
     """标签追踪服务类"""
     
     MIN_RECORDS = 5
     MIN_ACTIVE_DAYS = 3
+    PAST_STATS_CACHE_TTL = 3600 * 24  # 已结束时间段的日统计缓存24小时
     
     def __init__(self, session: AsyncSession):
         """
@@ -39,37 +91,104 @@ class TagTrackingService:
         self.entry_repo = EntryRepository(session)
         self.tag_repo = TagRepository(session)
         self.entry_tag_repo = EntryTagRepository(session)
+        self.daily_stat_repo = EntryDailyStatRepository(session)
     
-    async def has_minimum_data(
+    async def get_overview(
         self,
         user_id: str,
         start_date: date,
+        end_date: date,
+        allow_all_tags: bool = False,
+        compact_heatmap: bool = False
+    ) -> Tuple[Dict[str, Any], List[Any], List[Dict[str, Any]]]:
+        """
+        获取概览页的数据健康度、热力图与标签气泡图
+        
+        健康度与热力图共用同一次按日聚合查询；数据不足时不再查询气泡图
+        
+        Args:
+            user_id: 用户ID
+            start_date: 开始日期
+            end_date: 结束日期
+            allow_all_tags: 是否返回全部标签
+            compact_heatmap: 热力图是否使用紧凑格式
+            
+        Returns:
+            (数据健康度, 热力图数据, 标签气泡图数据)元组
+        """
+        daily_stats = await self._get_daily_stats(user_id, start_date, end_date)
+        data_health = await self.has_minimum_data(user_id, start_date, end_date, daily_stats=daily_stats)
+        if not data_health["has_enough"]:
+            return data_health, [], []
+        
+        heatmap_data = await self.get_activity_heatmap(
+            user_id, start_date, end_date, compact=compact_heatmap, daily_stats=daily_stats
+        )
+        bubble_data = await self.get_tag_bubble_chart(user_id, start_date, end_date, allow_all_tags)
+        return data_health, heatmap_data, bubble_data
+    
+    async def get_tag_charts(
+        self,
+        user_id: str,
+        tag_id: str,
+        start_date: date,
         end_date: date
+    ) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        获取指定标签的情绪分布与情绪曲线
+        
+        Args:
+            user_id: 用户ID
+            tag_id: 标签ID
+            start_date: 开始日期
+            end_date: 结束日期
+            
+        Returns:
+            (情绪分布数据, 情绪曲线数据)元组
+        """
+        emotion_dist = await self.get_emotion_distribution_by_tag(user_id, tag_id, start_date, end_date)
+        emotion_curve = await self.get_emotion_trend_curve(user_id, tag_id, start_date, end_date)
+        return emotion_dist, emotion_curve
+    
+    async def has_minimum_data(
+        self,
+        user_id: str,
+        start_date: date,
+        end_date: date,
+        daily_stats: Optional[List[Dict[str, Any]]] = None
     ) -> Dict[str, Any]:
         """
         判断数据是否满足展示阈值
+        
+        Args:
+            user_id: 用户ID
+            start_date: 开始日期
+            end_date: 结束日期
+            daily_stats: 已查询的按日统计，为None时查询
+            
+        Returns:
+            包含 has_enough、entry_count、active_days 的字典
         """
-        start_time = datetime.combine(start_date, datetime.min.time())
-        end_time = datetime.combine(end_date, datetime.max.time())
+        if daily_stats is None:
+            daily_stats = await self._get_daily_stats(user_id, start_date, end_date)
         
-        entries = await self.entry_repo.get_by_date_range(
-            user_id=user_id,
-            start_time=start_time,
-            end_time=end_time
-        )
-        days = {e.created_at.date() for e in entries}
+        # 按日聚合结果只包含有记录的日期
+        entry_count = sum(day_stat["count"] for day_stat in daily_stats)
+        active_days = len(daily_stats)
         return {
-            "has_enough": len(entries) >= self.MIN_RECORDS and len(days) >= self.MIN_ACTIVE_DAYS,
-            "entry_count": len(entries),
-            "active_days": len(days)
+            "has_enough": entry_count >= self.MIN_RECORDS and active_days >= self.MIN_ACTIVE_DAYS,
+            "entry_count": entry_count,
+            "active_days": active_days
         }
     
     async def get_activity_heatmap(
         self,
         user_id: str,
         start_date: date,
-        end_date: date
-    ) -> List[Dict[str, Any]]:
+        end_date: date,
+        compact: bool = False,
+        daily_stats: Optional[List[Dict[str, Any]]] = None
+    ) -> List[Any]:
         """
         获取记录热力图数据
         
@@ -79,43 +198,80 @@ class TagTrackingService:
             user_id: 用户ID
             start_date: 开始日期
             end_date: 结束日期
+            compact: 是否使用紧凑格式，每个元素为 [date, count, word_count]
+            daily_stats: 已查询的按日统计，为None时查询
             
         Returns:
-            热力图数据列表，每个元素包含 date 和 count
+            热力图数据列表，每个元素包含 date、count 和 word_count
         """
-        start_time = datetime.combine(start_date, datetime.min.time())
-        end_time = datetime.combine(end_date, datetime.max.time())
-        
-        # 获取时间范围内的所有记录
-        entries = await self.entry_repo.get_by_date_range(
-            user_id=user_id,
-            start_time=start_time,
-            end_time=end_time
-        )
-        
-        # 按日期统计
-        daily_counts = {}
-        for entry in entries:
-            day = entry.created_at.date()
-            if day not in daily_counts:
-                daily_counts[day] = {"count": 0, "word_count": 0}
-            daily_counts[day]["count"] += 1
-            daily_counts[day]["word_count"] += entry.word_count or 0
+        if daily_stats is None:
+            # 数据库按日聚合数量与字数，只返回有记录的日期
+            daily_stats = await self._get_daily_stats(user_id, start_date, end_date)
+        daily_counts = {day_stat["date"]: day_stat for day_stat in daily_stats}
         
         # 转换为列表格式
         heatmap_data = []
         current_date = start_date
         while current_date <= end_date:
-            day_data = daily_counts.get(current_date, {"count": 0, "word_count": 0})
-            heatmap_data.append({
-                "date": current_date.isoformat(),
-                "count": day_data["count"],
-                "word_count": day_data["word_count"]
-            })
+            day = current_date.isoformat()
+            day_data = daily_counts.get(day, {"count": 0, "word_count": 0})
+            if compact:
+                # 紧凑格式省去重复的键名，长时间范围下显著减小响应体积
+                heatmap_data.append([day, day_data["count"], day_data["word_count"]])
+            else:
+                heatmap_data.append({
+                    "date": day,
+                    "count": day_data["count"],
+                    "word_count": day_data["word_count"]
+                })
             current_date += timedelta(days=1)
         
         return heatmap_data
     
+    async def _get_daily_stats(
+        self,
+        user_id: str,
+        start_date: date,
+        end_date: date
+    ) -> List[Dict[str, Any]]:
+        """
+        按日读取记录数量与字数（entry_daily_stats 预聚合表）
+        
+        条目创建时间总是当前时间（UTC），已结束时间段只有在回填等写入时才会变化，
+        其结果按用户数据版本号缓存在Redis中
+        
+        Args:
+            user_id: 用户ID
+            start_date: 开始日期
+            end_date: 结束日期
+            
+        Returns:
+            有记录日期的统计列表，每个元素包含 date、count 和 word_count
+        """
+        cache_key = None
+        # created_at 与日统计的日期均为UTC
+        if end_date < datetime.utcnow().date():
+            try:
+                version = await get_user_data_version(user_id)
+                cache_key = (
+                    f"{settings.REDIS_KEY_PREFIXES['TRACKING_CACHE']}daily_stats:"
+                    f"{user_id}:{version}:{start_date.isoformat()}:{end_date.isoformat()}"
+                )
+                cached = await get_cache(cache_key)
+                if cached is not None:
+                    return cached
+            except Exception as e:
+                logger.warning("读取历史日统计缓存失败: %s", e)
+        
+        daily_stats = await self.daily_stat_repo.get_by_date_range(user_id, start_date, end_date)
+        
+        if cache_key:
+            try:
+                await set_cache(cache_key, daily_stats, ttl=self.PAST_STATS_CACHE_TTL)
+            except Exception as e:
+                logger.warning("写入历史日统计缓存失败: %s", e)
+        return daily_stats
+    
     async def get_tag_bubble_chart(
         self,
         user_id: str,
@@ -136,35 +292,14 @@ class TagTrackingService:
         Returns:
             标签气泡图数据列表
         """
-        start_time = datetime.combine(start_date, datetime.min.time())
-        end_time = datetime.combine(end_date, datetime.max.time())
-        
-        # 获取时间范围内的所有记录ID
-        entries = await self.entry_repo.get_by_date_range(
-            user_id=user_id,
-            start_time=start_time,
-            end_time=end_time
-        )
-        entry_ids = [entry.id for entry in entries]
+        start_time = datetime.combine(start_date, time.min)
+        end_time = datetime.combine(end_date + timedelta(days=1), time.min)
         
-        if not entry_ids:
-            return []
-        
-        # 统计每个标签关联的事件数
-        query = select(
-            Tag.id,
-            Tag.name,
-            Tag.color,
-            func.count(EntryTag.id).label("event_count")
-        ).join(
-            EntryTag, Tag.id == EntryTag.tag_id
-        ).where(
-            EntryTag.entry_id.in_(entry_ids)
-        ).group_by(
-            Tag.id, Tag.name, Tag.color
+        # 关联条目表过滤用户和时间，统计每个标签关联的事件数
+        result = await self.session.execute(
+            _TAG_BUBBLE_STMT,
+            {"user_id": user_id, "start_time": start_time, "end_time": end_time}
         )
-        
-        result = await self.session.execute(query)
         rows = result.all()
         
         bubble_data = []
@@ -202,43 +337,22 @@ class TagTrackingService:
         Returns:
             情绪分布数据
         """
-        start_time = datetime.combine(start_date, datetime.min.time())
-        end_time = datetime.combine(end_date, datetime.max.time())
-        
-        # 获取该标签下的所有条目ID
-        entry_ids = await self.entry_tag_repo.get_entry_ids_by_tag_id(tag_id)
-        
-        if not entry_ids:
-            return {
-                "positive": 0,
-                "neutral": 0,
-                "negative": 0,
-                "total": 0,
-                "positive_percent": 0.0,
-                "neutral_percent": 0.0,
-                "negative_percent": 0.0
-            }
-        
-        # 获取这些条目并过滤时间和用户
-        query = select(Entry).where(
-            and_(
-                Entry.id.in_(entry_ids),
-                Entry.user_id == user_id,
-                Entry.created_at >= start_time,
-                Entry.created_at <= end_time
-            )
-        )
+        start_time = datetime.combine(start_date, time.min)
+        end_time = datetime.combine(end_date + timedelta(days=1), time.min)
         
-        result = await self.session.execute(query)
-        entries = list(result.scalars().all())
+        # 关联标签表，在数据库中按情绪聚合
+        result = await self.session.execute(
+            _EMOTION_DISTRIBUTION_STMT,
+            {"tag_id": tag_id, "user_id": user_id, "start_time": start_time, "end_time": end_time}
+        )
         
-        # 统计情绪分布
+        # 统计情绪分布（未分析的条目计入总数，但不计入任何情绪）
         emotion_counts = {"positive": 0, "neutral": 0, "negative": 0}
-        for entry in entries:
-            if entry.emotion:
-                emotion_counts[entry.emotion] = emotion_counts.get(entry.emotion, 0) + 1
-        
-        total = len(entries)
+        total = 0
+        for emotion, count in result.all():
+            total += count
+            if emotion:
+                emotion_counts[emotion] = emotion_counts.get(emotion, 0) + count
         
         return {
             "positive": emotion_counts.get("positive", 0),
@@ -269,39 +383,24 @@ class TagTrackingService:
             end_date: 结束日期
             
         Returns:
-            情绪曲线数据列表
+            情绪曲线数据列表（标签下没有任何条目时为空列表）
         """
-        start_time = datetime.combine(start_date, datetime.min.time())
-        end_time = datetime.combine(end_date, datetime.max.time())
-        
-        # 获取该标签下的所有条目ID
-        entry_ids = await self.entry_tag_repo.get_entry_ids_by_tag_id(tag_id)
+        start_time = datetime.combine(start_date, time.min)
+        end_time = datetime.combine(end_date + timedelta(days=1), time.min)
         
-        if not entry_ids:
-            return []
-        
-        # 获取这些条目并过滤时间和用户
-        query = select(Entry).where(
-            and_(
-                Entry.id.in_(entry_ids),
-                Entry.user_id == user_id,
-                Entry.created_at >= start_time,
-                Entry.created_at <= end_time
-            )
+        # 关联标签表，在数据库中按日期聚合积极条目数与总数
+        result = await self.session.execute(
+            _EMOTION_TREND_STMT,
+            {"tag_id": tag_id, "user_id": user_id, "start_time": start_time, "end_time": end_time}
         )
+        daily_stats = {
+            row.day: {"positive": int(row.positive or 0), "total": row.total}
+            for row in result.all()
+        }
         
-        result = await self.session.execute(query)
-        entries = list(result.scalars().all())
-        
-        # 按日期分组统计
-        daily_stats = {}
-        for entry in entries:
-            day = entry.created_at.date()
-            if day not in daily_stats:
-                daily_stats[day] = {"positive": 0, "total": 0}
-            daily_stats[day]["total"] += 1
-            if entry.emotion == "positive":
-                daily_stats[day]["positive"] += 1
+        # 标签下没有任何条目时返回空曲线（而不是全零序列），客户端据此展示空状态
+        if not daily_stats and not await self.entry_tag_repo.exists(tag_id=tag_id):
+            return []
         
         # 计算每日情绪得分
         curve_data = []
@@ -350,33 +449,33 @@ class TagTrackingService:
             offset: 偏移量
             
         Returns:
-            条目列表
+            条目列表（已加载图片与标签）
         """
-        start_time = datetime.combine(start_date, datetime.min.time())
-        end_time = datetime.combine(end_date, datetime.max.time())
-        
-        # 获取该标签下的所有条目ID
-        entry_ids = await self.entry_tag_repo.get_entry_ids_by_tag_id(tag_id)
+        start_time = datetime.combine(start_date, time.min)
+        end_time = datetime.combine(end_date + timedelta(days=1), time.min)
         
-        if not entry_ids:
-            return []
-        
-        # 获取这些条目并过滤时间、用户和情绪
-        entries = await self.entry_repo.get_by_date_range(
-            user_id=user_id,
-            start_time=start_time,
-            end_time=end_time,
-            emotion=emotion
+        # 关联标签表过滤，分页在数据库中完成，并一次性加载图片与标签
+        query = select(Entry).join(
+            EntryTag, EntryTag.entry_id == Entry.id
+        ).where(
+            and_(
+                EntryTag.tag_id == tag_id,
+                Entry.user_id == user_id,
+                Entry.emotion == emotion,
+                Entry.created_at >= start_time,
+                Entry.created_at < end_time
+            )
+        ).order_by(
+            Entry.created_at.desc()
+        ).options(
+            *EntryRepository.RELATION_OPTIONS
         )
         
-        # 过滤出属于该标签的条目
-        filtered_entries = [e for e in entries if e.id in entry_ids]
-        
-        # 应用分页
         if offset:
-            filtered_entries = filtered_entries[offset:]
+            query = query.offset(offset)
         if limit:
-            filtered_entries = filtered_entries[:limit]
+            query = query.limit(limit)
         
-        return filtered_entries
+        result = await self.session.execute(query)
+        return result.scalars().all()
 
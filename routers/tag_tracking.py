@@ -5,7 +5,8 @@
 # 标准库导包
 import logging
 from datetime import date, timedelta
-from typing import Optional
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
 
 # 第三方库导包
 from fastapi import APIRouter, HTTPException, Depends, Query
@@ -23,14 +24,17 @@ from models import (
     EntryListResponse,
     EntryResponse
 )
+from config import settings
+from redis_client import get_cache, set_cache, get_user_data_version
 from storage.database import get_session
 from routers.services.tag_tracking_service import TagTrackingService
-from routers.services.journal_service import JournalService
 from utils import get_current_user_or_mock
 
 # 配置日志
 logger = logging.getLogger(__name__)
 
+TRACKING_CACHE_TTL = 600  # 追踪统计缓存10分钟
+
 # 创建路由器
 router = APIRouter(
     prefix="/tracking",
@@ -48,8 +52,12 @@ def _get_week_range(range_type: str) -> tuple[date, date]:
     Returns:
         (开始日期, 结束日期)元组
     """
-    today = date.today()
-    
+    return _compute_range(date.today(), range_type)
+
+
+@lru_cache(maxsize=8)
+def _compute_range(today: date, range_type: str) -> tuple[date, date]:
+    """按日期缓存范围计算结果，缓存键包含当天日期，跨天自动失效"""
     if range_type == "week":
         # 本周一
         days_since_monday = today.weekday()
@@ -66,10 +74,52 @@ def _get_week_range(range_type: str) -> tuple[date, date]:
     return start_date, end_date
 
 
+async def _get_or_build_tracking_data(
+    user_id: str,
+    cache_parts: Tuple[Any, ...],
+    build: Callable[[], Awaitable[Dict[str, Any]]]
+) -> Dict[str, Any]:
+    """
+    读取追踪统计缓存，未命中时计算并写入
+    
+    缓存键包含用户数据版本号，用户新增/分析完成/修改标签后版本号递增，旧缓存自然失效；
+    Redis不可用时直接计算
+    
+    Args:
+        user_id: 用户ID
+        cache_parts: 区分缓存的其他参数（接口、标签、范围、付费状态等）
+        build: 计算统计数据的协程函数
+        
+    Returns:
+        统计数据字典
+    """
+    cache_key = None
+    try:
+        version = await get_user_data_version(user_id)
+        cache_key = settings.REDIS_KEY_PREFIXES["TRACKING_CACHE"] + ":".join(
+            str(part) for part in (user_id, version, *cache_parts)
+        )
+        cached = await get_cache(cache_key)
+        if cached is not None:
+            return cached
+    except Exception as e:
+        logger.warning("读取追踪统计缓存失败: %s", e)
+    
+    data = await build()
+    
+    if cache_key:
+        try:
+            await set_cache(cache_key, data, ttl=TRACKING_CACHE_TTL)
+        except Exception as e:
+            logger.warning("写入追踪统计缓存失败: %s", e)
+    return data
+
+
 @router.get("/overview", response_model=TrackingOverviewResponse, summary="获取追踪概览")
 async def get_tracking_overview(
     range_type: str = Query("week", description="范围类型：week/month"),
     is_paid: bool = Query(False, description="是否付费用户"),
+    compact: bool = Query(False, description="热力图是否使用紧凑格式：[日期, 记录数, 字数]"),
     user_info: UserInfo = Depends(get_current_user_or_mock),
     session: AsyncSession = Depends(get_session)
 ):
@@ -82,31 +132,17 @@ async def get_tracking_overview(
         user_id = user_info.user_id or user_info.mobile
         start_date, end_date = _get_week_range(range_type)
         
-        tracking_service = TagTrackingService(session)
-        data_health = await tracking_service.has_minimum_data(user_id, start_date, end_date)
-        
-        # 获取热力图数据
-        heatmap_data = []
-        bubble_data = []
-        if data_health["has_enough"]:
-            heatmap_data = await tracking_service.get_activity_heatmap(
-                user_id=user_id,
-                start_date=start_date,
-                end_date=end_date
-            )
-            
-            # 获取标签气泡图数据
-            bubble_data = await tracking_service.get_tag_bubble_chart(
+        async def build() -> Dict[str, Any]:
+            tracking_service = TagTrackingService(session)
+            data_health, heatmap_data, bubble_data = await tracking_service.get_overview(
                 user_id=user_id,
                 start_date=start_date,
                 end_date=end_date,
-                allow_all_tags=is_paid
+                allow_all_tags=is_paid,
+                compact_heatmap=compact
             )
-        
-        return TrackingOverviewResponse(
-            success=True,
-            message="获取成功",
-            data={
+            
+            return {
                 "heatmap": heatmap_data,
                 "bubble_chart": bubble_data,
                 "range_type": range_type,
@@ -117,10 +153,19 @@ async def get_tracking_overview(
                 "active_days": data_health["active_days"],
                 "is_paid": is_paid
             }
+        
+        data = await _get_or_build_tracking_data(
+            user_id, ("overview", range_type, start_date, is_paid, compact), build
+        )
+        
+        return TrackingOverviewResponse(
+            success=True,
+            message="获取成功",
+            data=data
         )
         
     except Exception as e:
-        logger.error(f"获取追踪概览失败: {str(e)}")
+        logger.error("获取追踪概览失败: %s", e)
         raise HTTPException(status_code=500, detail=f"获取追踪概览失败: {str(e)}")
 
 
@@ -141,13 +186,11 @@ async def get_tag_tracking(
         user_id = user_info.user_id or user_info.mobile
         start_date, end_date = _get_week_range(range_type)
         
-        tracking_service = TagTrackingService(session)
-        data_health = await tracking_service.has_minimum_data(user_id, start_date, end_date)
-        if not data_health["has_enough"]:
-            return TagTrackingResponse(
-                success=True,
-                message="数据不足，返回空数据",
-                data={
+        async def build() -> Dict[str, Any]:
+            tracking_service = TagTrackingService(session)
+            data_health = await tracking_service.has_minimum_data(user_id, start_date, end_date)
+            if not data_health["has_enough"]:
+                return {
                     "emotion_distribution": {
                         "positive": 0,
                         "neutral": 0,
@@ -166,28 +209,16 @@ async def get_tag_tracking(
                     "active_days": data_health["active_days"],
                     "is_paid": is_paid
                 }
+            
+            # 获取情绪分布与情绪曲线（同一会话内依次查询）
+            emotion_dist, emotion_curve = await tracking_service.get_tag_charts(
+                user_id=user_id,
+                tag_id=tag_id,
+                start_date=start_date,
+                end_date=end_date
             )
-        
-        # 获取情绪分布
-        emotion_dist = await tracking_service.get_emotion_distribution_by_tag(
-            user_id=user_id,
-            tag_id=tag_id,
-            start_date=start_date,
-            end_date=end_date
-        )
-        
-        # 获取情绪曲线
-        emotion_curve = await tracking_service.get_emotion_trend_curve(
-            user_id=user_id,
-            tag_id=tag_id,
-            start_date=start_date,
-            end_date=end_date
-        )
-        
-        return TagTrackingResponse(
-            success=True,
-            message="获取成功",
-            data={
+            
+            return {
                 "emotion_distribution": emotion_dist,
                 "emotion_curve": emotion_curve,
                 "range_type": range_type,
@@ -198,10 +229,19 @@ async def get_tag_tracking(
                 "active_days": data_health["active_days"],
                 "is_paid": is_paid
             }
+        
+        data = await _get_or_build_tracking_data(
+            user_id, ("tag", tag_id, range_type, start_date, is_paid), build
+        )
+        
+        return TagTrackingResponse(
+            success=True,
+            message="获取成功" if data["has_enough_data"] else "数据不足，返回空数据",
+            data=data
         )
         
     except Exception as e:
-        logger.error(f"获取标签追踪数据失败: {str(e)}")
+        logger.error("获取标签追踪数据失败: %s", e)
         raise HTTPException(status_code=500, detail=f"获取标签追踪数据失败: {str(e)}")
 
 
@@ -225,7 +265,6 @@ async def get_tag_entries(
         start_date, end_date = _get_week_range(range_type)
         
         tracking_service = TagTrackingService(session)
-        journal_service = JournalService(session)
         data_health = await tracking_service.has_minimum_data(user_id, start_date, end_date)
         if not data_health["has_enough"]:
             return EntryListResponse(
@@ -245,10 +284,6 @@ async def get_tag_entries(
             offset=offset
         )
         
-        # 加载关联数据
-        for entry in entries:
-            await journal_service._load_entry_relations(entry)
-        
         # 转换为响应格式
         from routers.journal import _entry_to_response
         entry_responses = [_entry_to_response(entry) for entry in entries]
@@ -261,6 +296,6 @@ async def get_tag_entries(
         )
         
     except Exception as e:
-        logger.error(f"获取标签条目列表失败: {str(e)}")
+        logger.error("获取标签条目列表失败: %s", e)
         raise HTTPException(status_code=500, detail=f"获取标签条目列表失败: {str(e)}")
 
@@ -3,7 +3,7 @@ Utils layer
 工具函数层
 """
 
-from .response_parser import parse_assistant_response, is_error_response
+from .response_parser import AssistantResponseParser, parse_assistant_response, is_error_response
 from .stream_handler import StreamHandler
 
-__all__ = ["parse_assistant_response", "is_error_response", "StreamHandler"] 
\ No newline at end of file
+__all__ = ["AssistantResponseParser", "parse_assistant_response", "is_error_response", "StreamHandler"] 
\ No newline at end of file
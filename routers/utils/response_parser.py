@@ -3,10 +3,12 @@
 用于解析SSE流式响应中的assistant回复内容
 """
 # 标准库导包
-import json
 import logging
 import time
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
+
+# 第三方库导包
+import orjson
 
 # 项目内部导包
 from models import Message
@@ -15,6 +17,133 @@ from models import Message
 logger = logging.getLogger(__name__)
 
 
+class AssistantResponseParser:
+    """
+    assistant回复的增量解析器
+    
+    随流式chunk逐行解析SSE数据，只保留解析出的内容；原始响应仅在尚未解析出任何内容时保留，
+    用于非SSE响应或解析不到内容时回退为原始响应
+    """
+    
+    def __init__(self):
+        """初始化解析状态"""
+        self.has_data = False
+        self.is_error = False
+        self.reference_message: Optional[Message] = None
+        self._content_parts: List[str] = []
+        self._raw_chunks: Optional[List[str]] = []
+        self._pending_line: List[str] = []
+    
+    def feed(self, chunk: str) -> None:
+        """
+        接收一个chunk，解析其中已完整的行
+        
+        Args:
+            chunk: 流式响应的chunk
+        """
+        if not chunk:
+            return
+        self.has_data = True
+        if self._raw_chunks is not None:
+            self._raw_chunks.append(chunk)
+        
+        lines = chunk.split('\n')
+        if len(lines) == 1:
+            # 行未结束，暂存等待后续chunk
+            self._pending_line.append(chunk)
+            return
+        
+        self._pending_line.append(lines[0])
+        self._feed_line("".join(self._pending_line))
+        for line in lines[1:-1]:
+            self._feed_line(line)
+        self._pending_line = [lines[-1]] if lines[-1] else []
+    
+    def finish(self) -> Tuple[str, Optional[Message]]:
+        """
+        结束解析，处理最后未以换行结尾的行
+        
+        Returns:
+            Tuple[str, Optional[Message]]: (解析后的内容, 可选的reference消息)
+        """
+        if self._pending_line:
+            self._feed_line("".join(self._pending_line))
+            self._pending_line = []
+        
+        # 如果解析到了有效内容，使用解析后的内容，否则使用原始响应
+        if self._content_parts:
+            return "".join(self._content_parts), self.reference_message
+        return "".join(self._raw_chunks or []), self.reference_message
+    
+    def _add_content(self, content: str) -> None:
+        """累积解析出的内容，已有内容后不再需要保留原始响应"""
+        self._content_parts.append(content if isinstance(content, str) else str(content))
+        self._raw_chunks = None
+    
+    def _feed_line(self, line: str) -> None:
+        """
+        解析单行SSE数据
+        
+        Args:
+            line: 不含换行符的一行数据
+        """
+        # 检查是否包含错误标记
+        if '"error":' in line or 'data: {"error"' in line:
+            self.is_error = True
+        
+        if not line.startswith('data: '):
+            return
+        try:
+            self._parse_data(line[6:])  # 移除'data: '前缀
+        except Exception as e:
+            logger.warning("解析SSE数据行失败，已跳过: %s", e)
+    
+    def _parse_data(self, data_str: str) -> None:
+        """
+        解析单条SSE data内容
+        
+        Args:
+            data_str: 'data: '之后的内容
+        """
+        # 跳过空行和结束标记
+        if not data_str or not data_str.strip() or data_str == '[DONE]':
+            return
+        
+        try:
+            data_obj = orjson.loads(data_str)
+        except orjson.JSONDecodeError:
+            # JSON解析失败时，保留原始字符串
+            self._add_content(data_str)
+            return
+        
+        if isinstance(data_obj, dict):
+            # 只处理 type="summary" 的对象
+            if data_obj.get('type') == 'summary':
+                # 累积summary类型的content
+                if 'content' in data_obj:
+                    self._add_content(data_obj['content'])
+                
+                # 检查是否是最终的summary且包含reference
+                if (data_obj.get('is_final') is True and
+                    'metadata' in data_obj and
+                    'reference' in data_obj['metadata']):
+                    # 创建reference消息
+                    reference_content = orjson.dumps(
+                        data_obj['metadata']['reference'],
+                        option=orjson.OPT_INDENT_2
+                    ).decode()
+                    self.reference_message = Message(
+                        role="reference",
+                        content=reference_content,
+                        timestamp=int(time.time())
+                    )
+                    logger.info("解析到reference信息")
+        
+        elif isinstance(data_obj, str):
+            # 如果直接是字符串，也添加到content_parts
+            self._add_content(data_obj)
+
+
 def parse_assistant_response(response_chunks: list[str]) -> Tuple[str, Optional[Message]]:
     """
     解析assistant回复的流式响应数据
@@ -25,74 +154,10 @@ def parse_assistant_response(response_chunks: list[str]) -> Tuple[str, Optional[
     Returns:
         Tuple[str, Optional[Message]]: (解析后的内容, 可选的reference消息)
     """
-    if not response_chunks:
-        return "", None
-    
-    # 将所有chunks合并成完整的响应
-    full_response = "".join(response_chunks)
-    
-    # 初始化返回值
-    assistant_content = full_response
-    reference_message = None
-    
-    # 检查是否包含SSE格式的数据
-    if "data: " in assistant_content:
-        try:
-            lines = assistant_content.split('\n')
-            content_parts = []
-            
-            for line in lines:
-                if line.startswith('data: '):
-                    data_str = line[6:]  # 移除'data: '前缀
-                    
-                    # 跳过空行和结束标记
-                    if not data_str or not data_str.strip() or data_str == '[DONE]':
-                        continue
-                    
-                    try:
-                        data_obj = json.loads(data_str)
-                        
-                        if isinstance(data_obj, dict):
-                            # 只处理 type="summary" 的对象
-                            if data_obj.get('type') == 'summary':
-                                # 累积summary类型的content
-                                if 'content' in data_obj:
-                                    content_parts.append(data_obj['content'])
-                                
-                                # 检查是否是最终的summary且包含reference
-                                if (data_obj.get('is_final') is True and
-                                    'metadata' in data_obj and
-                                    'reference' in data_obj['metadata']):
-                                    # 创建reference消息
-                                    reference_content = json.dumps(
-                                        data_obj['metadata']['reference'],
-                                        ensure_ascii=False,
-                                        indent=2
-                                    )
-                                    reference_message = Message(
-                                        role="reference",
-                                        content=reference_content,
-                                        timestamp=int(time.time())
-                                    )
-                                    logger.info("解析到reference信息")
-                        
-                        elif isinstance(data_obj, str):
-                            # 如果直接是字符串，也添加到content_parts
-                            content_parts.append(data_obj)
-                    
-                    except json.JSONDecodeError:
-                        # JSON解析失败时，保留原始字符串
-                        content_parts.append(data_str)
-            
-            # 如果解析到了有效内容，使用解析后的内容
-            if content_parts:
-                assistant_content = "".join(content_parts)
-            
-        except Exception as e:
-            logger.warning(f"解析SSE响应失败，使用原始响应: {str(e)}")
-            assistant_content = full_response
-    
-    return assistant_content, reference_message
+    parser = AssistantResponseParser()
+    for chunk in response_chunks:
+        parser.feed(chunk)
+    return parser.finish()
 
 
 def is_error_response(response_chunks: list[str]) -> bool:
@@ -110,9 +175,5 @@ def is_error_response(response_chunks: list[str]) -> bool:
     
     full_response = "".join(response_chunks)
     
-    # 检查是否包含错误标记
-    return (
-        'data: {"error"' in full_response or
-        '"error":' in full_response or
-        full_response.startswith('data: {"error"')
-    ) 
\ No newline at end of file
+    # 检查是否包含错误标记（以错误标记开头的情况已被包含检查覆盖）
+    return 'data: {"error"' in full_response or '"error":' in full_response 
\ No newline at end of file
@@ -4,11 +4,11 @@
 """
 # 标准库导包
 import logging
-from typing import List, AsyncGenerator
+from typing import AsyncGenerator
 
 # 项目内部导包
 from models import Message
-from .response_parser import parse_assistant_response, is_error_response
+from .response_parser import AssistantResponseParser
 from ..services import SessionService
 
 # 配置日志
@@ -26,12 +26,12 @@ class StreamHandler:
             session_id: 会话ID
         """
         self.session_id = session_id
-        self.response_chunks: List[str] = []
+        self.parser = AssistantResponseParser()
         self.stream_completed = False
     
     async def process_stream(self, stream_generator: AsyncGenerator[str, None]) -> AsyncGenerator[str, None]:
         """
-        处理流式响应，累积数据并在结束时保存
+        处理流式响应，边转发边增量解析，并在结束时保存
         
         Args:
             stream_generator: 流式响应生成器
@@ -42,8 +42,9 @@ class StreamHandler:
         try:
             async for chunk in stream_generator:
                 if chunk:
-                    # 累积chunk用于后续保存
-                    self.response_chunks.append(chunk)
+                    # 增量解析chunk，无需保留全部原始响应；已确认为错误响应后不再解析
+                    if not self.parser.is_error:
+                        self.parser.feed(chunk)
                     yield chunk
             
             self.stream_completed = True
@@ -59,16 +60,21 @@ class StreamHandler:
         """
         保存assistant回复到会话历史
         """
-        if not self.response_chunks:
+        if not self.parser.has_data:
             logger.warning("没有响应数据需要保存")
             return
         
+        # 流式过程中已发现错误标记时直接跳过，无需再结束解析
+        if self.parser.is_error:
+            logger.warning("检测到错误响应，跳过保存")
+            return
+        
         try:
-            # 解析响应内容
-            assistant_content, reference_message = parse_assistant_response(self.response_chunks)
+            # 结束解析，获取响应内容
+            assistant_content, reference_message = self.parser.finish()
             
-            # 检查是否是错误响应
-            if is_error_response(self.response_chunks):
+            # 检查最后一行是否为错误响应
+            if self.parser.is_error:
                 logger.warning("检测到错误响应，跳过保存")
                 return
             
@@ -93,8 +99,8 @@ class StreamHandler:
         Args:
             chunk: 响应chunk
         """
-        if chunk:
-            self.response_chunks.append(chunk)
+        if chunk and not self.parser.is_error:
+            self.parser.feed(chunk)
     
     def mark_completed(self) -> None:
         """
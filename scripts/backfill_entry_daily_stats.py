@@ -0,0 +1,56 @@
+"""
+按 entries 表回填 entry_daily_stats 日统计的脚本
+
+entry_daily_stats 只在创建条目时累加，scripts/migrate_journal_tables.py 建表时会自动回填历史条目；
+本脚本用于单独重建某个用户或全部用户的日统计，重复执行会以重新聚合的结果覆盖已有的日统计
+
+用法：
+    python scripts/backfill_entry_daily_stats.py [user_id]
+"""
+# 标准库导包
+import asyncio
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+# 第三方库导包
+
+# 项目内部导包
+from storage import init_db, cleanup_db, async_session_factory
+from storage.repositories.entry_daily_stat_repository import EntryDailyStatRepository
+
+
+async def main(user_id=None):
+    """主函数"""
+    scope = f"用户 {user_id}" if user_id else "所有用户"
+    print(f"开始回填{scope}的条目日统计...")
+    
+    try:
+        await init_db(create_tables=True)
+        
+        async with async_session_factory() as session:
+            repo = EntryDailyStatRepository(session)
+            affected = await repo.rebuild_from_entries(user_id)
+            await session.commit()
+        
+        print(f"✓ 回填完成，受影响行数: {affected}")
+        
+    except Exception as e:
+        print(f"✗ 回填失败: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return 1
+    
+    finally:
+        # 清理数据库连接
+        await cleanup_db()
+    
+    return 0
+
+
+if __name__ == "__main__":
+    exit_code = asyncio.run(main(sys.argv[1] if len(sys.argv) > 1 else None))
+    sys.exit(exit_code)
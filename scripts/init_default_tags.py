@@ -49,22 +49,24 @@ async def init_default_tags():
         try:
             tag_repo = TagRepository(session)
             
-            created_count = 0
-            skipped_count = 0
+            # 一次查询所有已存在的默认标签
+            existing_names = set(await tag_repo.get_by_names(d["name"] for d in DEFAULT_TAGS))
             
+            new_tags = []
             for tag_data in DEFAULT_TAGS:
-                # 检查标签是否已存在
-                existing_tag = await tag_repo.get_by_name(tag_data["name"])
-                
-                if existing_tag:
+                if tag_data["name"] in existing_names:
                     print(f"  - 跳过已存在的标签: {tag_data['name']}")
-                    skipped_count += 1
                     continue
-                
-                # 创建新标签
-                tag = await tag_repo.create(**tag_data)
-                print(f"  ✓ 创建标签: {tag.name} (ID: {tag.id})")
-                created_count += 1
+                new_tags.append(dict(tag_data))
+            
+            # 缺失的标签一次性批量写入
+            await tag_repo.bulk_create(new_tags)
+            await session.commit()
+            for tag_data in new_tags:
+                print(f"  ✓ 创建标签: {tag_data['name']} (ID: {tag_data['id']})")
+            
+            created_count = len(new_tags)
+            skipped_count = len(DEFAULT_TAGS) - created_count
             
             print(f"\n完成！创建了 {created_count} 个标签，跳过了 {skipped_count} 个已存在的标签。")
             return 0
@@ -22,7 +22,7 @@ async def main():
     
     try:
         # 初始化数据库表
-        await init_db()
+        await init_db(create_tables=True)
         print("✓ 数据表创建成功！")
         
         print("\n已创建的数据表：")
@@ -32,6 +32,8 @@ async def main():
         print("  4. entry_tags - 条目标签关联表")
         print("  5. insight_cards - 洞察卡片表")
         print("  6. insight_card_configs - 洞察配置表")
+        print("  7. entry_daily_stats - 条目日统计表")
+        print("\n已有数据表不会被修改，结构升级请执行 scripts/migrate_journal_tables.py")
         
     except Exception as e:
         print(f"✗ 初始化失败: {str(e)}")
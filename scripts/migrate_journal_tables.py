@@ -0,0 +1,315 @@
+"""
+将已有数据库的日记洞察系统数据表升级到当前模型结构的脚本
+
+线上环境启动时不执行create_all（见 storage.database.init_db），已有数据表的结构变更由本脚本完成；
+每个迁移步骤执行前先检查当前表结构，已完成的步骤直接跳过，脚本可重复执行
+
+用法：
+    python scripts/migrate_journal_tables.py
+"""
+# 标准库导包
+import asyncio
+import sys
+from pathlib import Path
+from typing import List
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+# 第三方库导包
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+# 项目内部导包
+from storage import engine, cleanup_db, async_session_factory
+from storage.database import ensure_database_exists
+from storage.models.entry_daily_stat import EntryDailyStat
+from storage.repositories.entry_daily_stat_repository import EntryDailyStatRepository
+
+
+async def _table_exists(conn: AsyncConnection, table: str) -> bool:
+    """当前数据库中是否存在指定表"""
+    result = await conn.execute(
+        text(
+            "SELECT 1 FROM information_schema.TABLES "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table"
+        ),
+        {"table": table}
+    )
+    return result.first() is not None
+
+
+async def _column_type(conn: AsyncConnection, table: str, column: str) -> str:
+    """列的完整类型（如 binary(16)、varchar(36)），列不存在时返回空字符串"""
+    result = await conn.execute(
+        text(
+            "SELECT COLUMN_TYPE FROM information_schema.COLUMNS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND COLUMN_NAME = :column"
+        ),
+        {"table": table, "column": column}
+    )
+    return (result.scalar() or "").lower()
+
+
+async def _index_columns(conn: AsyncConnection, table: str, index: str) -> List[str]:
+    """索引的列（按索引内顺序），索引不存在时返回空列表"""
+    result = await conn.execute(
+        text(
+            "SELECT COLUMN_NAME FROM information_schema.STATISTICS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND INDEX_NAME = :index "
+            "ORDER BY SEQ_IN_INDEX"
+        ),
+        {"table": table, "index": index}
+    )
+    return list(result.scalars())
+
+
+async def _ensure_index(conn: AsyncConnection, table: str, index: str, columns: List[str]):
+    """确保索引存在且列一致，列不同时重建"""
+    existing = await _index_columns(conn, table, index)
+    if existing == columns:
+        return
+    if existing:
+        await conn.execute(text(f"DROP INDEX `{index}` ON `{table}`"))
+    column_sql = ", ".join(f"`{column}`" for column in columns)
+    await conn.execute(text(f"CREATE INDEX `{index}` ON `{table}` ({column_sql})"))
+    print(f"  ✓ 创建索引 {table}.{index} ({', '.join(columns)})")
+
+
+async def _drop_index(conn: AsyncConnection, table: str, index: str):
+    """删除索引（不存在时跳过）"""
+    if await _index_columns(conn, table, index):
+        await conn.execute(text(f"DROP INDEX `{index}` ON `{table}`"))
+        print(f"  ✓ 删除索引 {table}.{index}")
+
+
+async def create_entry_daily_stats(conn: AsyncConnection):
+    """创建 entry_daily_stats 日统计表，并按 entries 回填历史数据"""
+    if not await _table_exists(conn, EntryDailyStat.__tablename__):
+        await conn.run_sync(EntryDailyStat.__table__.create)
+        print("  ✓ 创建 entry_daily_stats 表")
+
+    # 表为空时回填（包括由create_all建出的空表），已有数据说明回填已完成
+    has_rows = (await conn.execute(text("SELECT 1 FROM entry_daily_stats LIMIT 1"))).first()
+    if has_rows:
+        print("  - entry_daily_stats 已有数据，跳过回填")
+        return
+    await conn.commit()
+    async with async_session_factory() as session:
+        affected = await EntryDailyStatRepository(session).rebuild_from_entries()
+        await session.commit()
+    print(f"  ✓ 回填 entry_daily_stats，受影响行数: {affected}")
+
+
+# UUID主键/外键列：(表, 列, 是否可空, 列注释)
+UUID_COLUMNS = [
+    ("entries", "id", False, None),
+    ("entry_images", "id", False, None),
+    ("entry_images", "entry_id", False, None),
+    ("tags", "id", False, None),
+    ("entry_tags", "id", False, None),
+    ("entry_tags", "entry_id", False, None),
+    ("entry_tags", "tag_id", False, None),
+    ("insight_card_configs", "id", False, None),
+    ("insight_cards", "id", False, None),
+    ("insight_cards", "config_id", True, "关联InsightCardConfig，自定义卡片用"),
+]
+
+# 引用UUID列的外键：(表, 列, 被引用表, 删除规则)
+UUID_FOREIGN_KEYS = [
+    ("entry_images", "entry_id", "entries", "CASCADE"),
+    ("entry_tags", "entry_id", "entries", "CASCADE"),
+    ("entry_tags", "tag_id", "tags", "CASCADE"),
+    ("insight_cards", "config_id", "insight_card_configs", "SET NULL"),
+]
+
+
+async def _foreign_key_name(conn: AsyncConnection, table: str, column: str) -> str:
+    """列上外键约束的名称，不存在时返回空字符串"""
+    result = await conn.execute(
+        text(
+            "SELECT CONSTRAINT_NAME FROM information_schema.KEY_COLUMN_USAGE "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND COLUMN_NAME = :column "
+            "AND REFERENCED_TABLE_NAME IS NOT NULL"
+        ),
+        {"table": table, "column": column}
+    )
+    return result.scalar() or ""
+
+
+async def convert_uuid_columns(conn: AsyncConnection):
+    """将UUID主键及外键列由CHAR(36)转换为BINARY(16)（UNHEX(REPLACE(id, '-', ''))）"""
+    pending = [
+        column for column in UUID_COLUMNS
+        if await _column_type(conn, column[0], column[1]) != "binary(16)"
+    ]
+    if not pending:
+        print("  - UUID列均已为BINARY(16)，跳过")
+        return
+
+    # 外键两端类型必须一致，转换期间先删除外键
+    for table, column, _, _ in UUID_FOREIGN_KEYS:
+        name = await _foreign_key_name(conn, table, column)
+        if name:
+            await conn.execute(text(f"ALTER TABLE `{table}` DROP FOREIGN KEY `{name}`"))
+            print(f"  ✓ 删除外键 {table}.{name}")
+
+    for table, column, nullable, comment in pending:
+        null_sql = "NULL" if nullable else "NOT NULL"
+        comment_sql = f" COMMENT '{comment}'" if comment else ""
+        # 先转为二进制串保留原有字节，再原地转换为16字节（只处理尚未转换的36字节值，便于中断后重跑）
+        await conn.execute(text(f"ALTER TABLE `{table}` MODIFY `{column}` VARBINARY(36) {null_sql}"))
+        await conn.execute(text(
+            f"UPDATE `{table}` SET `{column}` = UNHEX(REPLACE(`{column}`, '-', '')) "
+            f"WHERE LENGTH(`{column}`) = 36"
+        ))
+        await conn.execute(text(f"ALTER TABLE `{table}` MODIFY `{column}` BINARY(16) {null_sql}{comment_sql}"))
+        await conn.commit()
+        print(f"  ✓ 转换 {table}.{column}")
+
+    for table, column, referenced, on_delete in UUID_FOREIGN_KEYS:
+        if not await _foreign_key_name(conn, table, column):
+            await conn.execute(text(
+                f"ALTER TABLE `{table}` ADD FOREIGN KEY (`{column}`) "
+                f"REFERENCES `{referenced}` (`id`) ON DELETE {on_delete}"
+            ))
+            print(f"  ✓ 重建外键 {table}.{column} -> {referenced}.id")
+
+
+# 复合索引：(表, 索引名, 列)
+COMPOSITE_INDEXES = [
+    ("entries", "idx_user_created", ["user_id", "created_at", "word_count"]),
+    ("entries", "idx_user_emotion_created", ["user_id", "emotion", "created_at"]),
+    ("entry_tags", "idx_tag_entry", ["tag_id", "entry_id"]),
+    ("tags", "idx_tag_type_enabled", ["tag_type", "is_enabled"]),
+    ("insight_cards", "idx_user_type_data_range", ["user_id", "card_type", "data_start_time", "data_end_time"]),
+    ("insight_cards", "idx_user_type_generated", ["user_id", "card_type", "generated_at"]),
+]
+
+# 已被复合索引（或唯一约束）前缀覆盖的单列索引：(表, 索引名)
+REDUNDANT_INDEXES = [
+    ("entries", "ix_entries_user_id"),
+    ("entries", "ix_entries_created_at"),
+    ("entry_tags", "ix_entry_tags_entry_id"),
+    ("entry_tags", "ix_entry_tags_tag_id"),
+    ("insight_cards", "ix_insight_cards_user_id"),
+]
+
+
+async def sync_composite_indexes(conn: AsyncConnection):
+    """创建复合索引，并删除被其覆盖的单列索引"""
+    # 先建后删：外键列（entry_tags.entry_id/tag_id）在任一时刻都要有可用索引
+    for table, index, columns in COMPOSITE_INDEXES:
+        await _ensure_index(conn, table, index, columns)
+    for table, index in REDUNDANT_INDEXES:
+        await _drop_index(conn, table, index)
+
+
+# user_id列：(表, 是否可空, 列注释)
+USER_ID_COLUMNS = [
+    ("entries", False, None),
+    ("tags", True, "用户ID，自定义标签需要"),
+    ("insight_cards", False, None),
+    ("insight_card_configs", False, None),
+    ("entry_daily_stats", False, None),
+]
+USER_ID_LENGTH = 64
+
+
+async def check_user_id_length(conn: AsyncConnection):
+    """检查已有user_id均不超过64个字符（超长时中止迁移，避免截断）"""
+    for table, _, _ in USER_ID_COLUMNS:
+        if not await _table_exists(conn, table):
+            continue
+        result = await conn.execute(text(f"SELECT MAX(CHAR_LENGTH(`user_id`)) FROM `{table}`"))
+        longest = result.scalar() or 0
+        if longest > USER_ID_LENGTH:
+            raise RuntimeError(f"{table}.user_id 存在长度为{longest}的值，超过{USER_ID_LENGTH}，需先处理这些用户的数据")
+
+
+async def narrow_user_id_columns(conn: AsyncConnection):
+    """将各表user_id列由VARCHAR(100)收窄为VARCHAR(64)"""
+    for table, nullable, comment in USER_ID_COLUMNS:
+        if await _column_type(conn, table, "user_id") in ("", f"varchar({USER_ID_LENGTH})"):
+            continue
+        null_sql = "NULL" if nullable else "NOT NULL"
+        comment_sql = f" COMMENT '{comment}'" if comment else ""
+        await conn.execute(text(
+            f"ALTER TABLE `{table}` MODIFY `user_id` VARCHAR({USER_ID_LENGTH}) {null_sql}{comment_sql}"
+        ))
+        print(f"  ✓ 收窄 {table}.user_id")
+
+
+async def _rename_index(conn: AsyncConnection, table: str, old_name: str, new_name: str):
+    """重命名索引（旧索引不存在或新索引已存在时跳过）"""
+    if await _index_columns(conn, table, old_name) and not await _index_columns(conn, table, new_name):
+        await conn.execute(text(f"ALTER TABLE `{table}` RENAME INDEX `{old_name}` TO `{new_name}`"))
+        print(f"  ✓ 重命名索引 {table}.{old_name} -> {new_name}")
+
+
+async def add_tag_custom_lookup_index(conn: AsyncConnection):
+    """创建 tags(user_id, tag_type, is_enabled) 索引，并删除被其覆盖的 tags.user_id 单列索引"""
+    # 开发环境可能已由create_all建出旧名称的索引
+    await _rename_index(conn, "tags", "ix_tag_custom_lookup", "idx_tag_custom_lookup")
+    await _ensure_index(conn, "tags", "idx_tag_custom_lookup", ["user_id", "tag_type", "is_enabled"])
+    await _drop_index(conn, "tags", "ix_tags_user_id")
+
+
+async def add_tag_name_index(conn: AsyncConnection):
+    """创建 tags(name, tag_type, user_id) 索引，用于按名称查找标签"""
+    await _rename_index(conn, "tags", "ix_tag_name_type_user", "idx_tag_name_type_user")
+    await _ensure_index(conn, "tags", "idx_tag_name_type_user", ["name", "tag_type", "user_id"])
+
+
+# 迁移前检查，任一检查失败时不执行任何迁移步骤
+PRECHECKS = [
+    check_user_id_length,
+]
+
+# 迁移步骤，按顺序执行
+MIGRATIONS = [
+    create_entry_daily_stats,
+    convert_uuid_columns,
+    sync_composite_indexes,
+    narrow_user_id_columns,
+    add_tag_custom_lookup_index,
+    add_tag_name_index,
+]
+
+
+async def main():
+    """主函数"""
+    print("开始迁移日记洞察系统数据表...")
+
+    try:
+        await ensure_database_exists()
+
+        async with engine.connect() as conn:
+            for check in PRECHECKS:
+                await check(conn)
+
+        for step in MIGRATIONS:
+            print(f"\n{step.__doc__}")
+            async with engine.connect() as conn:
+                await step(conn)
+                await conn.commit()
+
+        print("\n✓ 迁移完成！")
+
+    except Exception as e:
+        print(f"✗ 迁移失败: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    finally:
+        # 清理数据库连接
+        await cleanup_db()
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit_code = asyncio.run(main())
+    sys.exit(exit_code)
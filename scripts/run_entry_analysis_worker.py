@@ -0,0 +1,64 @@
+"""
+单独运行条目AI分析消费者的脚本
+
+Web进程设置 ENTRY_ANALYSIS_WORKER_ENABLED=false 后，用本脚本单独部署消费进程，
+可按需启动多个实例（同一消费组内自动分摊任务），收到 SIGINT/SIGTERM 后处理完当前批次再退出
+
+用法：
+    python scripts/run_entry_analysis_worker.py
+"""
+# 标准库导包
+import asyncio
+import logging
+import signal
+import sys
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+# 第三方库导包
+
+# 项目内部导包
+from config import settings
+from storage import init_db, cleanup_db
+from llm.client import LLMClient
+from routers.services import EntryAnalysisWorker
+
+
+async def main():
+    """主函数"""
+    logging.basicConfig(level=settings.LOG_LEVEL.upper())
+
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop_event.set)
+
+    worker = EntryAnalysisWorker()
+    try:
+        await init_db()
+        worker.start()
+        print(f"✓ 条目AI分析消费者已启动: consumer={worker.consumer_name}")
+        await stop_event.wait()
+
+    except Exception as e:
+        print(f"✗ 条目AI分析消费者运行失败: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    finally:
+        # 处理完当前批次后退出，并清理LLM与数据库连接
+        await worker.stop()
+        await LLMClient.shutdown()
+        await cleanup_db()
+
+    print("✓ 条目AI分析消费者已退出")
+    return 0
+
+
+if __name__ == "__main__":
+    exit_code = asyncio.run(main())
+    sys.exit(exit_code)
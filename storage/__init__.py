@@ -5,6 +5,8 @@ Storage层包
 # 项目内部导包
 from .database import (
     get_session,
+    add_after_commit,
+    commit_session,
     init_db,
     cleanup_db,
     Base,
@@ -17,7 +19,8 @@ from .models import (
     Tag,
     EntryTag,
     InsightCard,
-    InsightCardConfig
+    InsightCardConfig,
+    EntryDailyStat
 )
 from .repositories import (
     BaseRepository,
@@ -26,12 +29,15 @@ from .repositories import (
     TagRepository,
     EntryTagRepository,
     InsightCardRepository,
-    InsightCardConfigRepository
+    InsightCardConfigRepository,
+    EntryDailyStatRepository
 )
 
 __all__ = [
     # 数据库连接相关
     "get_session",
+    "add_after_commit",
+    "commit_session",
     "init_db", 
     "cleanup_db",
     "Base",
@@ -45,6 +51,7 @@ __all__ = [
     "EntryTag",
     "InsightCard",
     "InsightCardConfig",
+    "EntryDailyStat",
     
     # Repository相关
     "BaseRepository",
@@ -54,4 +61,5 @@ __all__ = [
     "EntryTagRepository",
     "InsightCardRepository",
     "InsightCardConfigRepository",
+    "EntryDailyStatRepository",
 ]
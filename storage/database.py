@@ -1,12 +1,15 @@
 """Database configuration module."""
 # 标准库导包
+import asyncio
 import logging
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Awaitable, Callable, Optional
 
 # 第三方库导包
-from sqlalchemy import text
+import aiomysql
+import orjson
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 # 项目内部导包
 from config import settings
@@ -20,31 +23,19 @@ class Base(DeclarativeBase):
     pass
 
 
+# 从HOST中分离主机和端口（导入时解析一次），未指定端口时使用3306
+_DB_HOST, _DB_PORT = (settings.DB_HOST.split(':', 1) + ["3306"])[:2]
+
+
 def get_database_url() -> str:
     """构建数据库URL"""
-    # 从HOST中分离主机和端口
-    host_port = settings.DB_HOST
-    if ':' in host_port:
-        host, port = host_port.split(':')
-    else:
-        host = host_port
-        port = "3306"
-    
     # 构建异步MySQL URL
-    database_url = f"mysql+aiomysql://{settings.DB_USER}:{settings.DB_PASSWORD}@{host}:{port}/{settings.DB_NAME}"
-    return database_url
-
-
-def get_admin_database_url() -> str:
-    """构建用于管理（不带具体数据库）的URL"""
-    host_port = settings.DB_HOST
-    if ':' in host_port:
-        host, port = host_port.split(':')
-    else:
-        host = host_port
-        port = "3306"
-    
-    return f"mysql+aiomysql://{settings.DB_USER}:{settings.DB_PASSWORD}@{host}:{port}/mysql"
+    return f"mysql+aiomysql://{settings.DB_USER}:{settings.DB_PASSWORD}@{_DB_HOST}:{_DB_PORT}/{settings.DB_NAME}"
+
+
+def _json_serializer(value) -> str:
+    """JSON列序列化：使用orjson，返回str以兼容aiomysql驱动"""
+    return orjson.dumps(value).decode()
 
 
 # 获取数据库URL
@@ -54,12 +45,18 @@ logger.info(f"数据库连接URL: {DATABASE_URL.replace(settings.DB_PASSWORD, '*
 # 创建异步引擎
 engine = create_async_engine(
     DATABASE_URL,
+    poolclass=AsyncAdaptedQueuePool,
+    pool_pre_ping=True,  # 取出连接时先探活，避免使用已被服务端断开的连接
     pool_size=settings.DB_POOL_SIZE,
     max_overflow=settings.DB_MAX_CONNECTIONS - settings.DB_POOL_SIZE,
     pool_recycle=settings.DB_POOL_RECYCLE,
     pool_timeout=settings.DB_POOL_TIMEOUT,
+    # 语句编译缓存：按语句结构复用编译结果，query_by_filters等会产生较多结构变体，默认500条容易被挤出
+    query_cache_size=settings.DB_QUERY_CACHE_SIZE,
     echo=settings.DEBUG,  # 调试模式下显示SQL语句
     echo_pool=settings.DEBUG,  # 调试模式下显示连接池信息
+    json_serializer=_json_serializer,  # JSON列（content_json/events_json）使用orjson读写
+    json_deserializer=orjson.loads,
 )
 
 # 创建会话工厂
@@ -71,61 +68,112 @@ async_session_factory = async_sessionmaker(
     autoflush=False
 )
 
+# 会话提交后回调在session.info中的键
+_AFTER_COMMIT_KEY = "after_commit_callbacks"
+
 _db_checked = False
+_db_lock: Optional[asyncio.Lock] = None  # 首次使用时创建，绑定到当前事件循环
 
 
 async def ensure_database_exists():
-    """确保目标数据库存在"""
-    global _db_checked
+    """确保目标数据库存在（并发调用时只有一个协程执行检查，其余等待其结果）"""
+    global _db_lock
     if _db_checked:
         return
-    
-    admin_url = get_admin_database_url()
-    admin_engine = create_async_engine(
-        admin_url,
-        pool_size=1,
-        max_overflow=0,
-        echo=settings.DEBUG,
-        echo_pool=settings.DEBUG,
+    if _db_lock is None:
+        _db_lock = asyncio.Lock()
+    async with _db_lock:
+        if not _db_checked:
+            await _create_database()
+
+
+async def _create_database():
+    """创建目标数据库（已存在时忽略）"""
+    global _db_checked
+    # 只执行一条DDL，直接使用驱动连接，无需为此创建引擎和连接池
+    conn = await aiomysql.connect(
+        host=_DB_HOST,
+        port=int(_DB_PORT),
+        user=settings.DB_USER,
+        password=settings.DB_PASSWORD,
+        db="mysql",
+        charset="utf8mb4",
     )
-    
     try:
-        async with admin_engine.begin() as conn:
-            await conn.execute(
-                text(
-                    f"CREATE DATABASE IF NOT EXISTS `{settings.DB_NAME}` "
-                    "DEFAULT CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci"
-                )
+        async with conn.cursor() as cursor:
+            await cursor.execute(
+                f"CREATE DATABASE IF NOT EXISTS `{settings.DB_NAME}` "
+                "DEFAULT CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci"
             )
         _db_checked = True
         logger.info("数据库已存在或创建成功")
     finally:
-        await admin_engine.dispose()
+        conn.close()
 
 
-async def init_db():
-    """初始化数据库，创建所有表"""
+async def init_db(create_tables: Optional[bool] = None):
+    """初始化数据库，创建所有表
+    
+    create_all会逐表查询是否存在，线上环境启动时跳过，
+    表结构由 scripts/init_journal_tables.py 预先创建
+    
+    Args:
+        create_tables: 是否创建数据表，为None时仅在非线上环境（DEBUG）创建
+    """
     await ensure_database_exists()
+    if create_tables is None:
+        create_tables = settings.DEBUG
+    if not create_tables:
+        return
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
         logger.info("数据库表初始化完成")
 
 
+def add_after_commit(session: AsyncSession, callback: Callable[[], Awaitable[None]]) -> None:
+    """登记会话提交成功后执行的异步回调（如投递队列任务、使缓存失效）
+    
+    回调由 commit_session 在事务提交后依次执行，事务回滚时丢弃
+    
+    Args:
+        session: 数据库会话
+        callback: 无参异步回调
+    """
+    session.info.setdefault(_AFTER_COMMIT_KEY, []).append(callback)
+
+
+async def commit_session(session: AsyncSession) -> None:
+    """提交会话，并在提交成功后执行已登记的回调
+    
+    回调失败只记录日志，不影响已提交的事务
+    
+    Args:
+        session: 数据库会话
+    """
+    await session.commit()
+    for callback in session.info.pop(_AFTER_COMMIT_KEY, []):
+        try:
+            await callback()
+        except Exception as e:
+            logger.error("提交后回调执行失败: %s", e)
+
+
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     """获取数据库会话的异步生成器
     
     这是一个依赖注入函数，可以用于FastAPI的Depends。
+    目标数据库由启动时的init_db()确保存在，这里不再检查。
     
     Yields:
         AsyncSession: 数据库会话对象
     """
-    await ensure_database_exists()
     async with async_session_factory() as session:
         try:
             yield session
-            await session.commit()
+            await commit_session(session)
         except Exception as e:
             logger.error(f"数据库会话发生错误: {str(e)}")
+            session.info.pop(_AFTER_COMMIT_KEY, None)
             await session.rollback()
             raise
         finally:
@@ -8,6 +8,7 @@ from .tag import Tag
 from .entry_tag import EntryTag
 from .insight_card import InsightCard
 from .insight_card_config import InsightCardConfig
+from .entry_daily_stat import EntryDailyStat
 
 __all__ = [
     "Entry",
@@ -16,4 +17,5 @@ __all__ = [
     "EntryTag",
     "InsightCard",
     "InsightCardConfig",
+    "EntryDailyStat",
 ] 
\ No newline at end of file
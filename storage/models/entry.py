@@ -2,7 +2,6 @@
 Entry模型 - 条目/记录表
 """
 # 标准库导包
-import uuid
 from datetime import datetime
 from typing import Optional
 
@@ -12,6 +11,8 @@ from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 # 项目内部导包
 from storage.database import Base
+from storage.types import UUIDType
+from utils import uuid7
 
 
 class Entry(Base):
@@ -20,13 +21,13 @@ class Entry(Base):
     __tablename__ = "entries"
     
     # 核心字段
-    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id: Mapped[str] = mapped_column(String(100), nullable=False, index=True)
+    id: Mapped[str] = mapped_column(UUIDType, primary_key=True, default=uuid7)
+    user_id: Mapped[str] = mapped_column(String(64), nullable=False)
     content: Mapped[str] = mapped_column(Text, nullable=False, comment="文本内容，最多5000字")
     emotion: Mapped[Optional[str]] = mapped_column(String(20), nullable=True, comment="情绪：positive/neutral/negative")
     status: Mapped[str] = mapped_column(String(20), nullable=False, default="sending", comment="状态：sending/success/failed/violated")
     is_visible: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True, comment="是否可见，内容审核用")
-    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # 扩展字段
@@ -37,12 +38,13 @@ class Entry(Base):
     share_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, comment="分享次数")
     
     # 关系定义
-    images: Mapped[list["EntryImage"]] = relationship("EntryImage", back_populates="entry", cascade="all, delete-orphan")
+    images: Mapped[list["EntryImage"]] = relationship("EntryImage", back_populates="entry", cascade="all, delete-orphan", order_by="EntryImage.sort_order")
     tags: Mapped[list["EntryTag"]] = relationship("EntryTag", back_populates="entry", cascade="all, delete-orphan")
     
-    # 复合索引
+    # 复合索引（均以user_id开头，同时覆盖按用户的单列查询）
     __table_args__ = (
-        Index("idx_user_created", "user_id", "created_at"),
+        Index("idx_user_created", "user_id", "created_at", "word_count"),  # 覆盖按日统计（数量/字数），无需回表
+        Index("idx_user_emotion_created", "user_id", "emotion", "created_at"),
     )
     
     def __repr__(self):
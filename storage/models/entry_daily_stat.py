@@ -0,0 +1,27 @@
+"""
+EntryDailyStat模型 - 条目日统计表
+"""
+# 标准库导包
+from datetime import date
+
+# 第三方库导包
+from sqlalchemy import String, Integer, Date
+from sqlalchemy.orm import Mapped, mapped_column
+
+# 项目内部导包
+from storage.database import Base
+
+
+class EntryDailyStat(Base):
+    """条目日统计表，创建条目时同步累加，热力图等按日统计直接读取"""
+    
+    __tablename__ = "entry_daily_stats"
+    
+    # 核心字段（用户 + 日期为联合主键，按用户查询日期范围即为主键范围扫描）
+    user_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True, comment="日期（按条目created_at）")
+    entry_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, comment="当日记录数")
+    word_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, comment="当日总字数")
+    
+    def __repr__(self):
+        return f"<EntryDailyStat(user_id={self.user_id}, day={self.day}, entry_count={self.entry_count})>"
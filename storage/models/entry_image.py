@@ -2,7 +2,6 @@
 EntryImage模型 - 条目图片表
 """
 # 标准库导包
-import uuid
 from datetime import datetime
 from typing import Optional
 
@@ -12,6 +11,8 @@ from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 # 项目内部导包
 from storage.database import Base
+from storage.types import UUIDType
+from utils import uuid7
 
 
 class EntryImage(Base):
@@ -20,8 +21,8 @@ class EntryImage(Base):
     __tablename__ = "entry_images"
     
     # 核心字段
-    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    entry_id: Mapped[str] = mapped_column(String(36), ForeignKey("entries.id", ondelete="CASCADE"), nullable=False, index=True)
+    id: Mapped[str] = mapped_column(UUIDType, primary_key=True, default=uuid7)
+    entry_id: Mapped[str] = mapped_column(UUIDType, ForeignKey("entries.id", ondelete="CASCADE"), nullable=False, index=True)
     image_url: Mapped[str] = mapped_column(String(500), nullable=False, comment="图片URL")
     upload_status: Mapped[str] = mapped_column(String(20), nullable=False, default="pending", comment="上传状态：pending/uploading/success/failed")
     is_live_photo: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False, comment="是否为Live Photo")
@@ -2,15 +2,16 @@
 EntryTag模型 - 条目标签关联表
 """
 # 标准库导包
-import uuid
 from datetime import datetime
 
 # 第三方库导包
-from sqlalchemy import String, DateTime, ForeignKey, Index, UniqueConstraint
+from sqlalchemy import DateTime, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 # 项目内部导包
 from storage.database import Base
+from storage.types import UUIDType
+from utils import uuid7
 
 
 class EntryTag(Base):
@@ -19,18 +20,19 @@ class EntryTag(Base):
     __tablename__ = "entry_tags"
     
     # 核心字段
-    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    entry_id: Mapped[str] = mapped_column(String(36), ForeignKey("entries.id", ondelete="CASCADE"), nullable=False, index=True)
-    tag_id: Mapped[str] = mapped_column(String(36), ForeignKey("tags.id", ondelete="CASCADE"), nullable=False, index=True)
+    id: Mapped[str] = mapped_column(UUIDType, primary_key=True, default=uuid7)
+    entry_id: Mapped[str] = mapped_column(UUIDType, ForeignKey("entries.id", ondelete="CASCADE"), nullable=False)
+    tag_id: Mapped[str] = mapped_column(UUIDType, ForeignKey("tags.id", ondelete="CASCADE"), nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
     
     # 关系定义
     entry: Mapped["Entry"] = relationship("Entry", back_populates="tags")
     tag: Mapped["Tag"] = relationship("Tag", back_populates="entry_tags")
     
-    # 唯一索引
+    # 唯一索引与复合索引
     __table_args__ = (
-        UniqueConstraint("entry_id", "tag_id", name="uq_entry_tag"),
+        UniqueConstraint("entry_id", "tag_id", name="uq_entry_tag"),  # 同时用于按条目查标签
+        Index("idx_tag_entry", "tag_id", "entry_id"),  # 按标签查条目时无需回表即可关联entries
     )
     
     def __repr__(self):
@@ -2,7 +2,6 @@
 InsightCard模型 - 洞察卡片表
 """
 # 标准库导包
-import uuid
 from datetime import datetime
 from typing import Optional
 
@@ -12,6 +11,8 @@ from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 # 项目内部导包
 from storage.database import Base
+from storage.types import UUIDType
+from utils import uuid7
 
 
 class InsightCard(Base):
@@ -20,8 +21,8 @@ class InsightCard(Base):
     __tablename__ = "insight_cards"
     
     # 核心字段
-    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id: Mapped[str] = mapped_column(String(100), nullable=False, index=True)
+    id: Mapped[str] = mapped_column(UUIDType, primary_key=True, default=uuid7)
+    user_id: Mapped[str] = mapped_column(String(64), nullable=False)
     card_type: Mapped[str] = mapped_column(String(50), nullable=False, comment="卡片类型：daily_affirmation/weekly_emotion_map/weekly_gratitude_list/custom")
     content_json: Mapped[dict] = mapped_column(JSON, nullable=False, comment="卡片内容，存储图表数据、文字等")
     data_start_time: Mapped[datetime] = mapped_column(DateTime, nullable=False, comment="数据源开始时间")
@@ -33,7 +34,7 @@ class InsightCard(Base):
     updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # 扩展字段
-    config_id: Mapped[Optional[str]] = mapped_column(String(36), ForeignKey("insight_card_configs.id", ondelete="SET NULL"), nullable=True, comment="关联InsightCardConfig，自定义卡片用")
+    config_id: Mapped[Optional[str]] = mapped_column(UUIDType, ForeignKey("insight_card_configs.id", ondelete="SET NULL"), nullable=True, comment="关联InsightCardConfig，自定义卡片用")
     share_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, comment="分享次数")
     view_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, comment="查看次数")
     
@@ -43,6 +44,8 @@ class InsightCard(Base):
     # 复合索引
     __table_args__ = (
         Index("idx_user_hidden", "user_id", "is_hidden"),
+        Index("idx_user_type_data_range", "user_id", "card_type", "data_start_time", "data_end_time"),
+        Index("idx_user_type_generated", "user_id", "card_type", "generated_at"),  # 按类型查询并按生成时间倒序
     )
     
     def __repr__(self):
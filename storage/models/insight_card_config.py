@@ -2,7 +2,6 @@
 InsightCardConfig模型 - 洞察配置表（付费功能）
 """
 # 标准库导包
-import uuid
 from datetime import datetime, time
 from typing import Optional
 
@@ -12,6 +11,8 @@ from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 # 项目内部导包
 from storage.database import Base
+from storage.types import UUIDType
+from utils import uuid7
 
 
 class InsightCardConfig(Base):
@@ -20,8 +21,8 @@ class InsightCardConfig(Base):
     __tablename__ = "insight_card_configs"
     
     # 核心字段
-    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id: Mapped[str] = mapped_column(String(100), nullable=False, index=True)
+    id: Mapped[str] = mapped_column(UUIDType, primary_key=True, default=uuid7)
+    user_id: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
     name: Mapped[str] = mapped_column(String(100), nullable=False, comment="洞察名称")
     card_type: Mapped[str] = mapped_column(String(50), nullable=False, default="custom", comment="卡片类型：daily_affirmation/weekly_emotion_map/weekly_gratitude_list/custom")
     time_range: Mapped[str] = mapped_column(String(20), nullable=False, comment="时间范围：daily/weekly/monthly")
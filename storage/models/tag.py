@@ -2,16 +2,17 @@
 Tag模型 - 标签表
 """
 # 标准库导包
-import uuid
 from datetime import datetime
 from typing import Optional
 
 # 第三方库导包
-from sqlalchemy import String, Boolean, DateTime
+from sqlalchemy import String, Boolean, DateTime, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 # 项目内部导包
 from storage.database import Base
+from storage.types import UUIDType
+from utils import uuid7
 
 
 class Tag(Base):
@@ -20,10 +21,10 @@ class Tag(Base):
     __tablename__ = "tags"
     
     # 核心字段
-    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id: Mapped[str] = mapped_column(UUIDType, primary_key=True, default=uuid7)
     name: Mapped[str] = mapped_column(String(50), nullable=False, comment="标签名称")
     tag_type: Mapped[str] = mapped_column(String(20), nullable=False, comment="类型：system/custom")
-    user_id: Mapped[Optional[str]] = mapped_column(String(100), nullable=True, index=True, comment="用户ID，自定义标签需要")
+    user_id: Mapped[Optional[str]] = mapped_column(String(64), nullable=True, comment="用户ID，自定义标签需要")
     is_enabled: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True, comment="是否启用")
     created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
     
@@ -35,6 +36,13 @@ class Tag(Base):
     # 关系定义
     entry_tags: Mapped[list["EntryTag"]] = relationship("EntryTag", back_populates="tag", cascade="all, delete-orphan")
     
+    # 复合索引
+    __table_args__ = (
+        Index("idx_tag_type_enabled", "tag_type", "is_enabled"),
+        Index("idx_tag_custom_lookup", "user_id", "tag_type", "is_enabled"),  # 用户自定义标签查询，前缀覆盖按user_id查询
+        Index("idx_tag_name_type_user", "name", "tag_type", "user_id"),  # 按名称查找系统/自定义标签
+    )
+    
     def __repr__(self):
         return f"<Tag(id={self.id}, name={self.name}, tag_type={self.tag_type})>"
 
@@ -0,0 +1,51 @@
+"""
+SQL查询计数（开发环境用于发现N+1查询）
+
+按请求（contextvars上下文）统计经由引擎执行的SQL语句数，
+由main.py中的中间件在DEBUG模式下启用，超过阈值时记录告警日志
+"""
+# 标准库导包
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional
+
+# 第三方库导包
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+# 当前上下文的计数器（单元素列表，便于在子任务/greenlet中原地累加）
+_query_count: ContextVar[Optional[List[int]]] = ContextVar("query_count", default=None)
+
+
+def _on_before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    """每条SQL执行前累加当前上下文的计数"""
+    counter = _query_count.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+def install_query_counter(engine: AsyncEngine) -> None:
+    """
+    在引擎上注册查询计数钩子
+
+    Args:
+        engine: 异步引擎
+    """
+    if not event.contains(engine.sync_engine, "before_cursor_execute", _on_before_cursor_execute):
+        event.listen(engine.sync_engine, "before_cursor_execute", _on_before_cursor_execute)
+
+
+@contextmanager
+def count_queries() -> Iterator[List[int]]:
+    """
+    统计代码块内执行的SQL语句数
+
+    Yields:
+        单元素列表，退出代码块后 [0] 即为语句数
+    """
+    counter = [0]
+    token = _query_count.set(counter)
+    try:
+        yield counter
+    finally:
+        _query_count.reset(token)
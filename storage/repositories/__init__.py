@@ -9,6 +9,7 @@ from .tag_repository import TagRepository
 from .entry_tag_repository import EntryTagRepository
 from .insight_card_repository import InsightCardRepository
 from .insight_card_config_repository import InsightCardConfigRepository
+from .entry_daily_stat_repository import EntryDailyStatRepository
 
 __all__ = [
     "BaseRepository",
@@ -18,4 +19,5 @@ __all__ = [
     "EntryTagRepository",
     "InsightCardRepository",
     "InsightCardConfigRepository",
+    "EntryDailyStatRepository",
 ] 
\ No newline at end of file
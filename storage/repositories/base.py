@@ -2,20 +2,44 @@
 基础Repository类
 """
 # 标准库导包
-from typing import TypeVar, Generic, Optional, List, Dict, Any
+import operator
+from typing import TypeVar, Generic, Optional, List, Dict, Any, Sequence
 from abc import ABC, abstractmethod
 
 # 第三方库导包
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete, and_, or_
+from sqlalchemy import select, insert, update, delete, and_, or_, literal, inspect
 from sqlalchemy.sql import func
 
 # 项目内部导包
 from storage.database import Base
+from utils import uuid7
 
 # 泛型类型
 ModelType = TypeVar('ModelType', bound=Base)
 
+# 过滤条件中的高级操作符
+_FILTER_OPERATORS = {
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "lt": operator.lt,
+    "lte": operator.le,
+    "ne": operator.ne,
+    "like": lambda column, val: column.like(f"%{val}%"),
+}
+
+# 模型类 -> {属性名: 列属性}，每个模型只构建一次
+_model_columns_cache: Dict[type, Dict[str, Any]] = {}
+
+
+def _get_model_columns(model: type) -> Dict[str, Any]:
+    """获取模型的列属性映射（按模型缓存，避免每次过滤都hasattr/getattr）"""
+    columns = _model_columns_cache.get(model)
+    if columns is None:
+        columns = {attr.key: getattr(model, attr.key) for attr in inspect(model).column_attrs}
+        _model_columns_cache[model] = columns
+    return columns
+
 
 class BaseRepository(Generic[ModelType], ABC):
     """基础Repository类，提供通用的CRUD操作"""
@@ -41,10 +65,8 @@ class BaseRepository(Generic[ModelType], ABC):
         Returns:
             模型实例或None
         """
-        result = await self.session.execute(
-            select(self.model).where(self.model.id == id)
-        )
-        return result.scalar_one_or_none()
+        # 优先命中会话的identity map，同一事务内重复读取不再发起查询
+        return await self.session.get(self.model, id)
     
     async def get_all(self, limit: Optional[int] = None, offset: Optional[int] = None) -> List[ModelType]:
         """
@@ -65,12 +87,14 @@ class BaseRepository(Generic[ModelType], ABC):
             query = query.limit(limit)
             
         result = await self.session.execute(query)
-        return list(result.scalars().all())
+        return result.scalars().all()
     
     async def create(self, **kwargs) -> ModelType:
         """
         创建新记录
         
+        所有字段默认值都在Python侧生成，flush后实例上即为写入的值，无需再refresh读回
+        
         Args:
             **kwargs: 模型字段值
             
@@ -80,43 +104,68 @@ class BaseRepository(Generic[ModelType], ABC):
         instance = self.model(**kwargs)
         self.session.add(instance)
         await self.session.flush()
-        await self.session.refresh(instance)
         return instance
     
+    async def bulk_create(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        批量创建记录（单条INSERT语句，executemany）
+        
+        MySQL不支持RETURNING，因此不返回模型实例：未指定主键的行在写入前于Python侧生成UUID，
+        调用方可从返回的rows中取得新记录的主键
+        
+        Args:
+            rows: 字段值字典列表（会被就地补充id）
+            
+        Returns:
+            补充主键后的rows
+        """
+        if not rows:
+            return rows
+        if "id" in self.model.__table__.c:
+            for row in rows:
+                if row.get("id") is None:
+                    row["id"] = uuid7()
+        await self.session.execute(insert(self.model), rows)
+        return rows
+    
     async def update_by_id(self, id: int, **kwargs) -> Optional[ModelType]:
         """
         根据ID更新记录
         
         Args:
             id: 记录ID（支持int或str类型）
-            **kwargs: 要更新的字段值
+            **kwargs: 要更新的字段值（支持SQL表达式）
             
         Returns:
             更新后的模型实例或None
         """
-        # MySQL不支持RETURNING子句，所以先执行UPDATE，然后重新查询
-        # 检查记录是否存在
-        existing = await self.get_by_id(id)
-        if not existing:
+        # MySQL不支持RETURNING子句，按影响行数判断记录是否存在后再读取最新数据
+        if not await self.update_values_by_id(id, **kwargs):
             return None
         
-        # 执行UPDATE
-        await self.session.execute(
+        # populate_existing：会话中已有的实例也以数据库最新值覆盖
+        return await self.session.get(self.model, id, populate_existing=True)
+    
+    async def update_values_by_id(self, id: int, **kwargs) -> bool:
+        """
+        根据ID更新记录，不读取更新后的数据
+        
+        调用方不需要更新后的实例时使用，只执行一条UPDATE
+        
+        Args:
+            id: 记录ID（支持int或str类型）
+            **kwargs: 要更新的字段值（支持SQL表达式，如计数器自增）
+            
+        Returns:
+            记录是否存在
+        """
+        result = await self.session.execute(
             update(self.model)
             .where(self.model.id == id)
             .values(**kwargs)
+            .execution_options(synchronize_session=False)
         )
-        
-        # 刷新会话以获取最新数据
-        await self.session.flush()
-        
-        # 重新查询更新后的记录
-        updated_instance = await self.get_by_id(id)
-        
-        if updated_instance:
-            await self.session.refresh(updated_instance)
-        
-        return updated_instance
+        return result.rowcount > 0
     
     async def delete_by_id(self, id: int) -> bool:
         """
@@ -133,26 +182,38 @@ class BaseRepository(Generic[ModelType], ABC):
         )
         return result.rowcount > 0
     
+    async def delete_by_ids(self, ids: Sequence[Any]) -> int:
+        """
+        根据ID批量删除记录（单条DELETE语句）
+        
+        Args:
+            ids: 记录ID列表
+            
+        Returns:
+            删除的记录数
+        """
+        if not ids:
+            return 0
+        result = await self.session.execute(
+            delete(self.model).where(self.model.id.in_(ids))
+        )
+        return result.rowcount
+    
     async def count(self, **filters) -> int:
         """
         统计记录数量
         
         Args:
-            **filters: 过滤条件
+            **filters: 过滤条件（与query_by_filters相同，支持列表IN与范围条件）
             
         Returns:
             记录数量
         """
-        query = select(func.count(self.model.id))
-        
-        if filters:
-            conditions = []
-            for key, value in filters.items():
-                if hasattr(self.model, key):
-                    conditions.append(getattr(self.model, key) == value)
-            
-            if conditions:
-                query = query.where(and_(*conditions))
+        # COUNT(*)：不需要逐行判断id非空，便于MySQL走覆盖索引
+        query = select(func.count()).select_from(self.model)
+        conditions = self._build_filter_conditions(filters)
+        if conditions:
+            query = query.where(and_(*conditions))
         
         result = await self.session.execute(query)
         return result.scalar_one()
@@ -167,8 +228,14 @@ class BaseRepository(Generic[ModelType], ABC):
         Returns:
             是否存在
         """
-        count = await self.count(**filters)
-        return count > 0
+        # SELECT 1 ... LIMIT 1：找到首行即返回，不必统计全部匹配行
+        query = select(literal(1)).select_from(self.model)
+        conditions = self._build_filter_conditions(filters)
+        if conditions:
+            query = query.where(and_(*conditions))
+        
+        result = await self.session.execute(query.limit(1))
+        return result.first() is not None
     
     def _build_filter_conditions(self, filters: Dict[str, Any]) -> List:
         """
@@ -181,34 +248,24 @@ class BaseRepository(Generic[ModelType], ABC):
             条件列表
         """
         conditions = []
+        columns = _get_model_columns(self.model)
         
         for key, value in filters.items():
-            if not hasattr(self.model, key):
+            column = columns.get(key)
+            if column is None:
                 continue
-                
-            column = getattr(self.model, key)
             
             if isinstance(value, (list, tuple)):
                 # IN 条件
                 conditions.append(column.in_(value))
             elif isinstance(value, dict):
-                # 高级条件（如范围查询）
+                # 闭区间范围直接使用BETWEEN
+                if value.keys() == {"gte", "lte"}:
+                    conditions.append(column.between(value["gte"], value["lte"]))
+                    continue
+                # 高级条件（如范围查询），未知操作符按等于处理
                 for op, val in value.items():
-                    if op == 'gt':
-                        conditions.append(column > val)
-                    elif op == 'gte':
-                        conditions.append(column >= val)
-                    elif op == 'lt':
-                        conditions.append(column < val)
-                    elif op == 'lte':
-                        conditions.append(column <= val)
-                    elif op == 'like':
-                        conditions.append(column.like(f"%{val}%"))
-                    elif op == 'ne':
-                        conditions.append(column != val)
-                    else:
-                        # 默认等于
-                        conditions.append(column == val)
+                    conditions.append(_FILTER_OPERATORS.get(op, operator.eq)(column, val))
             else:
                 # 等于条件
                 conditions.append(column == value)
@@ -221,7 +278,8 @@ class BaseRepository(Generic[ModelType], ABC):
         limit: Optional[int] = None,
         offset: Optional[int] = None,
         order_by: Optional[str] = None,
-        order_desc: bool = True
+        order_desc: bool = True,
+        options: Sequence = ()
     ) -> List[ModelType]:
         """
         根据过滤条件查询记录
@@ -232,6 +290,7 @@ class BaseRepository(Generic[ModelType], ABC):
             offset: 偏移量
             order_by: 排序字段
             order_desc: 是否降序
+            options: 加载选项（如selectinload）
             
         Returns:
             模型实例列表
@@ -239,15 +298,15 @@ class BaseRepository(Generic[ModelType], ABC):
         conditions = self._build_filter_conditions(filters)
         query = select(self.model)
         
+        if options:
+            query = query.options(*options)
+        
         if conditions:
             query = query.where(and_(*conditions))
         
-        if order_by and hasattr(self.model, order_by):
-            column = getattr(self.model, order_by)
-            if order_desc:
-                query = query.order_by(column.desc())
-            else:
-                query = query.order_by(column.asc())
+        column = _get_model_columns(self.model).get(order_by) if order_by else None
+        if column is not None:
+            query = query.order_by(column.desc() if order_desc else column.asc())
         
         if offset:
             query = query.offset(offset)
@@ -255,4 +314,4 @@ class BaseRepository(Generic[ModelType], ABC):
             query = query.limit(limit)
         
         result = await self.session.execute(query)
-        return list(result.scalars().all()) 
\ No newline at end of file
+        return result.scalars().all() 
\ No newline at end of file
@@ -0,0 +1,117 @@
+"""
+EntryDailyStatRepository - 条目日统计Repository
+"""
+# 标准库导包
+from datetime import date
+from typing import List, Dict, Any, Optional
+
+# 第三方库导包
+from sqlalchemy import select, and_, func, Date
+from sqlalchemy.dialects.mysql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# 项目内部导包
+from storage.models.entry import Entry
+from storage.models.entry_daily_stat import EntryDailyStat
+from storage.repositories.base import BaseRepository
+
+
+class EntryDailyStatRepository(BaseRepository[EntryDailyStat]):
+    """条目日统计Repository"""
+    
+    def __init__(self, session: AsyncSession):
+        super().__init__(session, EntryDailyStat)
+    
+    async def add_entry(self, user_id: str, day: date, word_count: int) -> None:
+        """
+        累加一条新记录到当日统计（INSERT ... ON DUPLICATE KEY UPDATE，单条语句完成）
+        
+        Args:
+            user_id: 用户ID
+            day: 记录创建日期
+            word_count: 记录字数
+        """
+        stmt = insert(EntryDailyStat).values(
+            user_id=user_id,
+            day=day,
+            entry_count=1,
+            word_count=word_count
+        )
+        stmt = stmt.on_duplicate_key_update(
+            entry_count=EntryDailyStat.entry_count + stmt.inserted.entry_count,
+            word_count=EntryDailyStat.word_count + stmt.inserted.word_count
+        )
+        await self.session.execute(stmt)
+    
+    async def rebuild_from_entries(self, user_id: Optional[str] = None) -> int:
+        """
+        按 entries 表重新聚合日统计（INSERT ... SELECT ... ON DUPLICATE KEY UPDATE），
+        用于回填上线前的历史数据，已有的日统计会被覆盖为重新计算的值
+        
+        Args:
+            user_id: 用户ID，为None时重建所有用户
+            
+        Returns:
+            受影响的行数
+        """
+        day_expr = func.date(Entry.created_at, type_=Date)
+        source = (
+            select(
+                Entry.user_id,
+                day_expr,
+                func.count(Entry.id),
+                func.coalesce(func.sum(Entry.word_count), 0)
+            )
+            .group_by(Entry.user_id, day_expr)
+        )
+        if user_id is not None:
+            source = source.where(Entry.user_id == user_id)
+        
+        stmt = insert(EntryDailyStat).from_select(
+            ["user_id", "day", "entry_count", "word_count"],
+            source
+        )
+        stmt = stmt.on_duplicate_key_update(
+            entry_count=stmt.inserted.entry_count,
+            word_count=stmt.inserted.word_count
+        )
+        result = await self.session.execute(stmt)
+        return result.rowcount
+    
+    async def get_by_date_range(
+        self,
+        user_id: str,
+        start_date: date,
+        end_date: date
+    ) -> List[Dict[str, Any]]:
+        """
+        获取日期范围内有记录的日统计
+        
+        Args:
+            user_id: 用户ID
+            start_date: 开始日期（包含）
+            end_date: 结束日期（包含）
+            
+        Returns:
+            按日期升序的统计列表，每个元素包含 date、count 和 word_count
+        """
+        result = await self.session.execute(
+            select(EntryDailyStat.day, EntryDailyStat.entry_count, EntryDailyStat.word_count)
+            .where(
+                and_(
+                    EntryDailyStat.user_id == user_id,
+                    EntryDailyStat.day >= start_date,
+                    EntryDailyStat.day <= end_date
+                )
+            )
+            .order_by(EntryDailyStat.day)
+        )
+        
+        return [
+            {
+                "date": row.day.isoformat(),
+                "count": row.entry_count,
+                "word_count": row.word_count
+            }
+            for row in result.all()
+        ]
@@ -5,7 +5,7 @@ EntryImageRepository - 条目图片Repository
 from typing import Optional, List
 
 # 第三方库导包
-from sqlalchemy import select
+from sqlalchemy import select, delete
 from sqlalchemy.ext.asyncio import AsyncSession
 
 # 项目内部导包
@@ -40,7 +40,7 @@ class EntryImageRepository(BaseRepository[EntryImage]):
             query = query.order_by(EntryImage.sort_order.asc())
         
         result = await self.session.execute(query)
-        return list(result.scalars().all())
+        return result.scalars().all()
     
     async def get_by_upload_status(
         self,
@@ -97,12 +97,8 @@ class EntryImageRepository(BaseRepository[EntryImage]):
         Returns:
             删除的图片数量
         """
-        images = await self.get_by_entry_id(entry_id)
-        count = 0
-        
-        for image in images:
-            if await self.delete_by_id(image.id):
-                count += 1
-        
-        return count
+        result = await self.session.execute(
+            delete(EntryImage).where(EntryImage.entry_id == entry_id)
+        )
+        return result.rowcount
 
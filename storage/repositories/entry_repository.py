@@ -2,30 +2,60 @@
 EntryRepository - 条目/记录Repository
 """
 # 标准库导包
-from datetime import datetime
-from typing import Optional, List, Dict, Any
+from datetime import date, datetime
+from typing import Optional, List, Dict, Any, Tuple
 
 # 第三方库导包
-from sqlalchemy import select, and_, func
+from sqlalchemy import select, and_, func, Date, Row
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
 # 项目内部导包
 from storage.models.entry import Entry
+from storage.models.entry_tag import EntryTag
 from storage.repositories.base import BaseRepository
 
 
 class EntryRepository(BaseRepository[Entry]):
     """条目/记录Repository"""
     
+    # 预加载图片与标签：无论返回多少条记录，均只额外发起固定次数的查询
+    RELATION_OPTIONS = (
+        selectinload(Entry.images),
+        selectinload(Entry.tags).selectinload(EntryTag.tag),
+    )
+    
     def __init__(self, session: AsyncSession):
         super().__init__(session, Entry)
     
+    async def get_by_id_with_relations(self, entry_id: str) -> Optional[Entry]:
+        """
+        根据ID获取记录，并预加载图片和标签
+        
+        已在会话中的实例会被刷新（populate_existing），以包含本次事务内新写入的关联数据
+        
+        Args:
+            entry_id: 条目ID
+            
+        Returns:
+            Entry实例或None
+        """
+        query = (
+            select(Entry)
+            .where(Entry.id == entry_id)
+            .options(*self.RELATION_OPTIONS)
+            .execution_options(populate_existing=True)
+        )
+        result = await self.session.execute(query)
+        return result.scalar_one_or_none()
+    
     async def get_by_user_id(
         self, 
         user_id: str,
         limit: Optional[int] = None,
         offset: Optional[int] = None,
-        order_desc: bool = True
+        order_desc: bool = True,
+        eager: bool = False
     ) -> List[Entry]:
         """
         根据用户ID获取记录列表
@@ -35,6 +65,7 @@ class EntryRepository(BaseRepository[Entry]):
             limit: 限制返回数量
             offset: 偏移量
             order_desc: 是否降序排列（按创建时间）
+            eager: 是否预加载图片和标签
             
         Returns:
             记录列表
@@ -44,7 +75,8 @@ class EntryRepository(BaseRepository[Entry]):
             limit=limit,
             offset=offset,
             order_by="created_at",
-            order_desc=order_desc
+            order_desc=order_desc,
+            options=self.RELATION_OPTIONS if eager else ()
         )
     
     async def get_by_date_range(
@@ -55,7 +87,8 @@ class EntryRepository(BaseRepository[Entry]):
         emotion: Optional[str] = None,
         limit: Optional[int] = None,
         offset: Optional[int] = None,
-        order_desc: bool = True
+        order_desc: bool = True,
+        eager: bool = False
     ) -> List[Entry]:
         """
         根据时间范围获取记录
@@ -63,17 +96,18 @@ class EntryRepository(BaseRepository[Entry]):
         Args:
             user_id: 用户ID
             start_time: 开始时间
-            end_time: 结束时间
+            end_time: 结束时间（不含）
             emotion: 情绪过滤（可选）
             limit: 限制返回数量
             offset: 偏移量
+            eager: 是否预加载图片和标签
             
         Returns:
             记录列表
         """
         filters: Dict[str, Any] = {
             "user_id": user_id,
-            "created_at": {"gte": start_time, "lte": end_time}
+            "created_at": {"gte": start_time, "lt": end_time}
         }
         
         if emotion:
@@ -84,15 +118,59 @@ class EntryRepository(BaseRepository[Entry]):
             limit=limit,
             offset=offset,
             order_by="created_at",
-            order_desc=order_desc
+            order_desc=order_desc,
+            options=self.RELATION_OPTIONS if eager else ()
         )
     
+    async def list_rows(
+        self,
+        user_id: str,
+        columns: Tuple[Any, ...],
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        emotion: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Row]:
+        """
+        只查询指定列，返回Row（按创建时间倒序）
+        
+        只读取少数字段的场景使用，省去ORM实例构建与标识映射的开销
+        
+        Args:
+            user_id: 用户ID
+            columns: 要查询的列，如 (Entry.id, Entry.content)
+            start_time: 开始时间（可选）
+            end_time: 结束时间（不含，可选）
+            emotion: 情绪过滤（可选）
+            limit: 限制返回数量
+            
+        Returns:
+            Row列表，可按列名访问属性
+        """
+        conditions = [Entry.user_id == user_id]
+        if start_time is not None:
+            conditions.append(Entry.created_at >= start_time)
+        if end_time is not None:
+            conditions.append(Entry.created_at < end_time)
+        if emotion:
+            conditions.append(Entry.emotion == emotion)
+        
+        query = select(*columns).where(and_(*conditions)).order_by(Entry.created_at.desc())
+        if limit is not None:
+            query = query.limit(limit)
+        
+        result = await self.session.execute(query)
+        return result.all()
+    
     async def get_by_emotion(
         self,
         user_id: str,
         emotion: str,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
         limit: Optional[int] = None,
-        offset: Optional[int] = None
+        offset: Optional[int] = None,
+        eager: bool = False
     ) -> List[Entry]:
         """
         根据情绪获取记录
@@ -100,18 +178,32 @@ class EntryRepository(BaseRepository[Entry]):
         Args:
             user_id: 用户ID
             emotion: 情绪类型（positive/neutral/negative）
+            start_time: 开始时间（可选）
+            end_time: 结束时间（不含，可选）
             limit: 限制返回数量
             offset: 偏移量
+            eager: 是否预加载图片和标签
             
         Returns:
             记录列表
         """
+        filters: Dict[str, Any] = {"user_id": user_id, "emotion": emotion}
+        
+        created_at_range = {}
+        if start_time is not None:
+            created_at_range["gte"] = start_time
+        if end_time is not None:
+            created_at_range["lt"] = end_time
+        if created_at_range:
+            filters["created_at"] = created_at_range
+        
         return await self.query_by_filters(
-            filters={"user_id": user_id, "emotion": emotion},
+            filters=filters,
             limit=limit,
             offset=offset,
             order_by="created_at",
-            order_desc=True
+            order_desc=True,
+            options=self.RELATION_OPTIONS if eager else ()
         )
     
     async def get_by_status(
@@ -154,7 +246,7 @@ class EntryRepository(BaseRepository[Entry]):
         Args:
             user_id: 用户ID
             start_time: 开始时间
-            end_time: 结束时间
+            end_time: 结束时间（不含）
             emotion: 情绪过滤（可选）
             
         Returns:
@@ -163,7 +255,7 @@ class EntryRepository(BaseRepository[Entry]):
         conditions = [
             Entry.user_id == user_id,
             Entry.created_at >= start_time,
-            Entry.created_at <= end_time
+            Entry.created_at < end_time
         ]
         
         if emotion:
@@ -185,74 +277,62 @@ class EntryRepository(BaseRepository[Entry]):
         Args:
             user_id: 用户ID
             start_time: 开始时间
-            end_time: 结束时间
+            end_time: 结束时间（不含）
             
         Returns:
             统计结果字典（总字数、平均字数等）
         """
+        # COUNT(word_count)本身不计NULL，无需额外的isnot(None)条件；空结果由COALESCE在SQL中处理
         query = select(
-            func.count(Entry.id),
-            func.sum(Entry.word_count),
-            func.avg(Entry.word_count)
+            func.count(Entry.word_count),
+            func.coalesce(func.sum(Entry.word_count), 0),
+            func.coalesce(func.avg(Entry.word_count), 0)
         ).where(
             and_(
                 Entry.user_id == user_id,
                 Entry.created_at >= start_time,
-                Entry.created_at <= end_time,
-                Entry.word_count.isnot(None)
+                Entry.created_at < end_time
             )
         )
         
         result = await self.session.execute(query)
-        row = result.first()
-        
-        if row:
-            count, total, avg = row
-            return {
-                "count": count or 0,
-                "total_words": int(total or 0),
-                "average_words": float(avg or 0)
-            }
-        
-        return {"count": 0, "total_words": 0, "average_words": 0.0}
+        count, total, avg = result.one()
+        # MySQL的SUM/AVG返回Decimal
+        return {
+            "count": count,
+            "total_words": int(total),
+            "average_words": float(avg)
+        }
 
-    async def get_daily_stats(
+    async def aggregate_emotions_by_day(
         self,
         user_id: str,
         start_time: datetime,
         end_time: datetime
-    ) -> List[Dict[str, Any]]:
+    ) -> List[Tuple[date, Optional[str], int]]:
         """
-        按日期聚合记录数量与字数
+        按日期和情绪聚合记录数量
+        
+        Args:
+            user_id: 用户ID
+            start_time: 开始时间
+            end_time: 结束时间（不含）
+            
+        Returns:
+            (日期, 情绪, 记录数)元组列表，每天每种情绪最多一行
         """
-        # MySQL兼容：使用实际的列表达式而不是别名进行GROUP BY
-        date_expr = func.date(Entry.created_at)
+        date_expr = func.date(Entry.created_at, type_=Date)
         query = (
-            select(
-                date_expr.label("day"),
-                func.count(Entry.id).label("count"),
-                func.sum(Entry.word_count).label("word_count")
-            )
+            select(date_expr, Entry.emotion, func.count(Entry.id))
             .where(
                 and_(
                     Entry.user_id == user_id,
                     Entry.created_at >= start_time,
-                    Entry.created_at <= end_time
+                    Entry.created_at < end_time
                 )
             )
-            .group_by(date_expr)
-            .order_by(date_expr)
+            .group_by(date_expr, Entry.emotion)
         )
 
         result = await self.session.execute(query)
-        rows = result.all()
-
-        return [
-            {
-                "date": row.day.isoformat() if row.day else None,
-                "count": row.count or 0,
-                "word_count": int(row.word_count or 0)
-            }
-            for row in rows
-        ]
-
+        return [tuple(row) for row in result.all()]
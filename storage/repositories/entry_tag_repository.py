@@ -2,12 +2,12 @@
 EntryTagRepository - 条目标签关联Repository
 """
 # 标准库导包
-from typing import List, Optional
+from typing import List
 
 # 第三方库导包
-from sqlalchemy import select, delete, and_
+from sqlalchemy import select, insert, delete, and_
+from sqlalchemy.dialects.mysql import insert as mysql_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 # 项目内部导包
 from storage.models.entry_tag import EntryTag
@@ -55,14 +55,15 @@ class EntryTagRepository(BaseRepository[EntryTag]):
         Returns:
             标签列表
         """
-        query = select(EntryTag).where(
+        # 直接关联查询标签，一次往返，不构造中间的EntryTag实例
+        query = select(Tag).join(
+            EntryTag, EntryTag.tag_id == Tag.id
+        ).where(
             EntryTag.entry_id == entry_id
-        ).options(selectinload(EntryTag.tag))
+        )
         
         result = await self.session.execute(query)
-        entry_tags = list(result.scalars().all())
-        
-        return [et.tag for et in entry_tags if et.tag]
+        return result.scalars().all()
     
     async def get_entry_ids_by_tag_id(self, tag_id: str) -> List[str]:
         """
@@ -76,34 +77,45 @@ class EntryTagRepository(BaseRepository[EntryTag]):
         """
         query = select(EntryTag.entry_id).where(EntryTag.tag_id == tag_id)
         result = await self.session.execute(query)
-        return [row[0] for row in result.all()]
+        return result.scalars().all()
     
     async def add_tag_to_entry(
         self,
         entry_id: str,
         tag_id: str
-    ) -> Optional[EntryTag]:
+    ) -> None:
         """
         为条目添加标签（如果不存在）
         
         Args:
             entry_id: 条目ID
             tag_id: 标签ID
-            
-        Returns:
-            标签关联实例或None（如果已存在）
         """
-        # 检查是否已存在
-        existing = await self.query_by_filters(
-            filters={"entry_id": entry_id, "tag_id": tag_id},
-            limit=1
-        )
+        await self.add_tags_to_entry(entry_id, [tag_id])
+    
+    async def add_tags_to_entry(
+        self,
+        entry_id: str,
+        tag_ids: List[str]
+    ) -> None:
+        """
+        为条目批量添加标签（已存在的关联跳过）
         
-        if existing:
-            return existing[0]
+        单条多行INSERT ... ON DUPLICATE KEY UPDATE语句完成，由uq_entry_tag唯一约束去重；
+        与INSERT IGNORE不同，外键等其他错误不会被静默忽略
         
-        # 创建新关联
-        return await self.create(entry_id=entry_id, tag_id=tag_id)
+        Args:
+            entry_id: 条目ID
+            tag_ids: 标签ID列表
+        """
+        if not tag_ids:
+            return
+        
+        stmt = mysql_insert(EntryTag).values(
+            [{"entry_id": entry_id, "tag_id": tag_id} for tag_id in dict.fromkeys(tag_ids)]
+        )
+        stmt = stmt.on_duplicate_key_update(entry_id=stmt.inserted.entry_id)
+        await self.session.execute(stmt)
     
     async def remove_tag_from_entry(
         self,
@@ -134,16 +146,15 @@ class EntryTagRepository(BaseRepository[EntryTag]):
         self,
         entry_id: str,
         tag_ids: List[str]
-    ) -> List[EntryTag]:
+    ) -> None:
         """
         替换条目的所有标签
         
+        一条DELETE加一条多行INSERT完成
+        
         Args:
             entry_id: 条目ID
             tag_ids: 新的标签ID列表
-            
-        Returns:
-            新的标签关联列表
         """
         # 删除现有标签
         await self.session.execute(
@@ -151,12 +162,9 @@ class EntryTagRepository(BaseRepository[EntryTag]):
         )
         
         # 添加新标签
-        new_entry_tags = []
-        for tag_id in tag_ids:
-            entry_tag = await self.create(entry_id=entry_id, tag_id=tag_id)
-            new_entry_tags.append(entry_tag)
-        
-        return new_entry_tags
+        rows = [{"entry_id": entry_id, "tag_id": tag_id} for tag_id in dict.fromkeys(tag_ids)]
+        if rows:
+            await self.session.execute(insert(EntryTag), rows)
     
     async def delete_by_entry_id(self, entry_id: str) -> int:
         """
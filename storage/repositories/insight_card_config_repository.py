@@ -5,7 +5,7 @@ InsightCardConfigRepository - 洞察配置Repository
 from typing import Optional, List
 
 # 第三方库导包
-from sqlalchemy import select
+from sqlalchemy import select, update, case, not_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 # 项目内部导包
@@ -111,14 +111,24 @@ class InsightCardConfigRepository(BaseRepository[InsightCardConfig]):
         Returns:
             更新后的配置列表
         """
-        updated_configs = []
+        if not config_id_order_map:
+            return []
         
-        for config_id, sort_order in config_id_order_map.items():
-            config = await self.update_by_id(config_id, sort_order=sort_order)
-            if config:
-                updated_configs.append(config)
+        config_ids = list(config_id_order_map)
         
-        return updated_configs
+        # 单条UPDATE ... SET sort_order = CASE id WHEN ... END完成批量更新
+        await self.session.execute(
+            update(InsightCardConfig)
+            .where(InsightCardConfig.id.in_(config_ids))
+            .values(sort_order=case(*(
+                # 显式比较使ID按列类型（BINARY(16)）绑定参数
+                (InsightCardConfig.id == config_id, sort_order)
+                for config_id, sort_order in config_id_order_map.items()
+            )))
+        )
+        await self.session.flush()
+        
+        return await self.query_by_filters(filters={"id": config_ids})
     
     async def toggle_enabled(self, config_id: str) -> Optional[InsightCardConfig]:
         """
@@ -130,9 +140,4 @@ class InsightCardConfigRepository(BaseRepository[InsightCardConfig]):
         Returns:
             更新后的配置实例
         """
-        config = await self.get_by_id(config_id)
-        
-        if config:
-            return await self.update_by_id(config_id, is_enabled=not config.is_enabled)
-        
-        return None
+        return await self.update_by_id(config_id, is_enabled=not_(InsightCardConfig.is_enabled))
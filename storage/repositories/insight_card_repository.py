@@ -6,7 +6,7 @@ from datetime import datetime
 from typing import Optional, List, Dict, Any
 
 # 第三方库导包
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, literal
 from sqlalchemy.ext.asyncio import AsyncSession
 
 # 项目内部导包
@@ -170,10 +170,7 @@ class InsightCardRepository(BaseRepository[InsightCard]):
         Returns:
             更新后的卡片实例
         """
-        card = await self.get_by_id(card_id)
-        if card:
-            return await self.update_by_id(card_id, is_viewed=True, view_count=card.view_count + 1)
-        return None
+        return await self.update_by_id(card_id, is_viewed=True, view_count=InsightCard.view_count + 1)
     
     async def mark_as_hidden(self, card_id: str) -> Optional[InsightCard]:
         """
@@ -203,10 +200,7 @@ class InsightCardRepository(BaseRepository[InsightCard]):
         Returns:
             更新后的卡片实例
         """
-        card = await self.get_by_id(card_id)
-        if card:
-            return await self.update_by_id(card_id, share_count=card.share_count + 1)
-        return None
+        return await self.update_by_id(card_id, share_count=InsightCard.share_count + 1)
     
     async def check_card_exists(
         self,
@@ -227,6 +221,37 @@ class InsightCardRepository(BaseRepository[InsightCard]):
         Returns:
             是否存在
         """
+        # 只取常量1并LIMIT 1，命中复合索引即可返回，无需加载整行
+        query = select(literal(1)).where(
+            and_(
+                InsightCard.user_id == user_id,
+                InsightCard.card_type == card_type,
+                InsightCard.data_start_time == data_start_time,
+                InsightCard.data_end_time == data_end_time
+            )
+        ).limit(1)
+        
+        return await self.session.scalar(query) is not None
+    
+    async def get_existing_card(
+        self,
+        user_id: str,
+        card_type: str,
+        data_start_time: datetime,
+        data_end_time: datetime
+    ) -> Optional[InsightCard]:
+        """
+        获取指定条件下已生成的卡片（最新一张）
+        
+        Args:
+            user_id: 用户ID
+            card_type: 卡片类型
+            data_start_time: 数据开始时间
+            data_end_time: 数据结束时间
+            
+        Returns:
+            洞察卡片实例或None
+        """
         query = select(InsightCard).where(
             and_(
                 InsightCard.user_id == user_id,
@@ -234,8 +259,7 @@ class InsightCardRepository(BaseRepository[InsightCard]):
                 InsightCard.data_start_time == data_start_time,
                 InsightCard.data_end_time == data_end_time
             )
-        )
+        ).order_by(InsightCard.created_at.desc()).limit(1)
         
         result = await self.session.execute(query)
-        return result.scalar_one_or_none() is not None
-
+        return result.scalar_one_or_none()
@@ -2,23 +2,98 @@
 TagRepository - 标签Repository
 """
 # 标准库导包
-from typing import Optional, List
+import time
+from typing import Any, Dict, Iterable, Optional, List, Sequence, Set, Tuple
 
 # 第三方库导包
-from sqlalchemy import select, and_, or_
+from sqlalchemy import select, and_, or_, Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
 # 项目内部导包
 from storage.models.tag import Tag
 from storage.repositories.base import BaseRepository
 
+# 进程级系统标签缓存：(过期时间, 按创建时间排序的系统标签)
+# 缓存的是不属于任何会话的Tag副本，本进程内写标签时清空，其他进程的写入最多延迟TTL生效
+_system_tags_cache: Optional[Tuple[float, List[Tag]]] = None
+
+
+def _invalidate_system_tags() -> None:
+    """清空进程级系统标签缓存"""
+    global _system_tags_cache
+    _system_tags_cache = None
+
+
+# 自定义标签查询的固定部分（模块级构建一次，调用时只追加用户/启用状态条件）
+_CUSTOM_TAGS_QUERY = select(Tag).where(Tag.tag_type == "custom")
+# 只读展示接口需要的字段
+_TAG_ROW_COLUMNS = (Tag.id, Tag.name, Tag.tag_type, Tag.color, Tag.icon)
+_CUSTOM_TAG_ROWS_QUERY = select(*_TAG_ROW_COLUMNS).where(Tag.tag_type == "custom")
+
 
 class TagRepository(BaseRepository[Tag]):
     """标签Repository"""
     
+    SYSTEM_TAGS_CACHE_TTL = 60  # 系统标签缓存秒数
+    
     def __init__(self, session: AsyncSession):
         super().__init__(session, Tag)
     
+    async def _get_cached_system_tags(self) -> List[Tag]:
+        """
+        获取全部系统标签（含停用），按创建时间升序，优先读取进程级缓存
+        
+        Returns:
+            系统标签列表（与会话无关的副本，只读）
+        """
+        if _system_tags_cache is not None and _system_tags_cache[0] > time.monotonic():
+            return _system_tags_cache[1]
+        return await self.refresh_system_tags_cache()
+    
+    async def refresh_system_tags_cache(self) -> List[Tag]:
+        """
+        从数据库重新加载系统标签并写入进程级缓存（启动预热与后台定时刷新使用）
+        
+        Returns:
+            系统标签列表（与会话无关的副本，只读）
+        """
+        global _system_tags_cache
+        now = time.monotonic()
+        tags = await self.query_by_filters(
+            filters={"tag_type": "system"},
+            order_by="created_at",
+            order_desc=False
+        )
+        columns = [column.key for column in Tag.__table__.columns]
+        copies = [Tag(**{key: getattr(tag, key) for key in columns}) for tag in tags]
+        _system_tags_cache = (now + self.SYSTEM_TAGS_CACHE_TTL, copies)
+        return copies
+    
+    async def create(self, **kwargs) -> Tag:
+        """创建标签，并清空系统标签缓存"""
+        _invalidate_system_tags()
+        return await super().create(**kwargs)
+    
+    async def bulk_create(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """批量创建标签，并清空系统标签缓存"""
+        _invalidate_system_tags()
+        return await super().bulk_create(rows)
+    
+    async def update_values_by_id(self, id: str, **kwargs) -> bool:
+        """更新标签（update_by_id同样经由此方法），并清空系统标签缓存"""
+        _invalidate_system_tags()
+        return await super().update_values_by_id(id, **kwargs)
+    
+    async def delete_by_id(self, id: str) -> bool:
+        """删除标签，并清空系统标签缓存"""
+        _invalidate_system_tags()
+        return await super().delete_by_id(id)
+    
+    async def delete_by_ids(self, ids: Sequence[Any]) -> int:
+        """批量删除标签，并清空系统标签缓存"""
+        _invalidate_system_tags()
+        return await super().delete_by_ids(ids)
+    
     async def get_system_tags(self, is_enabled: Optional[bool] = None) -> List[Tag]:
         """
         获取系统标签
@@ -29,12 +104,22 @@ class TagRepository(BaseRepository[Tag]):
         Returns:
             系统标签列表
         """
-        filters = {"tag_type": "system"}
-        
-        if is_enabled is not None:
-            filters["is_enabled"] = is_enabled
+        tags = await self._get_cached_system_tags()
+        if is_enabled is None:
+            return list(tags)
+        return [tag for tag in tags if tag.is_enabled == is_enabled]
+    
+    async def get_system_tags_limited(self, limit: int) -> List[Tag]:
+        """
+        获取前N个启用的系统标签（按创建时间）
         
-        return await self.query_by_filters(filters=filters)
+        Args:
+            limit: 限制返回数量
+            
+        Returns:
+            系统标签列表
+        """
+        return (await self.get_system_tags(is_enabled=True))[:limit]
     
     async def get_user_custom_tags(
         self,
@@ -51,12 +136,12 @@ class TagRepository(BaseRepository[Tag]):
         Returns:
             用户自定义标签列表
         """
-        filters = {"tag_type": "custom", "user_id": user_id}
-        
+        query = _CUSTOM_TAGS_QUERY.where(Tag.user_id == user_id)
         if is_enabled is not None:
-            filters["is_enabled"] = is_enabled
+            query = query.where(Tag.is_enabled == is_enabled)
         
-        return await self.query_by_filters(filters=filters)
+        result = await self.session.execute(query)
+        return result.scalars().all()
     
     async def get_all_available_tags(
         self,
@@ -73,7 +158,77 @@ class TagRepository(BaseRepository[Tag]):
         Returns:
             标签列表
         """
+        # 系统标签读取缓存，只查询用户自定义标签
+        system_tags = await self.get_system_tags(is_enabled=True if is_enabled else None)
+        custom_tags = await self.get_user_custom_tags(user_id, is_enabled=True if is_enabled else None)
+        return system_tags + custom_tags
+    
+    async def get_user_custom_tag_rows(
+        self,
+        user_id: str,
+        is_enabled: Optional[bool] = None
+    ) -> List[Row]:
+        """
+        获取用户自定义标签的展示字段（轻量Row，不构造ORM实例）
+        
+        Args:
+            user_id: 用户ID
+            is_enabled: 是否启用（可选）
+            
+        Returns:
+            Row列表，可按属性访问id/name/tag_type/color/icon
+        """
+        query = _CUSTOM_TAG_ROWS_QUERY.where(Tag.user_id == user_id)
+        if is_enabled is not None:
+            query = query.where(Tag.is_enabled == is_enabled)
+        
+        result = await self.session.execute(query)
+        return result.all()
+    
+    async def get_available_tag_rows(
+        self,
+        user_id: str,
+        is_enabled: bool = True
+    ) -> List[Any]:
+        """
+        获取用户所有可用标签的展示字段（系统标签 + 自定义标签），用于只读接口
+        
+        系统标签来自缓存（已脱离会话的Tag副本），自定义标签只读取展示字段；
+        两者都可按属性访问id/name/tag_type/color/icon
+        
+        Args:
+            user_id: 用户ID
+            is_enabled: 是否仅返回启用的标签
+            
+        Returns:
+            标签列表
+        """
+        system_tags = await self.get_system_tags(is_enabled=True if is_enabled else None)
+        custom_rows = await self.get_user_custom_tag_rows(user_id, is_enabled=True if is_enabled else None)
+        return system_tags + custom_rows
+    
+    async def filter_available_tag_ids(
+        self,
+        user_id: str,
+        tag_ids: List[str],
+        is_enabled: bool = True
+    ) -> Set[str]:
+        """
+        从给定标签ID中筛选出用户可用的标签ID（系统标签 + 用户自定义标签）
+        
+        Args:
+            user_id: 用户ID
+            tag_ids: 待校验的标签ID列表
+            is_enabled: 是否仅保留启用的标签
+            
+        Returns:
+            可用的标签ID集合
+        """
+        if not tag_ids:
+            return set()
+        
         conditions = [
+            Tag.id.in_(tag_ids),
             or_(
                 Tag.tag_type == "system",
                 and_(Tag.tag_type == "custom", Tag.user_id == user_id)
@@ -83,9 +238,8 @@ class TagRepository(BaseRepository[Tag]):
         if is_enabled:
             conditions.append(Tag.is_enabled == True)
         
-        query = select(Tag).where(and_(*conditions))
-        result = await self.session.execute(query)
-        return list(result.scalars().all())
+        result = await self.session.execute(select(Tag.id).where(and_(*conditions)))
+        return set(result.scalars())
     
     async def get_by_name(
         self,
@@ -104,13 +258,43 @@ class TagRepository(BaseRepository[Tag]):
         """
         if user_id:
             # 查询用户的自定义标签
-            filters = {"name": name, "tag_type": "custom", "user_id": user_id}
+            conditions = [Tag.tag_type == "custom", Tag.user_id == user_id]
         else:
             # 查询系统标签
-            filters = {"name": name, "tag_type": "system"}
+            conditions = [Tag.tag_type == "system"]
+        
+        # 命中idx_tag_name_type_user索引，取到首行即返回
+        query = select(Tag).where(and_(Tag.name == name, *conditions)).limit(1)
+        result = await self.session.execute(query)
+        return result.scalar_one_or_none()
+    
+    async def get_by_names(
+        self,
+        names: Iterable[str],
+        user_id: Optional[str] = None
+    ) -> Dict[str, Tag]:
+        """
+        根据名称批量获取标签（单次IN查询），代替逐个调用get_by_name
+        
+        Args:
+            names: 标签名称集合
+            user_id: 用户ID（传入时查询该用户的自定义标签，否则查询系统标签）
+            
+        Returns:
+            标签名称 -> 标签 的映射，不存在的名称不在结果中
+        """
+        names = list(dict.fromkeys(names))
+        if not names:
+            return {}
         
-        results = await self.query_by_filters(filters=filters, limit=1)
-        return results[0] if results else None
+        if user_id:
+            conditions = [Tag.tag_type == "custom", Tag.user_id == user_id]
+        else:
+            conditions = [Tag.tag_type == "system"]
+        
+        query = select(Tag).where(and_(Tag.name.in_(names), *conditions))
+        result = await self.session.execute(query)
+        return {tag.name: tag for tag in result.scalars()}
     
     async def count_user_custom_tags(self, user_id: str) -> int:
         """
@@ -123,4 +307,3 @@ class TagRepository(BaseRepository[Tag]):
             标签数量
         """
         return await self.count(tag_type="custom", user_id=user_id)
-
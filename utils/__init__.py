@@ -3,5 +3,6 @@
 """
 
 from .auth import get_current_user_or_mock
+from .ids import uuid7
 
-__all__ = ["get_current_user_or_mock"]
\ No newline at end of file
+__all__ = ["get_current_user_or_mock", "uuid7"]
\ No newline at end of file
@@ -3,6 +3,7 @@
 提供简单的用户标识功能（开发阶段）
 """
 # 标准库导包
+from functools import lru_cache
 from typing import Optional
 
 # 第三方库导包
@@ -11,6 +12,26 @@ from fastapi import Header, HTTPException
 # 项目内部导包
 from models import UserInfo
 
+# 与各表 user_id 列长度（VARCHAR(64)）一致
+MAX_USER_ID_LENGTH = 64
+
+# 开发阶段默认mock用户（只读共享实例，无需每个请求重新构造）
+_MOCK_USER = UserInfo(
+    user_id="mock_user_001",
+    mobile="mock_user_001",
+    name="Mock User"
+)
+
+
+@lru_cache(maxsize=4096)
+def _build_user(user_id: str) -> UserInfo:
+    """按用户ID构造UserInfo并缓存，相同X-User-Id复用同一只读实例，省去重复的模型校验"""
+    return UserInfo(
+        user_id=user_id,
+        mobile=user_id,  # 开发阶段用user_id作为mobile
+        name=None
+    )
+
 
 async def get_current_user_or_mock(
     x_user_id: Optional[str] = Header(None, alias="X-User-Id")
@@ -20,6 +41,8 @@ async def get_current_user_or_mock(
     
     优先从Header中获取X-User-Id，如果没有则返回mock用户
     
+    保持为async依赖：FastAPI会在事件循环中直接await，同步def依赖反而会被放入线程池执行
+    
     Args:
         x_user_id: X-User-Id header值
         
@@ -27,16 +50,10 @@ async def get_current_user_or_mock(
         UserInfo对象
     """
     if x_user_id:
-        return UserInfo(
-            user_id=x_user_id,
-            mobile=x_user_id,  # 开发阶段用user_id作为mobile
-            name=None
-        )
+        if len(x_user_id) > MAX_USER_ID_LENGTH:
+            raise HTTPException(status_code=400, detail=f"X-User-Id长度不能超过{MAX_USER_ID_LENGTH}")
+        return _build_user(x_user_id)
     
     # 开发阶段默认返回mock用户
-    return UserInfo(
-        user_id="mock_user_001",
-        mobile="mock_user_001",
-        name="Mock User"
-    )
+    return _MOCK_USER
 
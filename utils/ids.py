@@ -0,0 +1,34 @@
+"""
+ID生成工具
+提供按时间有序的UUIDv7（RFC 9562），用于会话ID等场景
+"""
+# 标准库导包
+import os
+import time
+import uuid
+
+# 48位毫秒时间戳 / 12位rand_a / 62位rand_b 的掩码
+_TIMESTAMP_MASK = (1 << 48) - 1
+_RAND_B_MASK = (1 << 62) - 1
+
+
+def uuid7() -> str:
+    """
+    生成UUIDv7字符串
+    
+    高48位为Unix毫秒时间戳，生成的ID按时间单调递增（毫秒级），
+    作为索引键时写入局部性优于完全随机的uuid4
+    
+    Returns:
+        形如 xxxxxxxx-xxxx-7xxx-yxxx-xxxxxxxxxxxx 的UUID字符串
+    """
+    timestamp_ms = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10), "big")
+    value = (
+        (timestamp_ms & _TIMESTAMP_MASK) << 80
+        | 0x7 << 76
+        | (rand >> 68) << 64
+        | 0b10 << 62
+        | (rand & _RAND_B_MASK)
+    )
+    return str(uuid.UUID(int=value))